@@ -42,6 +42,9 @@ setup(
     install_requires=[
         "ruamel.yaml>=0.15.96",
     ],
+    extras_require={
+        "pkcs7": ["cryptography>=45.0.0"],
+    },
     tests_require=[
         "pytest",
         "pytest-cov",
@@ -1,4 +1,7 @@
 """Define reusable pytest fixtures."""
+import os
+import stat
+import sys
 import tempfile
 from subprocess import run
 from types import SimpleNamespace
@@ -7,6 +10,7 @@ import pytest
 
 from yamlpath.wrappers import ConsolePrinter
 from yamlpath.eyaml import EYAMLProcessor
+from yamlpath.eyaml.providers import PKCS7EYAMLProvider
 
 # Implied constants
 EYAML_PRIVATE_KEY_FILENAME = "private_key.pkcs7.pem"
@@ -20,6 +24,71 @@ requireseyaml = pytest.mark.skipif(
         + " after intalling ruby and rubygems."
 )
 
+requirespkcs7 = pytest.mark.skipif(
+    not PKCS7EYAMLProvider.is_available()
+    , reason="The 'cryptography' package, version 45 or newer, must be"
+        + " installed to test in-process PKCS7 EYAML features.  Try:"
+        + "  'pip install cryptography'"
+)
+
+# Benchmarks time large, synthetic workloads, so they are run only on demand.
+benchmark = pytest.mark.skipif(
+    not os.environ.get("YAMLPATH_BENCHMARKS")
+    , reason="Benchmarks run only when the YAMLPATH_BENCHMARKS environment"
+        + " variable is set.  Try:  'YAMLPATH_BENCHMARKS=1 pytest -s'"
+)
+
+# A stand-in for the eyaml command, which "encrypts" text by hex-encoding it
+# into ENC[FAKE,...] values and "decrypts" every such value found within its
+# STDIN while passing all other text through, as the real command does.  Each
+# run appends its action to a log file so tests can count the runs.
+FAKE_EYAML_SCRIPT = """#!{python}
+import re
+import sys
+
+with open({runs_log!r}, "a") as runs_log:
+    runs_log.write(sys.argv[1] + "\\n")
+
+text = sys.stdin.read()
+if sys.argv[1] == "encrypt":
+    sys.stdout.write("ENC[FAKE," + text.encode("utf-8").hex() + "]")
+    sys.exit(0)
+
+text = re.sub(
+    r"ENC\\[FAKE,([0-9a-f]*)\\]",
+    lambda match: bytes.fromhex(match.group(1)).decode("utf-8"), text)
+if "ENC[" in text:
+    sys.exit(1)
+sys.stdout.write(text + "\\n")
+"""
+
+def fake_eyaml_value(plain_text):
+    """Returns the value the fake eyaml command would encrypt text into."""
+    return "ENC[FAKE," + plain_text.encode("utf-8").hex() + "]"
+
+@pytest.fixture
+def fake_eyaml(tmp_path):
+    """
+    Creates the fake eyaml command.
+
+    Returns its path and the path of the log file recording its runs.
+    """
+    runs_log = tmp_path / "fake-eyaml-runs.log"
+    runs_log.write_text("")
+    binary = tmp_path / "fake-eyaml"
+    binary.write_text(FAKE_EYAML_SCRIPT.format(
+        python=sys.executable, runs_log=str(runs_log)))
+    binary.chmod(binary.stat().st_mode | stat.S_IXUSR)
+    return (str(binary), runs_log)
+
+@pytest.fixture(autouse=True)
+def isolated_cache_home(tmp_path, monkeypatch):
+    """
+    Points every per-user cache, like that of yaml-merge --cache, at a
+    temporary directory so no test reads or writes the real user's cache.
+    """
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
 @pytest.fixture
 def quiet_logger():
     """Returns a quiet ConsolePrinter."""
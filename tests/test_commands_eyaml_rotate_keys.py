@@ -1,3 +1,5 @@
+import os
+
 import pytest
 
 from tests.conftest import (
@@ -5,6 +7,8 @@ from tests.conftest import (
     requireseyaml,
     old_eyaml_keys,
     new_eyaml_keys,
+    fake_eyaml,
+    fake_eyaml_value,
 )
 
 class Test_eyaml_rotate_keys():
@@ -262,3 +266,231 @@ class Test_eyaml_rotate_keys():
         with open(backup_file, 'r') as fhnd:
             filedat = fhnd.read()
         assert filedat == content
+
+    def test_decrypt_in_bulk(self, script_runner, tmp_path, fake_eyaml):
+        (binary, runs_log) = fake_eyaml
+        keys = []
+        for key_name in ["old-private", "old-public", "new-private", "new-public"]:
+            key_file = tmp_path / key_name
+            key_file.write_text(key_name)
+            keys.append(str(key_file))
+
+        content = """---
+anchored: &secret {}
+aliased: *secret
+list:
+  - {}
+  - {}
+""".format(*[fake_eyaml_value("secret {}".format(i)) for i in range(3)])
+        yaml_file = tmp_path / "secrets.yaml"
+        yaml_file.write_text(content)
+
+        result = script_runner.run(
+            self.command,
+            "--eyaml={}".format(binary),
+            "--oldprivatekey={}".format(keys[0]),
+            "--oldpublickey={}".format(keys[1]),
+            "--newprivatekey={}".format(keys[2]),
+            "--newpublickey={}".format(keys[3]),
+            str(yaml_file)
+        )
+        assert result.success, result.stderr
+        rotated = yaml_file.read_text()
+        assert "aliased: *secret" in rotated
+        for i in range(3):
+            assert fake_eyaml_value("secret {}".format(i)) in rotated
+        assert runs_log.read_text().split() == ["decrypt"] + ["encrypt"] * 3
+
+    def test_corrupted_value_in_bulk(self, script_runner, tmp_path, fake_eyaml):
+        (binary, runs_log) = fake_eyaml
+        keys = []
+        for key_name in ["old-private", "old-public", "new-private", "new-public"]:
+            key_file = tmp_path / key_name
+            key_file.write_text(key_name)
+            keys.append(str(key_file))
+
+        yaml_file = tmp_path / "secrets.yaml"
+        yaml_file.write_text("""---
+good: {}
+bad: ENC[corrupt]
+""".format(fake_eyaml_value("good secret")))
+
+        result = script_runner.run(
+            self.command,
+            "--eyaml={}".format(binary),
+            "--oldprivatekey={}".format(keys[0]),
+            "--oldpublickey={}".format(keys[1]),
+            "--newprivatekey={}".format(keys[2]),
+            "--newpublickey={}".format(keys[3]),
+            str(yaml_file)
+        )
+        assert not result.success, result.stderr
+        assert "exit code" in result.stderr
+        assert runs_log.read_text().split().count("encrypt") == 1
+
+    def test_bad_eyaml_jobs(self, script_runner, tmp_path):
+        keys = []
+        for key_name in ["old-private", "old-public", "new-private", "new-public"]:
+            key_file = tmp_path / key_name
+            key_file.write_text(key_name)
+            keys.append(str(key_file))
+
+        result = script_runner.run(
+            self.command,
+            "--eyaml-jobs=0",
+            "--oldprivatekey={}".format(keys[0]),
+            "--oldpublickey={}".format(keys[1]),
+            "--newprivatekey={}".format(keys[2]),
+            "--newpublickey={}".format(keys[3]),
+            "no-such-file"
+        )
+        assert not result.success, result.stderr
+        assert "The --eyaml-jobs option must be at least 1." in result.stderr
+
+    def test_encrypt_concurrently(self, script_runner, tmp_path, fake_eyaml):
+        (binary, runs_log) = fake_eyaml
+        keys = []
+        for key_name in ["old-private", "old-public", "new-private", "new-public"]:
+            key_file = tmp_path / key_name
+            key_file.write_text(key_name)
+            keys.append(str(key_file))
+
+        values = ["secret {}".format(i) for i in range(8)]
+        yaml_file = tmp_path / "secrets.yaml"
+        yaml_file.write_text("---\n" + "".join(
+            "key{}: {}\n".format(i, fake_eyaml_value(value))
+            for (i, value) in enumerate(values)))
+
+        result = script_runner.run(
+            self.command,
+            "--eyaml={}".format(binary),
+            "--eyaml-jobs=4",
+            "--oldprivatekey={}".format(keys[0]),
+            "--oldpublickey={}".format(keys[1]),
+            "--newprivatekey={}".format(keys[2]),
+            "--newpublickey={}".format(keys[3]),
+            str(yaml_file)
+        )
+        assert result.success, result.stderr
+        assert runs_log.read_text().split() == ["decrypt"] + ["encrypt"] * 8
+        rotated = yaml_file.read_text()
+        for (i, value) in enumerate(values):
+            assert "key{}: >-\n  {}\n".format(
+                i, fake_eyaml_value(value)) in rotated
+
+    def test_rotate_files_concurrently(self, script_runner, tmp_path, fake_eyaml):
+        (binary, runs_log) = fake_eyaml
+        keys = []
+        for key_name in ["old-private", "old-public", "new-private", "new-public"]:
+            key_file = tmp_path / key_name
+            key_file.write_text(key_name)
+            keys.append(str(key_file))
+
+        yaml_files = []
+        for file_id in range(4):
+            yaml_file = tmp_path / "secrets{}.yaml".format(file_id)
+            yaml_file.write_text("---\nsecret: {}\n".format(
+                fake_eyaml_value("secret {}".format(file_id))))
+            yaml_file.chmod(0o640)
+            yaml_files.append(str(yaml_file))
+        yaml_files.insert(2, str(tmp_path / "no-such-file.yaml"))
+
+        result = script_runner.run(
+            self.command,
+            "--eyaml={}".format(binary),
+            "--jobs=3",
+            "--oldprivatekey={}".format(keys[0]),
+            "--oldpublickey={}".format(keys[1]),
+            "--newprivatekey={}".format(keys[2]),
+            "--newpublickey={}".format(keys[3]),
+            *yaml_files
+        )
+        assert not result.success, result.stderr
+        assert "Not a file:" in result.stderr
+
+        # Console output is in YAML_FILE order, just as for a serial run
+        processing = [
+            line for line in result.stdout.splitlines()
+            if "Processing" in line]
+        assert processing == [
+            "Processing {}...".format(yaml_file)
+            for yaml_file in yaml_files if os.path.isfile(yaml_file)]
+
+        for (file_id, yaml_file) in enumerate(
+            [yaml_file for yaml_file in yaml_files if os.path.isfile(yaml_file)]
+        ):
+            assert fake_eyaml_value("secret {}".format(file_id)) in open(
+                yaml_file).read()
+            assert os.stat(yaml_file).st_mode & 0o777 == 0o640
+        assert runs_log.read_text().split().count("decrypt") == 4
+        assert not [name for name in os.listdir(str(tmp_path))
+                    if name.endswith(".tmp")]
+
+    def test_bad_jobs(self, script_runner, tmp_path):
+        keys = []
+        for key_name in ["old-private", "old-public", "new-private", "new-public"]:
+            key_file = tmp_path / key_name
+            key_file.write_text(key_name)
+            keys.append(str(key_file))
+
+        result = script_runner.run(
+            self.command,
+            "--jobs=0",
+            "--oldprivatekey={}".format(keys[0]),
+            "--oldpublickey={}".format(keys[1]),
+            "--newprivatekey={}".format(keys[2]),
+            "--newpublickey={}".format(keys[3]),
+            "no-such-file"
+        )
+        assert not result.success, result.stderr
+        assert "The --jobs|-j option must be at least 1." in result.stderr
+
+    def test_rotate_through_aliases_and_links(self, script_runner, tmp_path, fake_eyaml):
+        (binary, runs_log) = fake_eyaml
+        keys = []
+        for key_name in ["old-private", "old-public", "new-private", "new-public"]:
+            key_file = tmp_path / key_name
+            key_file.write_text(key_name)
+            keys.append(str(key_file))
+
+        yaml_file = tmp_path / "secrets.yaml"
+        yaml_file.write_text("""---
+aliases:
+  - &secret {}
+base: &base
+  aliased: *secret
+  novel: {}
+merged:
+  <<: *base
+  own: {}
+again: *base
+""".format(*[fake_eyaml_value("secret {}".format(i)) for i in range(3)]))
+        yaml_link = tmp_path / "link.yaml"
+        yaml_link.symlink_to(yaml_file)
+
+        result = script_runner.run(
+            self.command,
+            "--eyaml={}".format(binary),
+            "--oldprivatekey={}".format(keys[0]),
+            "--oldpublickey={}".format(keys[1]),
+            "--newprivatekey={}".format(keys[2]),
+            "--newpublickey={}".format(keys[3]),
+            str(yaml_link)
+        )
+        assert result.success, result.stderr
+        assert yaml_link.is_symlink()
+        assert runs_log.read_text().split() == ["decrypt"] + ["encrypt"] * 3
+        assert yaml_file.read_text() == """---
+aliases:
+  - &secret >-
+    {}
+base: &base
+  aliased: *secret
+  novel: >-
+    {}
+merged:
+  <<: *base
+  own: >-
+    {}
+again: *base
+""".format(*[fake_eyaml_value("secret {}".format(i)) for i in range(3)])
@@ -235,11 +235,13 @@ c [2].message
             ENC[PKCS7,MIIx...broken-on-purpose...==]
         """
         yaml_file = create_temp_yaml_file(tmp_path_factory, content)
+        rhs_file = create_temp_yaml_file(
+            tmp_path_factory, content.replace("purpose", "intent"))
         result = script_runner.run(
             self.command,
             "--eyaml=/does/not/exist-on-most/systems",
             yaml_file,
-            yaml_file
+            rhs_file
         )
         assert not result.success, result.stderr
         assert "No accessible eyaml command" in result.stderr
@@ -1581,6 +1583,86 @@ d [9]
         assert not result.success, result.stderr
         assert stdout_content == result.stdout
 
+    def test_diff_array_by_lcs(self, script_runner, tmp_path_factory):
+        lhs_file = create_temp_yaml_file(tmp_path_factory, self.lhs_array_content)
+        rhs_file = create_temp_yaml_file(tmp_path_factory, self.rhs_array_content)
+        stdout_content = """c [0]
+< "alpha"
+---
+> "zeta"
+
+a [3]
+> "alpha"
+
+a [4]
+> "gamma"
+
+a [5]
+> "gamma"
+
+a [6]
+> "phi"
+
+d [4]
+< "delta"
+
+d [6]
+< "delta"
+
+d [7]
+< "gamma"
+
+d [8]
+< "alpha"
+
+d [9]
+< "theta"
+"""
+
+        result = script_runner.run(
+            self.command
+            , "--arrays=lcs"
+            , lhs_file
+            , rhs_file)
+        assert not result.success, result.stderr
+        assert stdout_content == result.stdout
+
+    def test_diff_aoh_by_lcs(self, script_runner, tmp_path_factory):
+        lhs_file = create_temp_yaml_file(tmp_path_factory, """---
+- id: 1
+  name: one
+- id: 2
+  name: two
+- id: 3
+  name: three
+""")
+        rhs_file = create_temp_yaml_file(tmp_path_factory, """---
+- id: 0
+  name: zero
+- id: 1
+  name: one
+- id: 2
+  name: deux
+- id: 3
+  name: three
+""")
+        stdout_content = """a [0]
+> {"id": 0, "name": "zero"}
+
+c [2].name
+< "two"
+---
+> "deux"
+"""
+
+        result = script_runner.run(
+            self.command
+            , "--aoh=lcs"
+            , lhs_file
+            , rhs_file)
+        assert not result.success, result.stderr
+        assert stdout_content == result.stdout
+
     def test_diff_add_array_element(self, script_runner, tmp_path_factory):
         lhs_file = create_temp_yaml_file(tmp_path_factory, """---
 - 0
@@ -2033,3 +2115,254 @@ d hash_two
         assert not result.success, result.stderr
         assert stdout_content == result.stdout
 
+
+    def test_stream_diff_two_hash_files(self, script_runner, tmp_path_factory):
+        lhs_file = create_temp_yaml_file(tmp_path_factory, self.lhs_hash_content)
+        rhs_file = create_temp_yaml_file(tmp_path_factory, self.rhs_hash_content)
+
+        sorted_result = script_runner.run(
+            self.command
+            , lhs_file
+            , rhs_file)
+        result = script_runner.run(
+            self.command
+            , "--stream"
+            , lhs_file
+            , rhs_file)
+        assert not result.success, result.stderr
+
+        def get_entries(stdout):
+            return sorted(stdout.rstrip("\n").split("\n\n"))
+        assert get_entries(sorted_result.stdout) == get_entries(result.stdout)
+
+    def test_no_diff_tagged_files(self, script_runner, tmp_path_factory):
+        content = """---
+        tagged_scalar: !tag value
+        tagged_hash: !hash
+          key: !tag value
+        array:
+          - !tag value
+        """
+        lhs_file = create_temp_yaml_file(tmp_path_factory, content)
+        rhs_file = create_temp_yaml_file(tmp_path_factory, content)
+
+        result = script_runner.run(
+            self.command
+            , lhs_file
+            , rhs_file)
+        assert result.success, result.stderr
+        assert "" == result.stdout
+
+        result = script_runner.run(
+            self.command
+            , "--onlysame"
+            , lhs_file
+            , rhs_file)
+        assert result.success, result.stderr
+        assert "s tagged_hash.key\n= !tag \"value\"\n" in result.stdout
+
+    def test_too_many_files_without_baseline(self, script_runner):
+        result = script_runner.run(
+            self.command, "any-file.yaml", "any-other-file.json", "third.yaml")
+        assert not result.success, result.stderr
+        assert "Exactly two YAML_FILEs must be compared unless" in result.stderr
+
+    def test_bad_jobs(self, script_runner):
+        result = script_runner.run(
+            self.command, "--baseline=any-file.yaml", "--jobs=0",
+            "any-other-file.json")
+        assert not result.success, result.stderr
+        assert "The --jobs|-j option must be at least 1" in result.stderr
+
+    def test_baseline_jobs_from_stdin(self, script_runner):
+        result = script_runner.run(
+            self.command, "--baseline=-", "--jobs=2", "any-file.yaml")
+        assert not result.success, result.stderr
+        assert "cannot be greater than 1 when the BASELINE" in result.stderr
+
+    def test_missing_baseline_file(self, script_runner, tmp_path_factory):
+        rhs_file = create_temp_yaml_file(tmp_path_factory, self.rhs_hash_content)
+        result = script_runner.run(
+            self.command, "--baseline=no-file.yaml", rhs_file)
+        assert not result.success, result.stderr
+        assert "File not found" in result.stderr
+
+    @pytest.mark.parametrize("jobs", ["1", "3"])
+    def test_diff_baseline_many_files(
+        self, script_runner, tmp_path_factory, jobs
+    ):
+        baseline_file = create_temp_yaml_file(
+            tmp_path_factory, "key: value\narray: [1, 2]\n")
+        same_file = create_temp_yaml_file(
+            tmp_path_factory, "key: value\narray: [1, 2]\n")
+        changed_file = create_temp_yaml_file(
+            tmp_path_factory, "key: changed\narray: [1, 2]\n")
+        added_file = create_temp_yaml_file(
+            tmp_path_factory, "key: value\narray: [1, 2, 3]\n")
+        stdout_content = """diff {0} {2}
+c key
+< "value"
+---
+> "changed"
+
+diff {0} {3}
+a array[2]
+> 3
+""".format(baseline_file, same_file, changed_file, added_file)
+
+        result = script_runner.run(
+            self.command
+            , "--baseline={}".format(baseline_file)
+            , "--jobs={}".format(jobs)
+            , same_file
+            , changed_file
+            , "no-file.yaml"
+            , added_file)
+        assert not result.success, result.stderr
+        assert "File not found:  no-file.yaml" in result.stderr
+        assert stdout_content == result.stdout.replace(
+            "Please try --help for more information.\n", "")
+
+    @pytest.mark.parametrize("use_baseline", [True, False])
+    def test_serial_many_files_are_not_captured(
+        self, monkeypatch, capsys, tmp_path_factory, use_baseline
+    ):
+        import sys
+        from yamlpath.commands import yaml_diff
+
+        def fail_captured(*_args, **_kwargs):
+            raise AssertionError("A serial comparison was captured")
+
+        monkeypatch.setattr(yaml_diff, "diff_files_captured", fail_captured)
+        lhs_dir = tmp_path_factory.mktemp("lhs_dir")
+        rhs_dir = tmp_path_factory.mktemp("rhs_dir")
+        (lhs_dir / "first.yaml").write_text("key: value\n")
+        (rhs_dir / "first.yaml").write_text("key: first\n")
+        (lhs_dir / "second.yaml").write_text("key: value\n")
+        (rhs_dir / "second.yaml").write_text("key: second\n")
+        if use_baseline:
+            lhs_files = [str(lhs_dir / "first.yaml")] * 2
+            argv = ["--baseline={}".format(lhs_files[0]),
+                    str(rhs_dir / "first.yaml"), str(rhs_dir / "second.yaml")]
+        else:
+            lhs_files = [
+                str(lhs_dir / "first.yaml"), str(lhs_dir / "second.yaml")]
+            argv = [str(lhs_dir), str(rhs_dir)]
+        monkeypatch.setattr(
+            sys, "argv", [self.command, "--stream", "--jobs=1"] + argv)
+
+        with pytest.raises(SystemExit) as ex:
+            yaml_diff.main()
+        assert ex.value.code == 1
+        assert """diff {0} {2}
+c key
+< "value"
+---
+> "first"
+
+diff {1} {3}
+c key
+< "value"
+---
+> "second"
+""".format(lhs_files[0], lhs_files[1], rhs_dir / "first.yaml",
+           rhs_dir / "second.yaml") == capsys.readouterr().out
+
+    def test_no_diff_baseline_many_files(self, script_runner, tmp_path_factory):
+        baseline_file = create_temp_yaml_file(
+            tmp_path_factory, self.lhs_hash_content)
+        rhs_files = [
+            create_temp_yaml_file(tmp_path_factory, self.lhs_hash_content)
+            for _ in range(3)]
+
+        result = script_runner.run(
+            self.command, "--baseline={}".format(baseline_file), "--jobs=2",
+            *rhs_files)
+        assert result.success, result.stderr
+        assert "" == result.stdout
+
+    def test_file_and_directory(self, script_runner, tmp_path_factory):
+        lhs_file = create_temp_yaml_file(tmp_path_factory, self.lhs_hash_content)
+        result = script_runner.run(
+            self.command, lhs_file, str(tmp_path_factory.mktemp("rhs_dir")))
+        assert not result.success, result.stderr
+        assert "Both YAML_FILEs must be files or both must be" in result.stderr
+
+    def test_baseline_directory(self, script_runner, tmp_path_factory):
+        lhs_file = create_temp_yaml_file(tmp_path_factory, self.lhs_hash_content)
+        result = script_runner.run(
+            self.command, "--baseline={}".format(lhs_file),
+            str(tmp_path_factory.mktemp("rhs_dir")))
+        assert not result.success, result.stderr
+        assert "Each YAML_FILE must be a file when --baseline" in result.stderr
+
+    def test_diff_multidoc_files(self, script_runner, tmp_path_factory):
+        lhs_file = create_temp_yaml_file(
+            tmp_path_factory, "key: value\n---\nkey: value\n")
+        rhs_file = create_temp_yaml_file(
+            tmp_path_factory, "key: value\n---\nkey: changed\n---\nkey: new\n")
+        stdout_content = """diff {0} {1}, document 2
+c key
+< "value"
+---
+> "changed"
+
+diff {0} {1}, document 3
+a key
+> "new"
+""".format(lhs_file, rhs_file)
+
+        result = script_runner.run(self.command, lhs_file, rhs_file)
+        assert not result.success, result.stderr
+        assert stdout_content == result.stdout
+
+    @pytest.mark.parametrize("jobs", ["1", "3"])
+    def test_diff_directories(self, script_runner, tmp_path_factory, jobs):
+        lhs_dir = tmp_path_factory.mktemp("lhs_dir")
+        rhs_dir = tmp_path_factory.mktemp("rhs_dir")
+        for (directory, rel_file, content) in [
+            (lhs_dir, "same.yaml", "key: value\n"),
+            (rhs_dir, "same.yaml", "key: value\n"),
+            (lhs_dir, "lhs_only.yaml", "key: value\n"),
+            (lhs_dir, "ignored.txt", "key: value\n"),
+            (lhs_dir, "sub/changed.yml", "key: value\n"),
+            (rhs_dir, "sub/changed.yml", "key: changed\n"),
+            (lhs_dir, "sub/multidoc.yaml", "key: value\n---\nkey: 1\n"),
+            (rhs_dir, "sub/multidoc.yaml", "key: value\n---\nkey: 2\n"),
+            (rhs_dir, "zz_rhs_only.json", "{\"key\": \"value\"}\n"),
+        ]:
+            file_path = directory / rel_file
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            file_path.write_text(content)
+        stdout_content = """Only in {0}: lhs_only.yaml
+
+diff {0}/sub/changed.yml {1}/sub/changed.yml
+c key
+< "value"
+---
+> "changed"
+
+diff {0}/sub/multidoc.yaml {1}/sub/multidoc.yaml, document 2
+c key
+< 1
+---
+> 2
+
+Only in {1}: zz_rhs_only.json
+""".format(lhs_dir, rhs_dir)
+
+        result = script_runner.run(
+            self.command, "--jobs={}".format(jobs), str(lhs_dir), str(rhs_dir))
+        assert not result.success, result.stderr
+        assert stdout_content == result.stdout
+
+    def test_no_diff_directories(self, script_runner, tmp_path_factory):
+        lhs_dir = tmp_path_factory.mktemp("lhs_dir")
+        rhs_dir = tmp_path_factory.mktemp("rhs_dir")
+        for directory in (lhs_dir, rhs_dir):
+            (directory / "same.yaml").write_text(self.lhs_hash_content)
+
+        result = script_runner.run(
+            self.command, "--jobs=2", str(lhs_dir), str(rhs_dir))
+        assert result.success, result.stderr
+        assert "" == result.stdout
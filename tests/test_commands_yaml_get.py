@@ -1,6 +1,7 @@
 import pytest
 
-from tests.conftest import create_temp_yaml_file
+from tests.conftest import (
+    create_temp_yaml_file, fake_eyaml, fake_eyaml_value)
 
 
 class Test_yaml_get():
@@ -174,3 +175,23 @@ nullstring: "null"
         for line in result.stdout.splitlines():
             assert line == results[match_index]
             match_index += 1
+
+    def test_decrypt_in_bulk(self, script_runner, tmp_path_factory, fake_eyaml):
+        (binary, runs_log) = fake_eyaml
+        content = """---
+secrets:
+  - {}
+  - plain value
+  - {}
+""".format(fake_eyaml_value("first secret"), fake_eyaml_value("second secret"))
+        yaml_file = create_temp_yaml_file(tmp_path_factory, content)
+        result = script_runner.run(
+            self.command, "--query=secrets[.!=nothing]",
+            "--eyaml={}".format(binary), yaml_file)
+        assert result.success, result.stderr
+        assert "\n".join([
+            "first secret",
+            "plain value",
+            "second secret",
+        ]) + "\n" == result.stdout
+        assert runs_log.read_text() == "decrypt\n"
@@ -1,6 +1,6 @@
 import pytest
 
-from tests.conftest import create_temp_yaml_file
+from tests.conftest import benchmark, create_temp_yaml_file
 
 
 class Test_commands_yaml_merge():
@@ -45,6 +45,246 @@ key: value
         assert not result.success, result.stderr
         assert "Output file already exists" in result.stderr
 
+    def test_bad_jobs(self, script_runner):
+        result = script_runner.run(
+            self.command, "--nostdin", "--jobs=0", "lhs-file.yaml")
+        assert not result.success, result.stderr
+        assert "The --jobs|-j option must be at least 1" in result.stderr
+
+    @staticmethod
+    def make_corpus(tmp_path_factory, file_count, key_count, element_count):
+        yaml_files = []
+        for file_id in range(file_count):
+            yaml_files.append(create_temp_yaml_file(tmp_path_factory,
+                "---\n"
+                + "shared: &shared{0} value {0}\n".format(file_id)
+                + "hash:\n"
+                + "".join(["  key_{0}_{1}: {1}\n".format(file_id, key_id)
+                    for key_id in range(key_count)])
+                + "array:\n"
+                + "".join(["  - element {}\n".format(ele_id)
+                    for ele_id in range(file_id, file_id + element_count)])
+                + "alias: *shared{}\n".format(file_id)
+                + "---\n"
+                + "document_{0}: second of {0}\n".format(file_id)))
+        return yaml_files
+
+    def test_parallel_parsing_matches_serial(
+        self, script_runner, tmp_path_factory
+    ):
+        yaml_files = self.make_corpus(tmp_path_factory, 4, 3, 3)
+        serial_result = script_runner.run(
+            self.command, "--nostdin", "--anchors=rename", "--arrays=unique",
+            *yaml_files)
+        parallel_result = script_runner.run(
+            self.command, "--nostdin", "--anchors=rename", "--arrays=unique",
+            "--jobs=3", *yaml_files)
+
+        assert serial_result.success, serial_result.stderr
+        assert parallel_result.success, parallel_result.stderr
+        assert serial_result.stdout == parallel_result.stdout
+        assert "document_3: second of 3" in parallel_result.stdout
+        assert parallel_result.stdout.count("element 3\n") == 1
+
+    def test_parallel_parsing_repeated_file(
+        self, script_runner, tmp_path_factory
+    ):
+        lhs_file = create_temp_yaml_file(tmp_path_factory, "key: value\n")
+        rhs_file = create_temp_yaml_file(tmp_path_factory, "list: [x, y]\n")
+        serial_result = script_runner.run(
+            self.command, "--nostdin", lhs_file, rhs_file, rhs_file)
+        parallel_result = script_runner.run(
+            self.command, "--nostdin", "--jobs=2",
+            lhs_file, rhs_file, rhs_file)
+
+        assert serial_result.success, serial_result.stderr
+        assert parallel_result.success, parallel_result.stderr
+        assert serial_result.stdout == parallel_result.stdout
+        assert parallel_result.stdout.count("- x\n") == 2
+        assert parallel_result.stdout.count("- y\n") == 2
+
+    @benchmark
+    def test_parallel_parsing_benchmark(
+        self, script_runner, tmp_path_factory
+    ):
+        # Benchmark:  serial versus parallel parsing of a synthetic corpus.
+        import time
+        yaml_files = self.make_corpus(tmp_path_factory, 24, 400, 200)
+
+        started = time.perf_counter()
+        serial_result = script_runner.run(
+            self.command, "--nostdin", "--anchors=rename", "--arrays=unique",
+            *yaml_files)
+        serial_elapsed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        parallel_result = script_runner.run(
+            self.command, "--nostdin", "--anchors=rename", "--arrays=unique",
+            "--jobs=4", *yaml_files)
+        parallel_elapsed = time.perf_counter() - started
+
+        print("Serial:  {:.3f}s; parallel:  {:.3f}s".format(
+            serial_elapsed, parallel_elapsed))
+        assert serial_result.success, serial_result.stderr
+        assert parallel_result.success, parallel_result.stderr
+        assert serial_result.stdout == parallel_result.stdout
+
+    def test_bad_cache_size(self, script_runner):
+        result = script_runner.run(
+            self.command, "--nostdin", "--cache-size=-1", "no-file.yaml")
+        assert not result.success, result.stderr
+        assert "--cache-size option cannot be negative" in result.stderr
+
+    def test_cached_merge_resumes(self, script_runner, tmp_path_factory):
+        cache_dir = str(tmp_path_factory.mktemp("merge_cache"))
+        yaml_files = self.make_corpus(tmp_path_factory, 3, 3, 3)
+        merge_args = [
+            self.command, "--nostdin", "--verbose", "--anchors=rename",
+            "--arrays=unique", "--cache", "--cache-dir={}".format(cache_dir)]
+
+        cold_result = script_runner.run(*merge_args, *yaml_files)
+        warm_result = script_runner.run(*merge_args, *yaml_files)
+        assert cold_result.success, cold_result.stderr
+        assert warm_result.success, warm_result.stderr
+        assert "Resuming from" not in cold_result.stdout
+        assert ("Resuming from the cached merge result of the first 3"
+            in warm_result.stdout)
+
+        # The cached result must be identical to that of an uncached merge
+        uncached_result = script_runner.run(
+            self.command, "--nostdin", "--anchors=rename", "--arrays=unique",
+            *yaml_files)
+        assert uncached_result.success, uncached_result.stderr
+        cached_yaml = warm_result.stdout[
+            warm_result.stdout.index("---"):]
+        assert cached_yaml == uncached_result.stdout
+
+    @benchmark
+    def test_cached_merge_benchmark(self, script_runner, tmp_path_factory):
+        # Benchmark:  a cold merge versus the same merge resumed from cache.
+        import time
+        cache_dir = str(tmp_path_factory.mktemp("merge_cache"))
+        yaml_files = self.make_corpus(tmp_path_factory, 12, 400, 200)
+        merge_args = [
+            self.command, "--nostdin", "--anchors=rename", "--arrays=unique",
+            "--cache", "--cache-dir={}".format(cache_dir)]
+
+        started = time.perf_counter()
+        cold_result = script_runner.run(*merge_args, *yaml_files)
+        cold_elapsed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        warm_result = script_runner.run(*merge_args, *yaml_files)
+        warm_elapsed = time.perf_counter() - started
+
+        print("Cold:  {:.3f}s; cached:  {:.3f}s".format(
+            cold_elapsed, warm_elapsed))
+        assert cold_result.success, cold_result.stderr
+        assert warm_result.success, warm_result.stderr
+        assert cold_result.stdout == warm_result.stdout
+
+    def test_cached_merge_changed_layer(self, script_runner, tmp_path_factory):
+        cache_dir = str(tmp_path_factory.mktemp("merge_cache"))
+        lhs_file = create_temp_yaml_file(tmp_path_factory, "key: lhs\n")
+        mid_file = create_temp_yaml_file(tmp_path_factory, "mid: before\n")
+        rhs_file = create_temp_yaml_file(tmp_path_factory, "rhs: value\n")
+        merge_args = [
+            self.command, "--nostdin", "--verbose", "--cache",
+            "--cache-dir={}".format(cache_dir),
+            lhs_file, mid_file, rhs_file]
+
+        result = script_runner.run(*merge_args)
+        assert result.success, result.stderr
+
+        with open(mid_file, "w") as fhnd:
+            fhnd.write("mid: after\n")
+        result = script_runner.run(*merge_args)
+        assert result.success, result.stderr
+        assert ("Resuming from the cached merge result of the first 1 "
+            in result.stdout)
+        assert "mid: after" in result.stdout
+        assert "mid: before" not in result.stdout
+
+    def test_cache_is_opt_in(self, script_runner, tmp_path_factory):
+        import os
+        cache_dir = str(tmp_path_factory.mktemp("merge_cache"))
+        lhs_file = create_temp_yaml_file(tmp_path_factory, "key: lhs\n")
+        rhs_file = create_temp_yaml_file(tmp_path_factory, "key: rhs\n")
+        result = script_runner.run(
+            self.command, "--nostdin",
+            "--cache-dir={}".format(cache_dir), lhs_file, rhs_file)
+        assert result.success, result.stderr
+        assert "key: rhs" in result.stdout
+        assert os.listdir(cache_dir) == []
+
+    def test_cache_stores_sparse_checkpoints(
+        self, script_runner, tmp_path_factory
+    ):
+        import os
+        cache_dir = str(tmp_path_factory.mktemp("merge_cache"))
+        layer_files = [
+            create_temp_yaml_file(
+                tmp_path_factory, "key{}: value{}\n".format(idx, idx))
+            for idx in range(10)]
+        result = script_runner.run(
+            self.command, "--nostdin", "--cache",
+            "--cache-dir={}".format(cache_dir), *layer_files)
+        assert result.success, result.stderr
+        assert "key9: value9" in result.stdout
+        assert len(os.listdir(cache_dir)) == 6
+
+    def test_cache_defaults_to_cache_home(
+        self, script_runner, tmp_path_factory
+    ):
+        import os
+        lhs_file = create_temp_yaml_file(tmp_path_factory, "key: lhs\n")
+        rhs_file = create_temp_yaml_file(tmp_path_factory, "key: rhs\n")
+        result = script_runner.run(
+            self.command, "--nostdin", "--cache", lhs_file, rhs_file)
+        assert result.success, result.stderr
+        cache_dir = os.path.join(
+            os.environ["XDG_CACHE_HOME"], "yamlpath", "merge")
+        assert len(os.listdir(cache_dir)) == 2
+
+    def test_cache_stops_at_stdin(self, script_runner, tmp_path_factory):
+        import os
+        import subprocess
+        cache_dir = str(tmp_path_factory.mktemp("merge_cache"))
+        lhs_file = create_temp_yaml_file(tmp_path_factory, "key: lhs\n")
+        rhs_file = create_temp_yaml_file(tmp_path_factory, "rhs: value\n")
+        result = subprocess.run(
+            [self.command
+            , "--cache"
+            , "--cache-dir={}".format(cache_dir)
+            , lhs_file
+            , "-"
+            , rhs_file]
+            , stdout=subprocess.PIPE
+            , input="stdin: value\n"
+            , universal_newlines=True
+        )
+        assert 0 == result.returncode, result.stderr
+        assert "stdin: value" in result.stdout
+        assert len(os.listdir(cache_dir)) == 1
+
+    def test_parallel_parsing_error_order(
+        self, script_runner, tmp_path_factory
+    ):
+        lhs_file = create_temp_yaml_file(tmp_path_factory, """---
+key: value
+""")
+        bad_file = create_temp_yaml_file(tmp_path_factory, """---
+bad: [
+""")
+        rhs_file = create_temp_yaml_file(tmp_path_factory, """---
+other: value
+""")
+        result = script_runner.run(
+            self.command, "--nostdin", "--jobs=2", lhs_file, bad_file,
+            rhs_file)
+        assert not result.success, result.stderr
+        assert "YAML parsing error" in result.stderr
+
     def test_missing_prime_input_file(self, script_runner):
         result = script_runner.run(
             self.command
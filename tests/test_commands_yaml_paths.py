@@ -1,6 +1,9 @@
+import time
+
 import pytest
 
-from tests.conftest import create_temp_yaml_file
+from tests.conftest import (
+    benchmark, create_temp_yaml_file, fake_eyaml, fake_eyaml_value)
 
 
 class Test_yaml_paths():
@@ -543,6 +546,21 @@ class Test_yaml_paths():
             "/key",
         ]) + "\n" in result.stdout
 
+    def test_empty_exclusion_without_results(self, script_runner, tmp_path_factory):
+        content = """---
+        key: value
+        """
+        yaml_file = create_temp_yaml_file(tmp_path_factory, content)
+        result = script_runner.run(
+            self.command,
+            "--search==nothing",
+            "--except==",
+            yaml_file
+        )
+        assert not result.success, result.stderr
+        assert "An EXPRESSION with only a search operator has no effect" in result.stderr
+        assert "/key" not in result.stdout
+
     def test_search_encrypted_values(self, script_runner, tmp_path_factory, old_eyaml_keys):
         content = """---
         aliases:
@@ -989,3 +1007,347 @@ key: value
         result = script_runner.run(self.command, "--search", "=nothing", "-", "-")
         assert not result.success, result.stderr
         assert "Only one YAML_FILE may be the - pseudo-file" in result.stderr
+
+    def test_decrypt_in_bulk(self, script_runner, tmp_path_factory, fake_eyaml):
+        (binary, runs_log) = fake_eyaml
+        content = """---
+anchored: &secret {}
+aliased: *secret
+list:
+  - {}
+  - plain secret
+  - {}
+""".format(*[fake_eyaml_value(val) for val in [
+            "anchored secret", "listed secret", "other value"]])
+        yaml_file = create_temp_yaml_file(tmp_path_factory, content)
+        result = script_runner.run(
+            self.command,
+            "--nostdin", "--nofile", "--noexpression", "--decrypt",
+            "--eyaml={}".format(binary),
+            "--search", "$secret", "--search", "^other",
+            "--except", "^anchored", yaml_file
+        )
+        assert result.success, result.stderr
+        assert "\n".join([
+            "list[0]",
+            "list[1]",
+            "list[2]",
+        ]) + "\n" == result.stdout
+        assert runs_log.read_text() == "decrypt\n"
+
+    def test_overlapping_searches_with_exceptions(self, script_runner, tmp_path_factory):
+        content = "---\n" + "".join(
+            "key{0}: value {0}\n".format(idx) for idx in range(30))
+        yaml_file = create_temp_yaml_file(tmp_path_factory, content)
+        result = script_runner.run(
+            self.command,
+            "--nostdin", "--nofile", "--noexpression",
+            "--search", "^value", "--search", "$5",
+            "--except", "$0", yaml_file
+        )
+        assert result.success, result.stderr
+        assert result.stdout == "".join(
+            "key{}\n".format(idx) for idx in range(30) if idx % 10)
+
+    @benchmark
+    def test_many_results_benchmark(self, script_runner, tmp_path_factory):
+        entries = 20000
+        content = "---\n" + "".join(
+            "key{0}: value {0}\n".format(idx) for idx in range(entries))
+        yaml_file = create_temp_yaml_file(tmp_path_factory, content)
+
+        started = time.perf_counter()
+        result = script_runner.run(
+            self.command,
+            "--nostdin", "--nofile", "--noexpression",
+            "--search", "^value", "--search", "$5",
+            "--except", "$0", yaml_file
+        )
+        elapsed = time.perf_counter() - started
+
+        print("Reported {} results in {:.3f}s".format(
+            len(result.stdout.splitlines()), elapsed))
+        assert result.success, result.stderr
+        assert result.stdout == "".join(
+            "key{}\n".format(idx) for idx in range(entries) if idx % 10)
+        assert elapsed < 30
+
+    def test_search_for_all_paths_direct(self, tmp_path_factory, quiet_logger):
+        from yamlpath.enums import PathSeperators, PathSearchMethods
+        from yamlpath.path import SearchTerms
+        from yamlpath.common import Parsers
+        from yamlpath.commands.yaml_paths import search_for_all_paths
+        from yamlpath.eyaml import EYAMLProcessor
+
+        content = """---
+        aliases:
+          - &anchored value1
+        hash:
+          key1: value1
+          key2: *anchored
+          key3: value3
+        """
+        yaml = Parsers.get_yaml_editor()
+        yaml_file = create_temp_yaml_file(tmp_path_factory, content)
+        (yaml_data, doc_loaded) = Parsers.get_yaml_data(
+            yaml, quiet_logger, yaml_file)
+        terms = [
+            SearchTerms(False, PathSearchMethods.EQUALS, "*", "value1"),
+            SearchTerms(False, PathSearchMethods.STARTS_WITH, "*", "value"),
+            SearchTerms(False, PathSearchMethods.STARTS_WITH, "*", "key"),
+        ]
+        results = [
+            (str(path), term_indexes)
+            for path, _, term_indexes in search_for_all_paths(
+                quiet_logger, EYAMLProcessor(quiet_logger, yaml_data),
+                yaml_data, terms, PathSeperators.FSLASH, search_keys=True)]
+        assert results == [
+            ("/aliases[&anchored]", [0, 1]),
+            ("/hash/key1", [0, 1, 2]),
+            ("/hash/key2", [2]),
+            ("/hash/key3", [1, 2]),
+        ]
+
+    @pytest.mark.parametrize("options,output", [
+        ([], [
+            "[=value1]: aliases[&anchor]",
+            "[=value1]: hash.child1",
+            "[=value1]: list[1]",
+            "[=value1]: list[2][1]",
+            "[^val]: hash.child2",
+            "[^val]: list[2][0]",
+        ]),
+        (["--keynames", "--allowaliases", "--refnames"], [
+            "[=value1]: aliases[&anchor]",
+            "[=value1]: hash.child1",
+            "[=value1]: hash.child3",
+            "[=value1]: hash.value1",
+            "[=value1]: list[&anchor]",
+            "[=value1]: list[1]",
+            "[=value1]: list[2][1]",
+            "[=value1]: list[2][&anchor]",
+            "[^val]: hash.child2",
+            "[^val]: list[2][0]",
+            "[%child]: hash.children",
+        ]),
+        (["--keynames", "--expand"], [
+            "[=value1]: aliases[&anchor]",
+            "[=value1]: hash.child1",
+            "[=value1]: hash.value1",
+            "[=value1]: list[1]",
+            "[=value1]: list[2][1]",
+            "[^val]: hash.child2",
+            "[^val]: list[2][0]",
+            "[%child]: hash.child3",
+        ]),
+    ])
+    def test_multiple_expressions_order(self, script_runner, tmp_path_factory, options, output):
+        content = """---
+        aliases:
+          - &anchor value1
+        hash:
+          child1: value1
+          child2: value2
+          child3: *anchor
+          value1: other
+          children:
+            grandchild: value4
+            other: exclude
+        list:
+          - *anchor
+          - value1
+          - [value5, value1, *anchor]
+        """
+        yaml_file = create_temp_yaml_file(tmp_path_factory, content)
+        result = script_runner.run(
+            self.command, "--nostdin", "--nofile", *options,
+            "--search", "=value1", "--search", "^val", "--search", "%child",
+            "--except", "=exclude", "--except", "=value4",
+            yaml_file)
+        assert result.success, result.stderr
+        assert "\n".join(output) + "\n" == result.stdout
+
+    @benchmark
+    def test_many_expressions_benchmark(self, script_runner, tmp_path_factory):
+        entries = 20000
+        expressions = 15
+        content = "---\n" + "".join(
+            ("group{}:\n".format(idx // 10) if idx % 10 == 0 else "")
+            + "  key{0}: value{0}\n".format(idx)
+            for idx in range(entries))
+        yaml_file = create_temp_yaml_file(tmp_path_factory, content)
+        searches = []
+        for idx in range(1, expressions + 1):
+            searches.extend(["--search", "=value{}".format(idx)])
+
+        started = time.perf_counter()
+        result = script_runner.run(
+            self.command,
+            "--nostdin", "--nofile", "--noexpression", *searches,
+            "--except", "$0", "--except", "$00", yaml_file
+        )
+        elapsed = time.perf_counter() - started
+
+        print("Searched for {} expressions in {:.3f}s".format(
+            expressions, elapsed))
+        assert result.success, result.stderr
+        assert result.stdout == "".join(
+            "group{}.key{}\n".format(idx // 10, idx)
+            for idx in range(1, expressions + 1) if idx % 10)
+        assert elapsed < 30
+
+    def test_print_results_direct(self, capsys):
+        from types import SimpleNamespace
+        from ruamel.yaml.comments import CommentedMap
+        from yamlpath import YAMLPath
+        from yamlpath.commands.yaml_paths import print_results
+
+        args = SimpleNamespace(
+            search=["=a", "=b"], nofile=True, noexpression=False,
+            noyamlpath=False, values=True, ndjson=False)
+        print_results(args, "-", [
+            ("=a", YAMLPath("scalar"), "multi\nline"),
+            ("=b", YAMLPath("hash"), CommentedMap([("key", "value")])),
+        ], 0)
+        assert capsys.readouterr().out == "\n".join([
+            "[=a]: scalar: multi\\nline",
+            "[=b]: hash: {\"key\": \"value\"}",
+        ]) + "\n"
+
+    @benchmark
+    def test_many_values_benchmark(self, script_runner, tmp_path_factory):
+        entries = 20000
+        content = "---\n" + "".join(
+            "key{0}: value {0}\n".format(idx) for idx in range(entries))
+        yaml_file = create_temp_yaml_file(tmp_path_factory, content)
+
+        started = time.perf_counter()
+        result = script_runner.run(
+            self.command,
+            "--nostdin", "--nofile", "--values", "--search", "^value",
+            yaml_file
+        )
+        elapsed = time.perf_counter() - started
+
+        print("Reported {} values in {:.3f}s".format(
+            len(result.stdout.splitlines()), elapsed))
+        assert result.success, result.stderr
+        assert result.stdout == "".join(
+            "key{0}: value {0}\n".format(idx) for idx in range(entries))
+        assert elapsed < 30
+
+    @pytest.mark.parametrize("options,output", [
+        ([], [
+            "[=value1]: aliases[&anchor]",
+            "[=value1]: hash.child1",
+            "[^val]: hash.child2",
+            "[=value1]: list[1]",
+            "[^val]: list[2][0]",
+            "[=value1]: list[2][1]",
+        ]),
+        (["--keynames", "--expand"], [
+            "[=value1]: aliases[&anchor]",
+            "[=value1]: hash.child1",
+            "[^val]: hash.child2",
+            "[%child]: hash.child3",
+            "[=value1]: hash.value1",
+            "[=value1]: list[1]",
+            "[^val]: list[2][0]",
+            "[=value1]: list[2][1]",
+        ]),
+    ])
+    def test_stream_results(self, script_runner, tmp_path_factory, options, output):
+        content = """---
+        aliases:
+          - &anchor value1
+        hash:
+          child1: value1
+          child2: value2
+          child3: *anchor
+          value1: other
+          children:
+            grandchild: value4
+            other: exclude
+        list:
+          - *anchor
+          - value1
+          - [value5, value1, *anchor]
+        """
+        yaml_file = create_temp_yaml_file(tmp_path_factory, content)
+        result = script_runner.run(
+            self.command, "--nostdin", "--nofile", "--stream", *options,
+            "--search", "=value1", "--search", "^val", "--search", "%child",
+            "--except", "=exclude", "--except", "=value4",
+            yaml_file)
+        assert result.success, result.stderr
+        assert "\n".join(output) + "\n" == result.stdout
+
+    def test_ndjson_results(self, script_runner, tmp_path_factory):
+        import json
+
+        content = """---
+scalar: value1
+hash:
+  key: value2
+---
+list: [value3]
+"""
+        yaml_file = create_temp_yaml_file(tmp_path_factory, content)
+        result = script_runner.run(
+            self.command, "--nostdin", "--ndjson", "--values",
+            "--search", "^value", "--search", "%has",
+            yaml_file)
+        assert result.success, result.stderr
+        assert [json.loads(line) for line in result.stdout.splitlines()] == [
+            {"file": yaml_file, "document": 0, "expression": "^value",
+             "path": "scalar", "value": "value1"},
+            {"file": yaml_file, "document": 0, "expression": "^value",
+             "path": "hash.key", "value": "value2"},
+            {"file": yaml_file, "document": 1, "expression": "^value",
+             "path": "list[0]", "value": "value3"},
+        ]
+
+        result = script_runner.run(
+            self.command, "--nostdin", "--ndjson", "--nofile",
+            "--noexpression", "--keynames", "--search", "%has", yaml_file)
+        assert result.success, result.stderr
+        assert result.stdout == '{"path": "hash"}\n'
+
+    def test_stream_ndjson_results(self, script_runner, tmp_path_factory):
+        content = "---\n" + "".join(
+            "key{0}: value {0}\n".format(idx) for idx in range(30))
+        yaml_file = create_temp_yaml_file(tmp_path_factory, content)
+        result = script_runner.run(
+            self.command,
+            "--nostdin", "--nofile", "--stream", "--ndjson", "--values",
+            "--search", "^value", "--search", "$5",
+            "--except", "$0", yaml_file
+        )
+        assert result.success, result.stderr
+        assert result.stdout == "".join(
+            '{{"expression": "^value", "path": "key{0}", "value": "value {0}"}}\n'
+            .format(idx) for idx in range(30) if idx % 10)
+
+    @benchmark
+    def test_stream_benchmark(self, script_runner, tmp_path_factory):
+        entries = 20000
+        content = "---\n" + "".join(
+            "key{0}: value {0}\n".format(idx) for idx in range(entries))
+        yaml_file = create_temp_yaml_file(tmp_path_factory, content)
+
+        started = time.perf_counter()
+        result = script_runner.run(
+            self.command,
+            "--nostdin", "--nofile", "--stream", "--ndjson", "--values",
+            "--search", "^value", "--search", "$5",
+            "--except", "$0", yaml_file
+        )
+        elapsed = time.perf_counter() - started
+
+        print("Streamed {} results in {:.3f}s".format(
+            len(result.stdout.splitlines()), elapsed))
+        assert result.success, result.stderr
+        assert result.stdout == "".join(
+            '{{"expression": "^value", "path": "key{0}", "value": "value {0}"}}\n'
+            .format(idx) for idx in range(entries) if idx % 10)
+        assert elapsed < 30
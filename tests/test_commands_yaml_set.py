@@ -1,6 +1,8 @@
 import pytest
 
-from tests.conftest import create_temp_yaml_file, requireseyaml, old_eyaml_keys
+from tests.conftest import (
+    create_temp_yaml_file, requireseyaml, old_eyaml_keys, fake_eyaml,
+    fake_eyaml_value)
 
 
 class Test_yaml_set():
@@ -1242,3 +1244,51 @@ egress_key: Following value
         with open(yaml_file, 'r') as fhnd:
             filedat = fhnd.read()
         assert filedat == yamlout
+
+    def test_bad_eyaml_jobs(self, script_runner):
+        result = script_runner.run(
+            self.command, "--change=key", "--value=abc", "--eyaml-jobs=0",
+            "no-such-file")
+        assert not result.success, result.stderr
+        assert "The --eyaml-jobs option must be at least 1." in result.stderr
+
+    def test_check_many_encrypted_values(self, script_runner, tmp_path_factory, fake_eyaml):
+        (binary, runs_log) = fake_eyaml
+        content = """---
+key1: {0}
+key2: same
+key3: {0}
+key4: {1}
+""".format(fake_eyaml_value("same"), fake_eyaml_value("same "))
+        yaml_file = create_temp_yaml_file(tmp_path_factory, content)
+        result = script_runner.run(
+            self.command,
+            "--change=/[.^key]",
+            "--value=new",
+            "--check=same",
+            "--eyaml={}".format(binary),
+            "--eyaml-jobs=2",
+            yaml_file
+        )
+        assert result.success, result.stderr
+        assert runs_log.read_text() == "decrypt\n"
+        with open(yaml_file, 'r') as fhnd:
+            assert fhnd.read() == "---\nkey1: new\nkey2: new\nkey3: new\nkey4: new\n"
+
+    def test_check_many_encrypted_values_mismatch(self, script_runner, tmp_path_factory, fake_eyaml):
+        (binary, runs_log) = fake_eyaml
+        content = """---
+key1: {}
+key2: {}
+""".format(fake_eyaml_value("same"), fake_eyaml_value("different"))
+        yaml_file = create_temp_yaml_file(tmp_path_factory, content)
+        result = script_runner.run(
+            self.command,
+            "--change=/[.^key]",
+            "--value=new",
+            "--check=same",
+            "--eyaml={}".format(binary),
+            yaml_file
+        )
+        assert not result.success, result.stderr
+        assert "does not match the check value" in result.stderr
@@ -0,0 +1,96 @@
+import pytest
+
+import ruamel.yaml as ry
+
+from yamlpath import YAMLPath
+from yamlpath.enums import PathSeperators
+from yamlpath.differ import DiffEntry
+from yamlpath.differ.enums import DiffActions
+from tests.conftest import benchmark
+
+
+class Test_differ_DiffEntry():
+    """Tests for the DiffEntry class."""
+
+    def test_no_instance_dict(self):
+        entry = DiffEntry(DiffActions.ADD, YAMLPath("key"), None, "value")
+        assert not hasattr(entry, "__dict__")
+        with pytest.raises(AttributeError):
+            entry.other = "value"
+
+    @pytest.mark.parametrize("path,pathsep,output", [
+        ("", PathSeperators.DOT, "-"),
+        ("hash.key", PathSeperators.DOT, "hash.key"),
+        ("hash.key", PathSeperators.FSLASH, "/hash/key"),
+        ("/hash/key", PathSeperators.DOT, "hash.key"),
+        ("array[0].key\\.dotted", PathSeperators.FSLASH,
+         "/array[0]/key\\.dotted"),
+    ])
+    def test_path(self, path, pathsep, output):
+        entry = DiffEntry(DiffActions.DELETE, YAMLPath(path), "value", None)
+        entry.pathsep = pathsep
+        assert entry.pathsep is pathsep
+        assert entry.path == YAMLPath(path)
+        assert str(entry).startswith("d {}\n".format(output))
+
+    def test_path_is_unchanged(self):
+        yaml_path = YAMLPath("hash.key")
+        entry = DiffEntry(DiffActions.DELETE, yaml_path, "value", None)
+        entry.pathsep = PathSeperators.FSLASH
+        assert str(entry.path) == "/hash/key"
+        assert str(yaml_path) == "hash.key"
+
+    def test_sort_key(self):
+        data = ry.YAML().load("lhs: 1\nmore:\n  child: 2\n")
+        entry = DiffEntry(
+            DiffActions.CHANGE, YAMLPath("more.child"), 2, 3,
+            lhs_parent=data["more"], lhs_iteration=0)
+        assert entry.sort_key == (2, 2, 0, 0, 0, 0)
+        assert entry.index == "2.2.0.0.0.0"
+
+        entry = DiffEntry(
+            DiffActions.ADD, YAMLPath("more.other"), None, 3,
+            lhs_parent=data["more"], rhs_parent=data, rhs_iteration=1)
+        assert entry.sort_key == (0, 0, 0, 2, 2, 1)
+
+    def test_report_order(self):
+        data = ry.comments.CommentedSeq(range(12))
+        entries = [
+            DiffEntry(
+                DiffActions.CHANGE, YAMLPath("array[{}]".format(idx)),
+                data[idx], -data[idx], lhs_parent=data, lhs_iteration=idx,
+                rhs_parent=data, rhs_iteration=idx)
+            for idx in reversed(range(12))]
+
+        report = sorted(entries, key=lambda e: e.sort_key)
+        assert [str(entry.path) for entry in report] == [
+            "array[{}]".format(idx) for idx in range(12)]
+
+    @benchmark
+    def test_large_report(self):
+        # Benchmark:  50k entries must be compact and quickly sorted.
+        import time
+        import tracemalloc
+        entry_count = 50000
+        data = ry.comments.CommentedSeq(range(entry_count))
+        tracemalloc.start()
+        started_bytes = tracemalloc.get_traced_memory()[0]
+        entries = [
+            DiffEntry(
+                DiffActions.CHANGE, YAMLPath("array[{}]".format(idx)),
+                data[idx], -data[idx], lhs_parent=data, lhs_iteration=idx,
+                rhs_parent=data, rhs_iteration=idx)
+            for idx in reversed(range(entry_count))]
+        entry_bytes = (
+            (tracemalloc.get_traced_memory()[0] - started_bytes)
+            / entry_count)
+        tracemalloc.stop()
+
+        started = time.perf_counter()
+        report = sorted(entries, key=lambda e: e.sort_key)
+        elapsed = time.perf_counter() - started
+
+        assert str(report[0].path) == "array[0]"
+        assert str(report[-1].path) == "array[{}]".format(entry_count - 1)
+        assert entry_bytes < 512
+        assert elapsed < 30
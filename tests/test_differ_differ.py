@@ -0,0 +1,495 @@
+import pytest
+from types import SimpleNamespace
+
+import ruamel.yaml as ry
+
+from yamlpath import YAMLPath
+from yamlpath.differ import Differ, DifferConfig
+from yamlpath.differ.enums import DiffActions
+from tests.conftest import benchmark, quiet_logger, create_temp_yaml_file
+
+
+class Test_differ_Differ():
+    """Tests for the Differ class."""
+
+    ###
+    # synchronize_lists_by_value
+    ###
+    def test_synchronize_lists_by_value(self):
+        lhs = ry.comments.CommentedSeq(["a", "b", "a", 1, "z"])
+        rhs = ry.comments.CommentedSeq(["b", "a", True, "c", "a"])
+        assert Differ.synchronize_lists_by_value(lhs, rhs) == [
+            (0, "a", 1, "a"),
+            (1, "b", 0, "b"),
+            (2, "a", 4, "a"),
+            (3, 1, 2, True),
+            (4, "z", None, None),
+            (None, None, 3, "c"),
+        ]
+
+    def test_synchronize_lists_by_value_complex(self):
+        lhs = ry.comments.CommentedSeq([
+            ry.comments.CommentedMap({"x": 1, "y": [1, 2]}),
+            ry.comments.CommentedSeq(["a", "b"]),
+            ry.comments.CommentedMap({"x": 2}),
+        ])
+        rhs = ry.comments.CommentedSeq([
+            ry.comments.CommentedSeq(["b", "a"]),
+            ry.comments.CommentedMap({"y": [1, 2], "x": 1}),
+            ry.comments.CommentedSeq(["a", "b"]),
+        ])
+        assert [
+            (lidx, ridx)
+            for (lidx, _, ridx, _) in Differ.synchronize_lists_by_value(
+                lhs, rhs)
+        ] == [(0, 1), (1, 2), (2, None), (None, 0)]
+
+    @benchmark
+    def test_synchronize_large_lists_by_value(self):
+        # Benchmark:  50k-element Arrays must synchronize in linear time.
+        import time
+        element_count = 50000
+        lhs = ry.comments.CommentedSeq(
+            ["item{}".format(i) for i in range(element_count)])
+        rhs = ry.comments.CommentedSeq(
+            ["item{}".format(i) for i in reversed(range(
+                element_count // 2, element_count + element_count // 2))])
+
+        started = time.perf_counter()
+        syn_pairs = Differ.synchronize_lists_by_value(lhs, rhs)
+        elapsed = time.perf_counter() - started
+
+        assert len(syn_pairs) == element_count + element_count // 2
+        assert syn_pairs[0] == (0, "item0", None, None)
+        assert syn_pairs[element_count // 2] == (
+            element_count // 2, "item{}".format(element_count // 2),
+            element_count - 1, "item{}".format(element_count // 2))
+        assert syn_pairs[element_count] == (
+            None, None, 0,
+            "item{}".format(element_count + element_count // 2 - 1))
+        assert syn_pairs[-1] == (
+            None, None, element_count // 2 - 1,
+            "item{}".format(element_count))
+        assert elapsed < 30
+
+    def test_diff_replaced_lists_by_value(self, quiet_logger):
+        lhs = ry.comments.CommentedMap({"array": ry.comments.CommentedSeq(
+            ["a", "lhs1", "b", "lhs2"])})
+        rhs = ry.comments.CommentedMap({"array": ry.comments.CommentedSeq(
+            ["rhs1", "b", "a", "rhs2", "rhs3"])})
+        differ = Differ(
+            DifferConfig(quiet_logger, SimpleNamespace(arrays="value")),
+            quiet_logger, lhs)
+
+        differ.compare_to(rhs)
+        assert [
+            (entry.action, str(entry.path), entry.lhs)
+            for entry in differ.get_report()
+        ] == [
+            (DiffActions.ADD, "array[0]", None),
+            (DiffActions.SAME, "array[0]", "a"),
+            (DiffActions.CHANGE, "array[3]", "lhs2"),
+            (DiffActions.ADD, "array[4]", None),
+            (DiffActions.DELETE, "array[1]", "lhs1"),
+            (DiffActions.SAME, "array[2]", "b"),
+        ]
+
+    @benchmark
+    def test_diff_large_replaced_lists_by_value(self, quiet_logger):
+        # Benchmark:  every DELETE->ADD pair of a 20k-element Array becomes a
+        # CHANGE without rescanning all prior differences.
+        import time
+        element_count = 20000
+        lhs = ry.comments.CommentedMap({"array": ry.comments.CommentedSeq(
+            ["lhs{}".format(i) for i in range(element_count)])})
+        rhs = ry.comments.CommentedMap({"array": ry.comments.CommentedSeq(
+            ["rhs{}".format(i) for i in range(element_count)])})
+        rhs["array"].append("rhs_extra")
+        differ = Differ(
+            DifferConfig(quiet_logger, SimpleNamespace(arrays="value")),
+            quiet_logger, lhs)
+
+        started = time.perf_counter()
+        differ.compare_to(rhs)
+        elapsed = time.perf_counter() - started
+
+        report = list(differ.get_report())
+        assert len(report) == element_count + 1
+        assert [entry.action for entry in report].count(
+            DiffActions.CHANGE) == element_count
+        assert report[-1].action is DiffActions.ADD
+        assert str(report[0].path) == "array[0]"
+        assert report[0].lhs == "lhs0"
+        assert elapsed < 30
+
+    def test_diff_lists_by_lcs(self, quiet_logger):
+        lhs = ry.comments.CommentedMap({"array": ry.comments.CommentedSeq(
+            ["item{}".format(i) for i in range(10)])})
+        rhs = ry.comments.CommentedMap({"array": ry.comments.CommentedSeq(
+            ["item{}".format(i) for i in range(10)])})
+        rhs["array"].insert(3, "inserted")
+
+        results = {}
+        for mode in ["position", "lcs"]:
+            differ = Differ(
+                DifferConfig(quiet_logger, SimpleNamespace(arrays=mode)),
+                quiet_logger, lhs)
+            differ.compare_to(rhs)
+            results[mode] = [
+                (entry.action, str(entry.path))
+                for entry in differ.get_report()
+                if entry.action is not DiffActions.SAME]
+
+        assert len(results["position"]) == 8
+        assert results["lcs"] == [(DiffActions.ADD, "array[3]")]
+
+    @benchmark
+    def test_diff_large_lists_by_lcs(self, quiet_logger):
+        # Benchmark:  time and memory of each mode after one insertion near
+        # the top of a 10k-element Array.
+        import time
+        import tracemalloc
+        element_count = 10000
+        lhs = ry.comments.CommentedMap({"array": ry.comments.CommentedSeq(
+            ["item{}".format(i) for i in range(element_count)])})
+        rhs = ry.comments.CommentedMap({"array": ry.comments.CommentedSeq(
+            ["item{}".format(i) for i in range(element_count)])})
+        rhs["array"].insert(3, "inserted")
+
+        results = {}
+        for mode in ["position", "value", "lcs"]:
+            differ = Differ(
+                DifferConfig(quiet_logger, SimpleNamespace(arrays=mode)),
+                quiet_logger, lhs)
+            tracemalloc.start()
+            started = time.perf_counter()
+            differ.compare_to(rhs)
+            elapsed = time.perf_counter() - started
+            (_, peak) = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results[mode] = [
+                entry for entry in differ.get_report()
+                if entry.action is not DiffActions.SAME]
+            print("{}:  {:.3f}s, {:.1f}MiB peak, {} differences".format(
+                mode, elapsed, peak / 1048576, len(results[mode])))
+
+        assert len(results["position"]) == element_count - 2
+        assert len(results["lcs"]) == 1
+        assert results["lcs"][0].action is DiffActions.ADD
+        assert str(results["lcs"][0].path) == "array[3]"
+
+    ###
+    # synchronize_lods_by_key
+    ###
+    def test_synchronize_lods_by_inferred_key(self, quiet_logger):
+        lhs = ry.comments.CommentedSeq([
+            ry.comments.CommentedMap({"id": 1, "value": "LHS 1"}),
+            ry.comments.CommentedMap({"value": "LHS keyless"}),
+            ry.comments.CommentedMap({"id": 2, "value": "LHS 2"}),
+            ry.comments.CommentedMap({"id": 3, "value": "LHS 3"}),
+        ])
+        rhs = ry.comments.CommentedSeq([
+            ry.comments.CommentedMap({"id": 3, "value": "RHS 3"}),
+            ry.comments.CommentedMap({"id": 4, "value": "RHS 4"}),
+            ry.comments.CommentedMap({"id": 1, "value": "RHS 1"}),
+        ])
+        differ = Differ(
+            DifferConfig(quiet_logger, SimpleNamespace()), quiet_logger, lhs)
+        assert [
+            (lidx, ridx)
+            for (lidx, _, ridx, _) in differ.synchronize_lods_by_key(
+                YAMLPath("/"), lhs, rhs)
+        ] == [(0, 2), (1, None), (2, None), (3, 0), (None, 1)]
+
+    def test_synchronize_lods_by_custom_key(
+        self, quiet_logger, tmp_path_factory
+    ):
+        config_file = create_temp_yaml_file(tmp_path_factory, """
+[keys]
+/products = sku
+""")
+        lhs = ry.comments.CommentedSeq([
+            ry.comments.CommentedMap({"product": "doodad", "sku": 1}),
+            ry.comments.CommentedMap({"product": "widget", "sku": 2}),
+        ])
+        rhs = ry.comments.CommentedMap({"products": ry.comments.CommentedSeq([
+            ry.comments.CommentedMap({"product": "widget", "sku": 1}),
+            ry.comments.CommentedMap({"product": "doodad", "sku": 2}),
+        ])})
+        differ = Differ(
+            DifferConfig(quiet_logger, SimpleNamespace(config=config_file)),
+            quiet_logger, lhs)
+        differ.config.prepare(rhs)
+        assert [
+            (lidx, ridx)
+            for (lidx, _, ridx, _) in differ.synchronize_lods_by_key(
+                YAMLPath("/products"), lhs, rhs["products"])
+        ] == [(0, 0), (1, 1)]
+
+    def test_synchronize_lods_with_duplicate_keys(self, quiet_logger):
+        lhs = ry.comments.CommentedSeq([
+            ry.comments.CommentedMap({"id": 1, "value": "LHS 1a"}),
+            ry.comments.CommentedMap({"id": 1, "value": "LHS 1b"}),
+            ry.comments.CommentedMap({"id": 2, "value": "LHS 2"}),
+        ])
+        rhs = ry.comments.CommentedSeq([
+            ry.comments.CommentedMap({"id": 1, "value": "RHS 1a"}),
+            ry.comments.CommentedMap({"id": 2, "value": "RHS 2"}),
+            ry.comments.CommentedMap({"id": 1, "value": "RHS 1b"}),
+            ry.comments.CommentedMap({"id": 1, "value": "RHS 1c"}),
+        ])
+        differ = Differ(
+            DifferConfig(quiet_logger, SimpleNamespace()), quiet_logger, lhs)
+        assert [
+            (lidx, ridx)
+            for (lidx, _, ridx, _) in differ.synchronize_lods_by_key(
+                YAMLPath("/"), lhs, rhs)
+        ] == [(0, 0), (1, 2), (2, 1), (None, 3)]
+
+    @benchmark
+    def test_synchronize_large_lods_by_key(self, quiet_logger):
+        # Benchmark:  100k records per side must synchronize in linear time.
+        import time
+        record_count = 100000
+        lhs = ry.comments.CommentedSeq([
+            ry.comments.CommentedMap({"id": i, "value": "LHS {}".format(i)})
+            for i in range(record_count)])
+        rhs = ry.comments.CommentedSeq([
+            ry.comments.CommentedMap({"id": i, "value": "RHS {}".format(i)})
+            for i in reversed(range(
+                record_count // 2, record_count + record_count // 2))])
+        differ = Differ(
+            DifferConfig(quiet_logger, SimpleNamespace()), quiet_logger, lhs)
+
+        started = time.perf_counter()
+        syn_pairs = differ.synchronize_lods_by_key(YAMLPath("/"), lhs, rhs)
+        elapsed = time.perf_counter() - started
+
+        assert len(syn_pairs) == record_count + record_count // 2
+        assert syn_pairs[0][1:] == (lhs[0], None, None)
+        assert syn_pairs[record_count // 2][2:] == (
+            record_count - 1, rhs[record_count - 1])
+        assert syn_pairs[record_count][0:3] == (None, None, 0)
+        assert elapsed < 30
+
+    def test_synchronize_lods_with_non_hash_records(self, quiet_logger):
+        yaml = ry.YAML()
+        lhs = yaml.load('root: [{"id": 3, "v": 1}, {"id": 2, "v": 1}]')
+        rhs = yaml.load('root: [{}, 2]')
+        differ = Differ(
+            DifferConfig(quiet_logger, SimpleNamespace(aoh="deep")),
+            quiet_logger, lhs)
+
+        differ.compare_to(rhs)
+        assert [
+            (entry.action, str(entry.path))
+            for entry in differ.get_report()
+        ] == [
+            (DiffActions.ADD, "root[1]"),
+            (DiffActions.DELETE, "root[0]"),
+            (DiffActions.ADD, "root[0]"),
+            (DiffActions.DELETE, "root[1]"),
+        ]
+
+    ###
+    # stream_compare_to
+    ###
+    def test_stream_compare_to(self, quiet_logger):
+        yaml = ry.YAML()
+        lhs = yaml.load(
+            "key: value\nchanged: lhs\ndeleted: 1\n"
+            "array: [1, 2, 3]\nhash:\n  child: lhs\n")
+        rhs = yaml.load(
+            "key: value\nchanged: rhs\nadded: 2\n"
+            "array: [1, 3, 4]\nhash:\n  child: rhs\n")
+        differ = Differ(
+            DifferConfig(quiet_logger, SimpleNamespace()), quiet_logger, lhs)
+
+        differ.compare_to(rhs)
+        sorted_entries = [
+            (entry.action, str(entry.path), entry.index)
+            for entry in differ.get_report()]
+        streamed_entries = [
+            (entry.action, str(entry.path), entry.index)
+            for entry in differ.stream_compare_to(rhs)]
+
+        assert sorted(streamed_entries, key=str) == sorted(
+            sorted_entries, key=str)
+        assert [
+            (action, path) for (action, path, _) in streamed_entries
+            if action is not DiffActions.SAME
+        ] == [
+            (DiffActions.CHANGE, "changed"),
+            (DiffActions.DELETE, "deleted"),
+            (DiffActions.CHANGE, "array[1]"),
+            (DiffActions.CHANGE, "array[2]"),
+            (DiffActions.CHANGE, "hash.child"),
+            (DiffActions.ADD, "added"),
+        ]
+        assert list(differ.get_report()) == []
+
+    def test_stream_compare_to_is_lazy(self, quiet_logger):
+        lhs = ry.comments.CommentedMap([("first", 1), ("second", 2)])
+        rhs = ry.comments.CommentedMap([("first", 10), ("second", 20)])
+        differ = Differ(
+            DifferConfig(quiet_logger, SimpleNamespace()), quiet_logger, lhs,
+            report_same=False)
+
+        entries = differ.stream_compare_to(rhs)
+        first_entry = next(entries)
+        assert first_entry.action is DiffActions.CHANGE
+        assert str(first_entry.path) == "first"
+
+        # Nothing after the first difference has been compared yet
+        rhs["second"] = 2
+        assert list(entries) == []
+
+    @benchmark
+    def test_stream_large_document(self, quiet_logger):
+        # Benchmark:  the first difference of a 50k-key Hash is available
+        # before the rest of the document is compared.
+        import time
+        key_count = 50000
+        lhs = ry.comments.CommentedMap(
+            ("key{}".format(i), i) for i in range(key_count))
+        rhs = ry.comments.CommentedMap(
+            ("key{}".format(i), i + 1) for i in range(key_count))
+        differ = Differ(
+            DifferConfig(quiet_logger, SimpleNamespace()), quiet_logger, lhs)
+
+        started = time.perf_counter()
+        entries = differ.stream_compare_to(rhs)
+        first_entry = next(entries)
+        first_elapsed = time.perf_counter() - started
+        remaining = sum(1 for _ in entries)
+        elapsed = time.perf_counter() - started
+
+        assert str(first_entry.path) == "key0"
+        assert first_entry.action is DiffActions.CHANGE
+        assert remaining == key_count - 1
+        assert first_elapsed < elapsed
+        assert elapsed < 30
+
+    ###
+    # Identical subtrees
+    ###
+    def test_tagged_scalars_compare_by_value(self, quiet_logger):
+        yaml = ry.YAML()
+        lhs = yaml.load("same: !tag value\nretagged: !tag value\n")
+        rhs = yaml.load("same: !tag value\nretagged: !other value\n")
+        differ = Differ(
+            DifferConfig(quiet_logger, SimpleNamespace()), quiet_logger, lhs)
+        differ.compare_to(rhs)
+        assert [
+            (entry.action, str(entry.path))
+            for entry in differ.get_report()
+        ] == [
+            (DiffActions.SAME, "same"),
+            (DiffActions.CHANGE, "retagged"),
+        ]
+
+    @pytest.mark.parametrize("lhs_content,rhs_content", [
+        ("hash: !tag {key: value}\n", "hash: !other {key: value}\n"),
+        ("hash: {key: !tag value}\n", "hash: {key: !other value}\n"),
+        ("array: !tag [value]\n", "array: !other [value]\n"),
+        ("array: [1, 2]\n", "array: [1, 2.0]\n"),
+        ("array: [.nan]\n", "array: [.nan]\n"),
+        ("aoh: [{id: 1, key: 1}]\n", "aoh: [{id: 1, key: true}]\n"),
+    ])
+    def test_skip_identical_subtrees(
+        self, quiet_logger, lhs_content, rhs_content
+    ):
+        yaml = ry.YAML()
+        lhs = yaml.load(lhs_content + "identical: {a: [1, {b: !tag c}]}\n")
+        rhs = yaml.load(rhs_content + "identical: {a: [1, {b: !tag c}]}\n")
+        full_differ = Differ(
+            DifferConfig(quiet_logger, SimpleNamespace()), quiet_logger, lhs)
+        full_differ.compare_to(rhs)
+        fast_differ = Differ(
+            DifferConfig(quiet_logger, SimpleNamespace()), quiet_logger, lhs,
+            report_same=False)
+        fast_differ.compare_to(rhs)
+
+        full_report = [
+            (entry.action, str(entry.path))
+            for entry in full_differ.get_report()]
+        fast_report = [
+            (entry.action, str(entry.path))
+            for entry in fast_differ.get_report()]
+        assert (DiffActions.SAME, "identical.a[1].b") in full_report
+        assert fast_report == [
+            entry for entry in full_report if entry[0] is not DiffActions.SAME]
+
+    @benchmark
+    def test_skip_identical_subtrees_large_document(self, quiet_logger):
+        # Benchmark:  a near-identical document with 100k leaf nodes must
+        # compare far faster when SAME entries are not wanted.
+        import time
+        def build_document(changed_value):
+            return ry.comments.CommentedMap(
+                ("service{}".format(i), ry.comments.CommentedMap([
+                    ("name", "service{}".format(i)),
+                    ("ports", ry.comments.CommentedSeq([80, 443])),
+                    ("settings", ry.comments.CommentedMap(
+                        ("setting{}".format(j),
+                         changed_value if (i, j) == (500, 5) else j)
+                        for j in range(7))),
+                ]))
+                for i in range(1000))
+        lhs = build_document("lhs")
+        rhs = build_document("rhs")
+
+        full_differ = Differ(
+            DifferConfig(quiet_logger, SimpleNamespace()), quiet_logger, lhs)
+        started = time.perf_counter()
+        full_differ.compare_to(rhs)
+        full_elapsed = time.perf_counter() - started
+
+        fast_differ = Differ(
+            DifferConfig(quiet_logger, SimpleNamespace()), quiet_logger, lhs,
+            report_same=False)
+        started = time.perf_counter()
+        fast_differ.compare_to(rhs)
+        fast_elapsed = time.perf_counter() - started
+
+        full_report = list(full_differ.get_report())
+        fast_report = list(fast_differ.get_report())
+        assert len(full_report) == 10000
+        assert len(fast_report) == 1
+        assert str(fast_report[0].path) == "service500.settings.setting5"
+        assert fast_report[0].action is DiffActions.CHANGE
+        assert fast_elapsed < full_elapsed
+        assert full_elapsed < 30
+
+    ###
+    # compare_each
+    ###
+    def test_compare_each(self, quiet_logger):
+        yaml = ry.YAML()
+        baseline = yaml.load("key: value\nhash: {child: 1}\narray: [1, 2]\n")
+        targets = [
+            yaml.load("key: value\nhash: {child: 1}\narray: [1, 2]\n"),
+            yaml.load("key: other\nhash: {child: 2}\narray: [1, 2]\n"),
+            yaml.load("key: value\nhash: {}\narray: [1, 2, 3]\n"),
+        ]
+        differ = Differ(
+            DifferConfig(quiet_logger, SimpleNamespace()), quiet_logger,
+            baseline, report_same=False)
+
+        reports = [
+            [(entry.action, str(entry.path)) for entry in report]
+            for report in differ.compare_each(targets)]
+
+        assert reports == [
+            [],
+            [(DiffActions.CHANGE, "key"), (DiffActions.CHANGE, "hash.child")],
+            [(DiffActions.DELETE, "hash.child"), (DiffActions.ADD, "array[2]")],
+        ]
+        for (target, report) in zip(targets, reports):
+            fresh_differ = Differ(
+                DifferConfig(quiet_logger, SimpleNamespace()), quiet_logger,
+                baseline, report_same=False)
+            fresh_differ.compare_to(target)
+            assert report == [
+                (entry.action, str(entry.path))
+                for entry in fresh_differ.get_report()]
@@ -13,6 +13,7 @@ class Test_differ_enums_aohdiffopts():
 			"KEY",
 			"POSITION",
 			"VALUE",
+			"LCS",
 		]
 
 	def test_get_choices(self):
@@ -20,6 +21,7 @@ class Test_differ_enums_aohdiffopts():
 			"deep",
 			"dpos",
 			"key",
+			"lcs",
 			"position",
 			"value",
 		]
@@ -28,6 +30,7 @@ class Test_differ_enums_aohdiffopts():
 		("DEEP", AoHDiffOpts.DEEP),
 		("DPOS", AoHDiffOpts.DPOS),
 		("KEY", AoHDiffOpts.KEY),
+		("LCS", AoHDiffOpts.LCS),
 		("POSITION", AoHDiffOpts.POSITION),
 		("VALUE", AoHDiffOpts.VALUE),
 	])
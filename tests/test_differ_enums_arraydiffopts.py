@@ -10,15 +10,18 @@ class Test_differ_enums_arraydiffopts():
 		assert ArrayDiffOpts.get_names() == [
 			"POSITION",
 			"VALUE",
+			"LCS",
 		]
 
 	def test_get_choices(self):
 		assert ArrayDiffOpts.get_choices() == [
+			"lcs",
 			"position",
 			"value",
 		]
 
 	@pytest.mark.parametrize("input,output", [
+		("LCS", ArrayDiffOpts.LCS),
 		("POSITION", ArrayDiffOpts.POSITION),
 		("VALUE", ArrayDiffOpts.VALUE),
 	])
@@ -0,0 +1,51 @@
+import pytest
+
+import ruamel.yaml as ry
+
+from yamlpath.differ import ListSynchronizer
+
+
+class Test_differ_ListSynchronizer():
+    """Tests for the ListSynchronizer class."""
+
+    ###
+    # synchronize_lists_by_lcs
+    ###
+    def test_synchronize_lists_by_lcs(self):
+        lhs = ry.comments.CommentedSeq(["a", "b", "c", "d", "e"])
+        rhs = ry.comments.CommentedSeq(["x", "a", "c", "y", "z", "e"])
+        assert ListSynchronizer.synchronize_lists_by_lcs(lhs, rhs) == [
+            (None, None, 0, "x"),
+            (0, "a", 1, "a"),
+            (1, "b", None, None),
+            (2, "c", 2, "c"),
+            (3, "d", 3, "y"),
+            (None, None, 4, "z"),
+            (4, "e", 5, "e"),
+        ]
+
+    def test_synchronize_lists_by_lcs_null_elements(self):
+        lhs = ry.comments.CommentedSeq([None, "a"])
+        rhs = ry.comments.CommentedSeq(["a", None])
+        assert ListSynchronizer.synchronize_lists_by_lcs(lhs, rhs) == [
+            (0, None, None, None),
+            (1, "a", 0, "a"),
+            (None, None, 1, None),
+        ]
+
+    @pytest.mark.parametrize("lhs,rhs,lcs_len", [
+        ([], [], 0),
+        ([1, 2, 3], [], 0),
+        ([], [1, 2, 3], 0),
+        ([1, 2, 3], [4, 5, 6], 0),
+        ([1, 2, 3, 4, 1], [3, 4, 1, 2, 1, 3], 3),
+        ([0, 1, 0, 2, 0, 3], [1, 0, 2, 0, 3, 0, 4], 5),
+        (list("ABCABBA"), list("CBABAC"), 4),
+    ])
+    def test_get_lcs_matches(self, lhs, rhs, lcs_len):
+        matches = ListSynchronizer._get_lcs_matches(lhs, rhs)
+        assert len(matches) == lcs_len
+        for (lhs_idx, rhs_idx) in matches:
+            assert lhs[lhs_idx] == rhs[rhs_idx]
+        for (prev, curr) in zip(matches, matches[1:]):
+            assert prev[0] < curr[0] and prev[1] < curr[1]
@@ -0,0 +1,69 @@
+import pickle
+
+import pytest
+
+from yamlpath.eyaml import DecryptionCache
+
+
+class Test_eyaml_DecryptionCache():
+    """Tests for the DecryptionCache class."""
+
+    def test_get_and_put(self):
+        cache = DecryptionCache()
+        key = DecryptionCache.get_key("ENC[value]", ["eyaml", None, None])
+        assert cache.get(key) is None
+        cache.put(key, "plain text")
+        assert cache.get(key) == "plain text"
+        assert 1 == len(cache)
+
+    @pytest.mark.parametrize("lhs_value,lhs_identity,rhs_value,rhs_identity", [
+        ("ENC[one]", ["eyaml", None, None], "ENC[two]", ["eyaml", None, None]),
+        ("ENC[one]", ["eyaml", None, None], "ENC[one]", ["other", None, None]),
+        ("ENC[one]", ["eyaml", "pub", "priv"], "ENC[one]", ["eyaml", "pub", "other"]),
+        ("ENC[one]", ["eyaml", None, "x"], "ENC[one]", ["eyaml", "x", None]),
+    ])
+    def test_keys_differ(self, lhs_value, lhs_identity, rhs_value, rhs_identity):
+        assert (DecryptionCache.get_key(lhs_value, lhs_identity)
+                != DecryptionCache.get_key(rhs_value, rhs_identity))
+
+    def test_evict_least_recently_used(self):
+        cache = DecryptionCache(max_entries=2)
+        cache.put("a", "1")
+        cache.put("b", "2")
+        assert cache.get("a") == "1"
+        cache.put("c", "3")
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        assert cache.get("c") == "3"
+        assert 2 == len(cache)
+
+    def test_clear(self):
+        cache = DecryptionCache()
+        cache.put("a", "1")
+        cache.clear()
+        assert cache.get("a") is None
+        assert 0 == len(cache)
+
+    def test_disable(self):
+        cache = DecryptionCache()
+        cache.put("a", "1")
+        cache.enabled = False
+        assert 0 == len(cache)
+        cache.put("a", "1")
+        assert cache.get("a") is None
+
+        cache.enabled = True
+        cache.put("a", "1")
+        assert cache.get("a") == "1"
+
+    def test_pickle_omits_entries(self):
+        cache = DecryptionCache(max_entries=5)
+        cache.put("a", "secret plain text")
+        pickled = pickle.dumps(cache)
+        assert b"secret plain text" not in pickled
+
+        restored = pickle.loads(pickled)
+        assert 0 == len(restored)
+        assert 5 == restored.max_entries
+        restored.put("b", "2")
+        assert restored.get("b") == "2"
@@ -1,18 +1,25 @@
+import threading
+import time
+
 import pytest
 
 from subprocess import run, CalledProcessError
 
 from ruamel.yaml import YAML
+from ruamel.yaml.comments import CommentedMap, CommentedSeq
 
 import yamlpath.patches
 from yamlpath.func import unwrap_node_coords
 from yamlpath.enums import YAMLValueFormats
 from yamlpath.eyaml.enums import EYAMLOutputFormats
-from yamlpath.eyaml import EYAMLProcessor
+from yamlpath.eyaml import DecryptionCache, EYAMLProcessor
 from yamlpath.wrappers import ConsolePrinter
 from yamlpath.eyaml.exceptions import EYAMLCommandException
+from yamlpath import YAMLPath
 
-from tests.conftest import requireseyaml, quiet_logger, old_eyaml_keys
+from tests.conftest import (
+    benchmark, requireseyaml, quiet_logger, old_eyaml_keys, fake_eyaml,
+    fake_eyaml_value)
 
 
 @requireseyaml
@@ -98,7 +105,7 @@ aliased::secrets:
 
 @pytest.fixture
 def force_subprocess_run_cpe(monkeypatch):
-    import yamlpath.eyaml.eyamlprocessor as break_module
+    import yamlpath.eyaml.providers.subprocesseyamlprovider as break_module
 
     def fake_run(*args, **kwargs):
         raise CalledProcessError(42, "bad eyaml")
@@ -134,6 +141,42 @@ class Test_eyaml_EYAMLProcessor():
 
         assert actual == expected
 
+    def test_find_eyaml_nodes(self, quiet_logger, eyamldata_f):
+        processor = EYAMLProcessor(quiet_logger, eyamldata_f)
+        found = list(processor.find_eyaml_nodes())
+        assert [str(coords.path) for coords in found] == [
+            "aliases[&secretIdentity]",
+            "aliases[&secretPhrase]",
+            "anchored::secrets.aliased_values.ident",
+            "anchored::secrets.aliased_values.phrase",
+            "anchored::secrets.array_of_array_idents[0][0]",
+            "aliased::secrets.novel_values.ident",
+            "aliased::secrets.novel_values.phrase",
+            "aliased::secrets.string_values.ident",
+            "aliased::secrets.string_values.phrase",
+        ]
+        for coords in found:
+            assert coords.parent[coords.parentref] is coords.node
+
+        # Aliases share the node of their Anchor
+        assert found[2].node is found[0].node
+        assert found[3].node is found[1].node
+
+    def test_find_eyaml_nodes_searches_collections_once(self, quiet_logger):
+        yaml = YAML()
+        data = yaml.load("""---
+base: &base
+  secret: {}
+again: *base
+merged:
+  <<: *base
+""".format(fake_eyaml_value("secret")))
+        processor = EYAMLProcessor(quiet_logger, data)
+        assert [str(coords.path) for coords
+                in processor.find_eyaml_nodes()] == ["base.secret"]
+        assert [str(path) for path in processor.find_eyaml_paths()] == [
+            "base.secret", "again.secret"]
+
     @requireseyaml
     @pytest.mark.parametrize("yaml_path,compare", [
         ("aliases[&secretIdentity]", "This is not the identity you are looking for."),
@@ -184,6 +227,86 @@ class Test_eyaml_EYAMLProcessor():
     def test_none_eyaml_value(self):
         assert False == EYAMLProcessor.is_eyaml_value(None)
 
+    @pytest.mark.parametrize("value,is_eyaml", [
+        ("ENC[PKCS7,abc]", True),
+        ("ENC[", True),
+        ("  ENC[PKCS7,abc]", True),
+        ("\n  ENC[PKCS7,abc]", True),
+        ("E N\nC [PKCS7,abc]", True),
+        ("ENC", False),
+        ("ENC(PKCS7,abc)", False),
+        ("ENCRYPTED", False),
+        ("\tENC[PKCS7,abc]", False),
+        ("  \n ", False),
+        ("", False),
+        ("plain ENC[PKCS7,abc]", False),
+        (42, False),
+    ])
+    def test_is_eyaml_value(self, value, is_eyaml):
+        assert EYAMLProcessor.is_eyaml_value(value) == is_eyaml
+        if isinstance(value, str):
+            # Same result as stripping all formatting whitespace
+            assert is_eyaml == value.replace("\n", "").replace(
+                " ", "").startswith("ENC[")
+
+    def test_eyaml_executable_is_resolved_once(self, quiet_logger, fake_eyaml, monkeypatch):
+        import yamlpath.eyaml.eyamlprocessor as spy_module
+        (binary, _) = fake_eyaml
+        lookups = []
+        monkeypatch.setattr(
+            spy_module, "which", lambda name: lookups.append(name) or binary)
+
+        processor = EYAMLProcessor(quiet_logger, None, binary="fake-eyaml")
+        values = [fake_eyaml_value("secret {}".format(i)) for i in range(3)]
+        for value in values:
+            processor.decrypt_eyaml(value)
+        processor.encrypt_many(["one", "two"])
+        assert lookups == ["fake-eyaml"]
+        assert processor.eyaml == binary
+
+        # A new binary setting is resolved anew
+        processor.eyaml = "other-eyaml"
+        assert processor.resolve_eyaml_executable() == binary
+        processor.eyaml = None
+        assert processor.resolve_eyaml_executable() is None
+        assert lookups == ["fake-eyaml", "other-eyaml"]
+
+    def test_find_eyaml_paths_in_sequences(self, quiet_logger):
+        data = CommentedMap()
+        for group_id in range(4):
+            data["group{}".format(group_id)] = CommentedSeq(
+                " value {} of group {}".format(scalar_id, group_id)
+                for scalar_id in range(10))
+        for group_id in range(0, 4, 2):
+            data["group{}".format(group_id)][7] = "\n  {}".format(
+                fake_eyaml_value("secret {}".format(group_id)))
+        processor = EYAMLProcessor(quiet_logger, data)
+        assert [str(path) for path in processor.find_eyaml_paths()] == [
+            "group0[7]", "group2[7]"]
+
+    @benchmark
+    def test_find_eyaml_benchmark(self, quiet_logger):
+        # One million scalars, a few of them encrypted
+        data = CommentedMap()
+        for group_id in range(1000):
+            group = CommentedSeq(
+                " value {} of group {}".format(scalar_id, group_id)
+                for scalar_id in range(1000))
+            data["group{}".format(group_id)] = group
+        for group_id in range(0, 1000, 250):
+            data["group{}".format(group_id)][7] = "\n  {}".format(
+                fake_eyaml_value("secret {}".format(group_id)))
+        processor = EYAMLProcessor(quiet_logger, data)
+
+        started = time.perf_counter()
+        paths = [str(path) for path in processor.find_eyaml_paths()]
+        elapsed = time.perf_counter() - started
+
+        print("Scanned one million scalars in {:.3f}s".format(elapsed))
+        assert paths == [
+            "group{}[7]".format(group_id) for group_id in range(0, 1000, 250)]
+        assert elapsed < 30
+
     @pytest.mark.parametrize("exe", [
         ("/no/such/file/anywhere"),
         ("this-file-does-not-exist"),
@@ -248,3 +371,186 @@ class Test_eyaml_EYAMLProcessor():
     @requireseyaml
     def test_non_executable(self, old_eyaml_keys, force_no_access):
         assert EYAMLProcessor.get_eyaml_executable(str(old_eyaml_keys[0])) is None
+
+    def test_decrypt_many_runs_eyaml_once(self, quiet_logger, fake_eyaml):
+        (binary, runs_log) = fake_eyaml
+        processor = EYAMLProcessor(quiet_logger, None, binary=binary)
+        block_value = fake_eyaml_value("folded secret")
+        block_value = "\n".join(
+            block_value[i:i + 16] for i in range(0, len(block_value), 16))
+        values = [
+            fake_eyaml_value("first secret"),
+            "not encrypted",
+            block_value,
+            fake_eyaml_value("first secret"),
+            fake_eyaml_value("multi\nline secret"),
+            None,
+        ]
+        assert processor.decrypt_many(values) == [
+            "first secret",
+            "not encrypted",
+            "folded secret",
+            "first secret",
+            "multi\nline secret",
+            None,
+        ]
+        assert runs_log.read_text() == "decrypt\n"
+
+    def test_decrypt_many_without_eyaml_values(self, quiet_logger, fake_eyaml):
+        (binary, runs_log) = fake_eyaml
+        processor = EYAMLProcessor(quiet_logger, None, binary=binary)
+        assert processor.decrypt_many(["plain", 5]) == ["plain", 5]
+        assert runs_log.read_text() == ""
+
+    def test_decrypt_many_bad_value(self, quiet_logger, fake_eyaml):
+        (binary, runs_log) = fake_eyaml
+        processor = EYAMLProcessor(quiet_logger, None, binary=binary)
+        with pytest.raises(EYAMLCommandException) as ex:
+            processor.decrypt_many([
+                fake_eyaml_value("good secret"), "ENC[corrupt]"])
+        assert -1 < str(ex.value).find("exit code")
+        assert runs_log.read_text() == "decrypt\ndecrypt\ndecrypt\n"
+
+    def test_decrypt_many_without_eyaml(self, quiet_logger):
+        processor = EYAMLProcessor(quiet_logger, None)
+        processor.eyaml = None
+        with pytest.raises(EYAMLCommandException):
+            processor.decrypt_many(["ENC[one]", "ENC[two]"])
+
+    def test_get_eyaml_values_in_bulk(self, quiet_logger, fake_eyaml):
+        (binary, runs_log) = fake_eyaml
+        data = YAML().load("""---
+secrets:
+  - {}
+  - {}
+  - {}
+""".format(*[fake_eyaml_value("secret {}".format(i)) for i in range(3)]))
+        processor = EYAMLProcessor(quiet_logger, data, binary=binary)
+        assert list(processor.get_eyaml_values(
+            YAMLPath("secrets[.^ENC]"), mustexist=True)) == [
+                "secret 0", "secret 1", "secret 2"]
+        assert runs_log.read_text() == "decrypt\n"
+
+    def test_decrypt_all(self, quiet_logger, fake_eyaml):
+        (binary, runs_log) = fake_eyaml
+        data = YAML().load("""---
+anchored: &secret {}
+aliased: *secret
+nested:
+  - plain
+  - inner: {}
+""".format(fake_eyaml_value("anchored"), fake_eyaml_value("inner")))
+        processor = EYAMLProcessor(quiet_logger, data, binary=binary)
+        assert processor.decrypt_all() == {
+            fake_eyaml_value("anchored"): "anchored",
+            fake_eyaml_value("inner"): "inner",
+        }
+        assert runs_log.read_text() == "decrypt\n"
+
+    def test_encrypt_many_concurrently(self, quiet_logger, fake_eyaml):
+        (binary, runs_log) = fake_eyaml
+        processor = EYAMLProcessor(quiet_logger, None, binary=binary, jobs=4)
+        values = ["secret {}".format(i) for i in range(10)]
+        values.append(fake_eyaml_value("already encrypted"))
+        assert processor.encrypt_many(values) == [
+            fake_eyaml_value(value) for value in values[:-1]
+        ] + [fake_eyaml_value("already encrypted")]
+        assert runs_log.read_text() == "encrypt\n" * 10
+
+    def test_encrypt_many_calledprocesserror(self, quiet_logger, fake_eyaml, force_subprocess_run_cpe):
+        processor = EYAMLProcessor(
+            quiet_logger, None, binary=fake_eyaml[0], jobs=3)
+        with pytest.raises(EYAMLCommandException) as ex:
+            processor.encrypt_many(["one", "two", "three"])
+        assert -1 < str(ex.value).find("exit code:  42")
+
+    def test_decrypt_many_concurrently_without_batch(self, quiet_logger, fake_eyaml, monkeypatch):
+        (binary, runs_log) = fake_eyaml
+        processor = EYAMLProcessor(quiet_logger, None, binary=binary, jobs=4)
+        monkeypatch.setattr(
+            processor.provider, "decrypt_batch", lambda proc, values: None)
+        values = [fake_eyaml_value("secret {}".format(i)) for i in range(6)]
+        assert processor.decrypt_many(values) == [
+            "secret {}".format(i) for i in range(6)]
+        assert runs_log.read_text() == "decrypt\n" * 6
+
+    def test_map_concurrently_is_bounded_and_ordered(self, quiet_logger):
+        lock = threading.Lock()
+        running = [0]
+        peak = [0]
+
+        def slow_square(value):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+            return value * value
+
+        processor = EYAMLProcessor(quiet_logger, None, jobs=3)
+        assert processor._map_concurrently(slow_square, list(range(12))) == [
+            value * value for value in range(12)]
+        assert 1 < peak[0] <= 3
+
+    def test_cache_decryptions(self, quiet_logger, fake_eyaml):
+        (binary, runs_log) = fake_eyaml
+        cache = DecryptionCache()
+        processor = EYAMLProcessor(
+            quiet_logger, None, binary=binary, decryption_cache=cache)
+        value = fake_eyaml_value("cached secret")
+        assert processor.decrypt_eyaml(value) == "cached secret"
+        assert processor.decrypt_eyaml(value.replace(",", ",\n")) == "cached secret"
+        assert processor.decrypt_many([value, fake_eyaml_value("other")]) == [
+            "cached secret", "other"]
+        assert processor.decrypt_many([fake_eyaml_value("other"), value]) == [
+            "other", "cached secret"]
+        assert runs_log.read_text() == "decrypt\n" * 2
+        assert 2 == len(cache)
+
+    def test_cache_by_key_identity(self, quiet_logger, fake_eyaml, tmp_path):
+        (binary, runs_log) = fake_eyaml
+        key_file = tmp_path / "private_key.pkcs7.pem"
+        key_file.write_text("old key")
+        processor = EYAMLProcessor(
+            quiet_logger, None, binary=binary, privatekey=str(key_file),
+            publickey=str(key_file), decryption_cache=DecryptionCache())
+        value = fake_eyaml_value("secret")
+        processor.decrypt_eyaml(value)
+        processor.decrypt_eyaml(value)
+        assert runs_log.read_text() == "decrypt\n"
+
+        # Replacing the key file invalidates its decryptions
+        key_file.write_text("a new, longer key")
+        processor.decrypt_eyaml(value)
+        assert runs_log.read_text() == "decrypt\n" * 2
+
+        # As does using another key file
+        processor.privatekey = None
+        processor.decrypt_eyaml(value)
+        assert runs_log.read_text() == "decrypt\n" * 3
+
+    def test_disable_cache(self, quiet_logger, fake_eyaml):
+        (binary, runs_log) = fake_eyaml
+        cache = DecryptionCache(enabled=False)
+        processor = EYAMLProcessor(
+            quiet_logger, None, binary=binary, decryption_cache=cache)
+        value = fake_eyaml_value("uncached secret")
+        processor.decrypt_eyaml(value)
+        processor.decrypt_many([value, value])
+        assert runs_log.read_text() == "decrypt\n" * 2
+        assert 0 == len(cache)
+
+    def test_shared_cache(self, quiet_logger, fake_eyaml):
+        (binary, runs_log) = fake_eyaml
+        value = fake_eyaml_value("shared secret")
+        try:
+            EYAMLProcessor(quiet_logger, None, binary=binary).decrypt_eyaml(value)
+            EYAMLProcessor(quiet_logger, None, binary=binary).decrypt_eyaml(value)
+            assert runs_log.read_text() == "decrypt\n"
+
+            EYAMLProcessor.decryption_cache.clear()
+            EYAMLProcessor(quiet_logger, None, binary=binary).decrypt_eyaml(value)
+            assert runs_log.read_text() == "decrypt\n" * 2
+        finally:
+            EYAMLProcessor.decryption_cache.clear()
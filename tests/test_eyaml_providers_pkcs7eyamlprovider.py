@@ -0,0 +1,222 @@
+import os
+import time
+
+import pytest
+
+from yamlpath.eyaml.enums import EYAMLOutputFormats
+from yamlpath.eyaml import DecryptionCache, EYAMLProcessor
+from yamlpath.eyaml.exceptions import EYAMLCommandException
+from yamlpath.eyaml.providers import (
+    PKCS7EYAMLProvider, SubprocessEYAMLProvider)
+
+from tests.conftest import (
+    benchmark, requireseyaml, requirespkcs7, quiet_logger, old_eyaml_keys,
+    fake_eyaml_value)
+
+
+# Values encrypted by the eyaml command using the old_eyaml_keys fixture
+SECRET_IDENTITY = """ENC[PKCS7,MIIBmQYJKoZIhvcNAQcDoIIBijCCAYYCAQAxggEhMIIBHQIBADAFMAACAQEw
+    DQYJKoZIhvcNAQEBBQAEggEAUVX4h0PQVnxj5niYRvDPce/TisckEBqkOOcL
+    ukGr+AFewRfLQ03zMUcr13jS5w7N6K9TIMPyc0QIvzL82a6jWpNAB7kFD+Ua
+    lQcNwFIERYbo3SVn5+r8GTPzS82z59icEgFeL1ChNkL/vRYgys8IJrrJC/uS
+    6QQ463hspwF2JyzUF7LM9Jc1EyGuJ1uektj/6jLxnYINrMazC61vb92++2Bk
+    eMyFRZyCpJ/0ooHvhtF8ZxlLujPbgaUFCRpCxpXIYOGeTcrqgCZzkU3eUv2r
+    PcCqlxHMOjN2SUXBY1pz8ApqErJ9/x0H9lZvD02XYclAMIWb8jouWJA0LaQ0
+    Vvji7zBcBgkqhkiG9w0BBwEwHQYJYIZIAWUDBAEqBBBVTmGQjl06z3JmnY65
+    2STRgDB+D8ySgg5OezkWVRCWXyaei2yeLx4NhKUftXz1G4vbM2rCkFd5Unps
+    u30g09oF92k=]
+"""
+STRING_IDENT = "ENC[PKCS7,MIIBygYJKoZIhvcNAQcDoIIBuzCCAbcCAQAxggEhMIIBHQIBADAFMAACAQEwDQYJKoZIhvcNAQEBBQAEggEADFShQa5BcW0ctXJ6KGiadZYB2hPJrkO6tpOjz3qJzC6zuOrsL80NGOt9njDSEDQhpwvWHaREYJiv4WdBTdRuS2wVkxev/xDMCJrtrTSZ8aFZ2rFy7bkqBx5qiklOtgX2s9jUwzZ1y6YP7HbrBO2d3tO0Df79FvmcgwQOVRUk03BTczbA3xQc1Y50CBoS2d1VE8UxnSUUij3J/tOmugL9QkdSvBIyHwiKiy6brGgwaU1ddGPLMFdRXYN/gpyIbG595YhwTQfDWMp/2gBA7KZf941QJiIvxvq4LoYInNyBK+qTyaVmRRhDTxC4Cs0WfFlkPTkUdGu/GBc32+UDGwDOpTCBjAYJKoZIhvcNAQcBMB0GCWCGSAFlAwQBKgQQ/Ox/sWRra4DBDVh5a4QTD4Bg8v37JkY8S0fNbG/Dq5lRCz7/iQW7c1/f0JfRVIi7qTZfTRElrJo/+/o/SWq6bsj8eUA3UjooR07L0gerjOmd2p1kQQlZ1vEukbF/pnuptS07Gdrs4WlN/6KBIEJ//0Rc]"
+STRING_PHRASE = "ENC[PKCS7,MIIBqQYJKoZIhvcNAQcDoIIBmjCCAZYCAQAxggEhMIIBHQIBADAFMAACAQEwDQYJKoZIhvcNAQEBBQAEggEAR4DfxkRrYAHFQv97lXvaMyxy2iygBWgXWpKUBskCXbUAU0AZ56dsJS00ibVoRNpBoOkIwVN67G7/z084YA+Oqsg4Tw3NIIek14xChqL9m4ehtv1iMMutPM97wF2Yn2JRs63wKSN4l3nmTp/TFpko5rwj1rKap72mpDwrjJEWwRf4nzcdIzp6a7uWcBUVtG09Cu3VLUtoeAtKsIXVhMAZ2r/ozCSAbIQsFKiRPi2I8fL0ovhnmOXAmuB3eRStMDuGey0vCGYtFvWsmBoXkztIlfHB7/oXUJ5ABgu8D+9JmeXYQA4TjdL6gcQA+cNq9otvorTXnbNLgaRBCGFAqTvMhDBsBgkqhkiG9w0BBwEwHQYJYIZIAWUDBAEqBBCw5QXmetCPTaxcpJWAefs+gEDo1hDNBXPFVhtvqqXUzicYZVxDADp2aUo/AdchuG15+8ic7K01aCdL4qkAtyx4HM16Hz0WVYIeiFyUgpCLY1EA]"
+
+FIXTURE_SECRETS = [
+    (SECRET_IDENTITY, "This is not the identity you are looking for."),
+    (STRING_IDENT, "When strung together, this jewelry of precious stones"
+        " also has a sexual connotation."),
+    (STRING_PHRASE, "This phrase describes a lengthy tirade of insults run"
+        " together."),
+]
+
+
+def get_processor(logger, keys, provider):
+    return EYAMLProcessor(
+        logger, None, privatekey=str(keys[0]), publickey=str(keys[1]),
+        provider=provider, decryption_cache=DecryptionCache(enabled=False))
+
+
+@requirespkcs7
+class Test_eyaml_providers_PKCS7EYAMLProvider():
+    def test_is_available(self):
+        assert PKCS7EYAMLProvider.is_available()
+
+    def test_unavailable(self, monkeypatch):
+        import yamlpath.eyaml.providers.pkcs7eyamlprovider as break_module
+        monkeypatch.setattr(break_module, "HAS_PKCS7", False)
+        with pytest.raises(EYAMLCommandException) as ex:
+            PKCS7EYAMLProvider()
+        assert -1 < str(ex.value).find("requires the cryptography package")
+
+    @pytest.mark.parametrize("value,plain_text", FIXTURE_SECRETS)
+    def test_decrypt_fixture_values(self, quiet_logger, old_eyaml_keys, value, plain_text):
+        processor = get_processor(
+            quiet_logger, old_eyaml_keys, PKCS7EYAMLProvider())
+        assert processor.decrypt_eyaml(value) == plain_text
+
+    def test_decrypt_many(self, quiet_logger, old_eyaml_keys):
+        processor = get_processor(
+            quiet_logger, old_eyaml_keys, PKCS7EYAMLProvider())
+        values = [value for (value, _) in FIXTURE_SECRETS]
+        assert processor.decrypt_many(values + ["plain"]) == [
+            plain_text for (_, plain_text) in FIXTURE_SECRETS] + ["plain"]
+
+    @pytest.mark.parametrize("output", [
+        EYAMLOutputFormats.STRING,
+        EYAMLOutputFormats.BLOCK,
+    ])
+    def test_encrypt_round_trip(self, quiet_logger, old_eyaml_keys, output):
+        processor = get_processor(
+            quiet_logger, old_eyaml_keys, PKCS7EYAMLProvider())
+        encrypted = processor.encrypt_eyaml("A secret, with a space ", output)
+        assert encrypted.startswith("ENC[PKCS7,")
+        assert EYAMLProcessor.is_eyaml_value(encrypted)
+        if output is EYAMLOutputFormats.BLOCK:
+            assert encrypted.endswith("]\n")
+            assert all(len(line) <= 60 for line in
+                       encrypted[len("ENC[PKCS7,"):-2].splitlines())
+        else:
+            assert encrypted.endswith("]")
+            assert "\n" not in encrypted
+
+        # Like the eyaml command, trailing whitespace is not preserved
+        assert processor.decrypt_eyaml(encrypted) == "A secret, with a space"
+
+    def test_decrypt_corrupt_value(self, quiet_logger, old_eyaml_keys):
+        processor = get_processor(
+            quiet_logger, old_eyaml_keys, PKCS7EYAMLProvider())
+        with pytest.raises(EYAMLCommandException) as ex:
+            processor.decrypt_eyaml("ENC[PKCS7,bm90IGVuY3J5cHRlZA==]")
+        assert -1 < str(ex.value).find("Unable to decrypt value!")
+
+    def test_decrypt_other_scheme(self, quiet_logger, old_eyaml_keys):
+        processor = get_processor(
+            quiet_logger, old_eyaml_keys, PKCS7EYAMLProvider())
+        with pytest.raises(EYAMLCommandException) as ex:
+            processor.decrypt_eyaml(fake_eyaml_value("secret"))
+        assert -1 < str(ex.value).find("Only PKCS7 EYAML values")
+
+    def test_decrypt_batch_with_corrupt_value(self, quiet_logger, old_eyaml_keys):
+        processor = get_processor(
+            quiet_logger, old_eyaml_keys, PKCS7EYAMLProvider())
+        assert processor.provider.decrypt_batch(
+            processor, [STRING_IDENT, "ENC[PKCS7,bm90IGVuY3J5cHRlZA==]"]
+        ) is None
+        with pytest.raises(EYAMLCommandException) as ex:
+            processor.decrypt_many(
+                [STRING_IDENT, "ENC[PKCS7,bm90IGVuY3J5cHRlZA==]"])
+        assert -1 < str(ex.value).find("Unable to decrypt value!")
+
+    def test_missing_key(self, quiet_logger, tmp_path):
+        processor = get_processor(
+            quiet_logger,
+            (tmp_path / "no-private.pem", tmp_path / "no-public.pem"),
+            PKCS7EYAMLProvider())
+        with pytest.raises(EYAMLCommandException) as ex:
+            processor.encrypt_eyaml("secret")
+        assert -1 < str(ex.value).find("Unable to load EYAML key")
+
+    def test_keys_are_loaded_once(self, quiet_logger, old_eyaml_keys, tmp_path, monkeypatch):
+        private_key = tmp_path / "private_key.pkcs7.pem"
+        public_key = tmp_path / "public_key.pkcs7.pem"
+        private_key.write_bytes(old_eyaml_keys[0].read_bytes())
+        public_key.write_bytes(old_eyaml_keys[1].read_bytes())
+        provider = PKCS7EYAMLProvider()
+        processor = get_processor(
+            quiet_logger, (private_key, public_key), provider)
+
+        import yamlpath.eyaml.providers.pkcs7eyamlprovider as spy_module
+        loads = []
+        real_loader = spy_module.load_pem_private_key
+
+        def counting_loader(*args, **kwargs):
+            loads.append(args)
+            return real_loader(*args, **kwargs)
+
+        monkeypatch.setattr(spy_module, "load_pem_private_key", counting_loader)
+        for (value, plain_text) in FIXTURE_SECRETS:
+            assert processor.decrypt_eyaml(value) == plain_text
+        assert len(loads) == 1
+
+        # Replacing a key file is noticed
+        key_stat = os.stat(private_key)
+        os.utime(private_key, ns=(
+            key_stat.st_atime_ns, key_stat.st_mtime_ns + 1000000000))
+        assert processor.decrypt_eyaml(STRING_IDENT) == FIXTURE_SECRETS[1][1]
+        assert len(loads) == 2
+
+    def test_identity_differs_from_subprocess(self, quiet_logger):
+        pkcs7_processor = EYAMLProcessor(
+            quiet_logger, None, provider=PKCS7EYAMLProvider())
+        subprocess_processor = EYAMLProcessor(quiet_logger, None)
+        assert (DecryptionCache.get_key(
+                    STRING_IDENT, pkcs7_processor._get_key_identity())
+                != DecryptionCache.get_key(
+                    STRING_IDENT, subprocess_processor._get_key_identity()))
+
+    @benchmark
+    def test_in_process_benchmark(self, quiet_logger, old_eyaml_keys):
+        processor = get_processor(
+            quiet_logger, old_eyaml_keys, PKCS7EYAMLProvider())
+        plain_texts = ["Secret number {}".format(idx) for idx in range(200)]
+
+        started = time.perf_counter()
+        encrypted = processor.encrypt_many(plain_texts)
+        decrypted = processor.decrypt_many(encrypted)
+        elapsed = time.perf_counter() - started
+
+        print("Encrypted and decrypted {} values in-process in {:.3f}s"
+              .format(len(plain_texts), elapsed))
+        assert decrypted == plain_texts
+        assert elapsed < 30
+
+    @benchmark
+    @requireseyaml
+    def test_providers_benchmark(self, quiet_logger, old_eyaml_keys):
+        values = [value for (value, _) in FIXTURE_SECRETS] * 20
+        subprocess_processor = get_processor(
+            quiet_logger, old_eyaml_keys, SubprocessEYAMLProvider())
+        pkcs7_processor = get_processor(
+            quiet_logger, old_eyaml_keys, PKCS7EYAMLProvider())
+
+        started = time.perf_counter()
+        subprocess_results = [
+            subprocess_processor.decrypt_eyaml(value) for value in values]
+        subprocess_elapsed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        pkcs7_results = [
+            pkcs7_processor.decrypt_eyaml(value) for value in values]
+        pkcs7_elapsed = time.perf_counter() - started
+
+        print("Subprocess:  {:.3f}s; in-process:  {:.3f}s".format(
+            subprocess_elapsed, pkcs7_elapsed))
+        assert subprocess_results == pkcs7_results
+        assert pkcs7_results == [
+            plain_text for (_, plain_text) in FIXTURE_SECRETS] * 20
+        assert pkcs7_elapsed < 30
+
+    @requireseyaml
+    @pytest.mark.parametrize("output", [
+        EYAMLOutputFormats.STRING,
+        EYAMLOutputFormats.BLOCK,
+    ])
+    def test_providers_interoperate(self, quiet_logger, old_eyaml_keys, output):
+        subprocess_processor = get_processor(
+            quiet_logger, old_eyaml_keys, SubprocessEYAMLProvider())
+        pkcs7_processor = get_processor(
+            quiet_logger, old_eyaml_keys, PKCS7EYAMLProvider())
+        assert subprocess_processor.decrypt_eyaml(
+            pkcs7_processor.encrypt_eyaml("In-process secret", output)
+        ) == "In-process secret"
+        assert pkcs7_processor.decrypt_eyaml(
+            subprocess_processor.encrypt_eyaml("Subprocess secret", output)
+        ) == "Subprocess secret"
@@ -0,0 +1,66 @@
+import pytest
+
+from yamlpath.eyaml.enums import EYAMLOutputFormats
+from yamlpath.eyaml import DecryptionCache, EYAMLProcessor
+from yamlpath.eyaml.exceptions import EYAMLCommandException
+from yamlpath.eyaml.providers import EYAMLProvider, SubprocessEYAMLProvider
+
+from tests.conftest import (
+    requireseyaml, quiet_logger, old_eyaml_keys, fake_eyaml, fake_eyaml_value)
+from tests.test_eyaml_providers_pkcs7eyamlprovider import FIXTURE_SECRETS
+
+
+class Test_eyaml_providers_SubprocessEYAMLProvider():
+    def test_is_default(self, quiet_logger):
+        processor = EYAMLProcessor(quiet_logger, None)
+        assert isinstance(processor.provider, SubprocessEYAMLProvider)
+
+    def test_get_identity(self, quiet_logger, fake_eyaml):
+        processor = EYAMLProcessor(quiet_logger, None, binary=fake_eyaml[0])
+        assert processor.provider.get_identity(processor) == [
+            "eyaml", fake_eyaml[0]]
+
+    def test_decrypt_batch_runs_once(self, quiet_logger, fake_eyaml):
+        (binary, runs_log) = fake_eyaml
+        processor = EYAMLProcessor(quiet_logger, None, binary=binary)
+        values = [fake_eyaml_value("secret {}".format(i)) for i in range(5)]
+        assert processor.provider.decrypt_batch(processor, values) == [
+            "secret {}".format(i) for i in range(5)]
+        assert runs_log.read_text() == "decrypt\n"
+
+    def test_decrypt_batch_with_corrupt_value(self, quiet_logger, fake_eyaml):
+        processor = EYAMLProcessor(quiet_logger, None, binary=fake_eyaml[0])
+        assert processor.provider.decrypt_batch(
+            processor, [fake_eyaml_value("secret"), "ENC[bad]"]) is None
+
+    def test_no_eyaml(self, quiet_logger):
+        processor = EYAMLProcessor(quiet_logger, None, binary="no-such-eyaml")
+        with pytest.raises(EYAMLCommandException) as ex:
+            processor.provider.decrypt(processor, fake_eyaml_value("secret"))
+        assert -1 < str(ex.value).find("No accessible eyaml command")
+        with pytest.raises(EYAMLCommandException) as ex:
+            processor.provider.encrypt(
+                processor, "secret", EYAMLOutputFormats.STRING)
+        assert -1 < str(ex.value).find("not executable")
+
+    @requireseyaml
+    @pytest.mark.parametrize("value,plain_text", FIXTURE_SECRETS)
+    def test_decrypt_fixture_values(self, quiet_logger, old_eyaml_keys, value, plain_text):
+        processor = EYAMLProcessor(
+            quiet_logger, None, privatekey=str(old_eyaml_keys[0]),
+            publickey=str(old_eyaml_keys[1]),
+            decryption_cache=DecryptionCache(enabled=False))
+        assert processor.decrypt_eyaml(value) == plain_text
+
+
+class Test_eyaml_providers_EYAMLProvider():
+    def test_interface(self, quiet_logger):
+        provider = EYAMLProvider()
+        processor = EYAMLProcessor(quiet_logger, None, provider=provider)
+        with pytest.raises(NotImplementedError):
+            provider.get_identity(processor)
+        with pytest.raises(NotImplementedError):
+            provider.decrypt(processor, "ENC[PKCS7,]")
+        with pytest.raises(NotImplementedError):
+            provider.encrypt(processor, "secret", EYAMLOutputFormats.STRING)
+        assert provider.decrypt_batch(processor, ["ENC[PKCS7,]"]) is None
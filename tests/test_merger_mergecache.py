@@ -0,0 +1,193 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from yamlpath.func import get_yaml_editor, get_yaml_data
+from yamlpath.merger import MergeCache, MergerConfig
+from tests.conftest import (
+    quiet_logger,
+    create_temp_yaml_file
+)
+
+class Test_merger_MergeCache():
+    """Tests for the MergeCache class."""
+
+    def test_store_and_load(self, quiet_logger, tmp_path_factory):
+        lhs_file = create_temp_yaml_file(tmp_path_factory, """---
+anchored: &anchor value
+hash:
+  key: *anchor
+tagged: !something tagged value
+""")
+        yaml = get_yaml_editor()
+        (data, loaded) = get_yaml_data(yaml, quiet_logger, lhs_file)
+        assert loaded
+
+        cache = MergeCache(
+            quiet_logger, str(tmp_path_factory.mktemp("cache")))
+        cache.store("somekey", data)
+        (found, cached) = cache.load("somekey")
+        assert found
+        assert cached["anchored"] == data["anchored"]
+        assert cached["hash"]["key"].anchor.value == "anchor"
+        assert cached["hash"]["key"] is cached["anchored"]
+        assert cached["tagged"].value == "tagged value"
+        assert cached["tagged"].tag.value == "!something"
+
+    def test_load_miss(self, quiet_logger, tmp_path_factory):
+        cache = MergeCache(
+            quiet_logger, str(tmp_path_factory.mktemp("cache")))
+        assert cache.load("nonexistent") == (False, None)
+        assert cache.find_longest_prefix(["a", "b"]) == (0, None)
+
+    def test_load_discards_corrupt_entry(self, quiet_logger, tmp_path_factory):
+        cache_dir = str(tmp_path_factory.mktemp("cache"))
+        entry_file = os.path.join(cache_dir, "broken" + MergeCache.ENTRY_SUFFIX)
+        with open(entry_file, "wb") as fhnd:
+            fhnd.write(b"not a pickle")
+
+        cache = MergeCache(quiet_logger, cache_dir)
+        assert cache.load("broken") == (False, None)
+        assert not os.path.exists(entry_file)
+
+    def test_find_longest_prefix(self, quiet_logger, tmp_path_factory):
+        cache = MergeCache(
+            quiet_logger, str(tmp_path_factory.mktemp("cache")))
+        cache.store("first", {"merged": 1})
+        cache.store("second", {"merged": 2})
+        assert cache.find_longest_prefix(
+            ["first", "second", "third"]) == (2, {"merged": 2})
+        assert cache.find_longest_prefix(
+            ["first", "changed", "third"]) == (1, {"merged": 1})
+
+    def test_prefix_keys_track_content(self, quiet_logger):
+        config = MergerConfig(quiet_logger, SimpleNamespace())
+        keys = MergeCache.get_prefix_keys(config, ["a", "b", "c"])
+        assert len(keys) == 3
+        assert len(set(keys)) == 3
+        assert MergeCache.get_prefix_keys(config, ["a", "b"]) == keys[0:2]
+
+        changed = MergeCache.get_prefix_keys(config, ["a", "x", "c"])
+        assert changed[0] == keys[0]
+        assert changed[1] != keys[1]
+        assert changed[2] != keys[2]
+
+    def test_prefix_keys_track_options(self, quiet_logger, tmp_path_factory):
+        config_file = create_temp_yaml_file(tmp_path_factory, """
+[defaults]
+arrays = unique
+""")
+        keys = MergeCache.get_prefix_keys(
+            MergerConfig(quiet_logger, SimpleNamespace()), ["a"])
+        assert keys != MergeCache.get_prefix_keys(
+            MergerConfig(quiet_logger, SimpleNamespace(arrays="unique")),
+            ["a"])
+        assert keys != MergeCache.get_prefix_keys(
+            MergerConfig(quiet_logger, SimpleNamespace(config=config_file)),
+            ["a"])
+        assert keys == MergeCache.get_prefix_keys(
+            MergerConfig(quiet_logger, SimpleNamespace()), ["a"])
+
+    def test_get_file_digest(self, tmp_path_factory):
+        lhs_file = create_temp_yaml_file(tmp_path_factory, "key: value\n")
+        rhs_file = create_temp_yaml_file(tmp_path_factory, "key: other\n")
+        assert (MergeCache.get_file_digest(lhs_file)
+            == MergeCache.get_file_digest(lhs_file))
+        assert (MergeCache.get_file_digest(lhs_file)
+            != MergeCache.get_file_digest(rhs_file))
+
+    def test_evict_least_recently_used(self, quiet_logger, tmp_path_factory):
+        cache_dir = str(tmp_path_factory.mktemp("cache"))
+        cache = MergeCache(quiet_logger, cache_dir)
+        payload = "x" * 4096
+        for key in ["oldest", "older", "newest"]:
+            cache.store(key, payload)
+        entry_size = os.path.getsize(
+            os.path.join(cache_dir, "oldest" + MergeCache.ENTRY_SUFFIX))
+        for (age, key) in enumerate(["oldest", "older", "newest"]):
+            os.utime(
+                os.path.join(cache_dir, key + MergeCache.ENTRY_SUFFIX),
+                (1000 + age, 1000 + age))
+
+        cache = MergeCache(quiet_logger, cache_dir, entry_size * 2)
+        cache.evict()
+        assert cache.load("oldest") == (False, None)
+        assert cache.load("older")[0]
+        assert cache.load("newest")[0]
+
+    def test_evict_tracks_stored_size(self, quiet_logger, tmp_path_factory):
+        cache_dir = str(tmp_path_factory.mktemp("cache"))
+        payload = "x" * 4096
+        MergeCache(quiet_logger, cache_dir).store("first", payload)
+        entry_size = os.path.getsize(
+            os.path.join(cache_dir, "first" + MergeCache.ENTRY_SUFFIX))
+
+        cache = MergeCache(quiet_logger, cache_dir, entry_size * 2)
+        cache.store("second", payload)
+        assert len(os.listdir(cache_dir)) == 2
+        cache.store("third", payload)
+        assert sorted(os.listdir(cache_dir)) == sorted(
+            key + MergeCache.ENTRY_SUFFIX for key in ["second", "third"])
+
+    @pytest.mark.parametrize("source_count,checkpoints", [
+        (1, [1]),
+        (2, [1, 2]),
+        (5, [1, 2, 4, 5]),
+        (10, [1, 2, 4, 8, 9, 10]),
+        (20, [1, 2, 4, 8, 16, 19, 20]),
+    ])
+    def test_is_checkpoint(self, source_count, checkpoints):
+        assert checkpoints == [
+            prefix_len for prefix_len in range(1, source_count + 1)
+            if MergeCache.is_checkpoint(prefix_len, source_count)]
+
+    def test_store_failure_is_not_fatal(
+        self, capsys, tmp_path_factory
+    ):
+        from yamlpath.wrappers import ConsolePrinter
+        logger = ConsolePrinter(
+            SimpleNamespace(verbose=False, quiet=False, debug=False))
+        blocker = create_temp_yaml_file(tmp_path_factory, "not a directory")
+        cache = MergeCache(logger, os.path.join(blocker, "cache"))
+        cache.store("somekey", {"key": "value"})
+        console = capsys.readouterr()
+        assert "Unable to cache merge result" in console.out
+
+    def test_untrusted_cache_dir(self, capsys, tmp_path_factory):
+        from yamlpath.wrappers import ConsolePrinter
+        logger = ConsolePrinter(
+            SimpleNamespace(verbose=False, quiet=False, debug=False))
+        cache_dir = str(tmp_path_factory.mktemp("cache"))
+        cache = MergeCache(logger, cache_dir)
+        cache.store("somekey", {"key": "value"})
+        assert cache.load("somekey") == (True, {"key": "value"})
+
+        os.chmod(cache_dir, 0o777)
+        assert cache.load("somekey") == (False, None)
+        cache.store("otherkey", {"key": "value"})
+        assert not os.path.exists(
+            os.path.join(cache_dir, "otherkey" + MergeCache.ENTRY_SUFFIX))
+        console = capsys.readouterr()
+        assert console.out.count("Ignoring the merge cache") == 1
+
+    def test_untrusted_cache_entry(self, capsys, tmp_path_factory):
+        from yamlpath.wrappers import ConsolePrinter
+        logger = ConsolePrinter(
+            SimpleNamespace(verbose=False, quiet=False, debug=False))
+        cache_dir = str(tmp_path_factory.mktemp("cache"))
+        cache = MergeCache(logger, cache_dir)
+        cache.store("somekey", {"key": "value"})
+        entry_file = os.path.join(cache_dir, "somekey" + MergeCache.ENTRY_SUFFIX)
+        os.chmod(entry_file, 0o666)
+        assert cache.load("somekey") == (False, None)
+        assert os.path.exists(entry_file)
+        console = capsys.readouterr()
+        assert "Ignoring merge cache entry" in console.out
+
+    def test_prefix_keys_track_code(self, quiet_logger, monkeypatch):
+        config = MergerConfig(quiet_logger, SimpleNamespace())
+        keys = MergeCache.get_prefix_keys(config, ["a"])
+        assert len(MergeCache.get_code_digest()) == 64
+        monkeypatch.setattr(MergeCache, "_code_digest", "changed")
+        assert keys != MergeCache.get_prefix_keys(config, ["a"])
@@ -5,7 +5,7 @@ from types import SimpleNamespace
 from yamlpath.func import get_yaml_editor, get_yaml_data
 from yamlpath.merger.exceptions import MergeException
 from yamlpath.merger import MergerConfig, Merger
-from tests.conftest import quiet_logger, create_temp_yaml_file
+from tests.conftest import benchmark, quiet_logger, create_temp_yaml_file
 
 
 class Test_merger_Merger():
@@ -318,6 +318,60 @@ hash:
             and (open(output_file,'r').read() == open(merged_yaml,'r').read())
         )
 
+    def test_merge_new_keys_among_existing_keys(self, quiet_logger):
+        import ruamel.yaml as ry
+        lhs_data = ry.comments.CommentedMap([
+            ("a", "LHS a"), ("b", "LHS b"), ("c", "LHS c")])
+        rhs_data = ry.comments.CommentedMap([
+            ("new1", "RHS 1"), ("b", "RHS b"), ("new2", "RHS 2"),
+            ("new3", "RHS 3"), ("c", "RHS c"), ("new4", "RHS 4")])
+
+        mc = MergerConfig(quiet_logger, SimpleNamespace())
+        merger = Merger(quiet_logger, lhs_data, mc)
+        merger.merge_with(rhs_data)
+
+        assert list(merger.data.items()) == [
+            ("a", "LHS a"),
+            ("new1", "RHS 1"),
+            ("b", "RHS b"),
+            ("c", "RHS c"),
+            ("new2", "RHS 2"),
+            ("new3", "RHS 3"),
+            ("new4", "RHS 4"),
+        ]
+
+    @benchmark
+    def test_merge_many_new_keys_into_large_hash(self, quiet_logger):
+        # Benchmark:  20k new keys interleaved among the 20k keys of an
+        # existing Hash must merge in roughly linear time.
+        import time
+        import ruamel.yaml as ry
+        key_count = 20000
+        lhs_data = ry.comments.CommentedMap([
+            ("key{}".format(i), "LHS {}".format(i))
+            for i in range(key_count)])
+        rhs_pairs = []
+        for i in range(key_count):
+            rhs_pairs.append(("new{}".format(i), "RHS new {}".format(i)))
+            rhs_pairs.append(("key{}".format(i), "RHS {}".format(i)))
+        rhs_data = ry.comments.CommentedMap(rhs_pairs)
+
+        args = SimpleNamespace()
+        mc = MergerConfig(quiet_logger, args)
+        merger = Merger(quiet_logger, lhs_data, mc)
+        started = time.perf_counter()
+        merger.merge_with(rhs_data)
+        elapsed = time.perf_counter() - started
+
+        merged_keys = list(merger.data.keys())
+        assert len(merged_keys) == 2 * key_count
+        assert merged_keys[0:5] == ["key0", "new0", "key1", "key2", "new1"]
+        assert merged_keys[-1] == "new{}".format(key_count - 1)
+        assert merger.data["new{}".format(key_count - 1)] == "RHS new {}".format(
+            key_count - 1)
+        assert merger.data["key0"] == "RHS 0"
+        assert elapsed < 30
+
     def test_merge_with_defaults_array_of_floats(
         self, quiet_logger, tmp_path, tmp_path_factory
     ):
@@ -646,6 +700,49 @@ array:
             and (open(output_file,'r').read() == open(merged_yaml,'r').read())
         )
 
+    def test_merge_unique_simple_array_dedups_rhs(self, quiet_logger):
+        import ruamel.yaml as ry
+        lhs_data = ry.comments.CommentedMap({
+            "array": ry.comments.CommentedSeq(["one", "two"])})
+        rhs_data = ry.comments.CommentedMap({
+            "array": ry.comments.CommentedSeq(
+                ["three", "two", "three", "four"])})
+
+        args = SimpleNamespace(arrays="unique")
+        mc = MergerConfig(quiet_logger, args)
+        merger = Merger(quiet_logger, lhs_data, mc)
+        merger.merge_with(rhs_data)
+
+        assert merger.data["array"] == ["one", "two", "three", "four"]
+
+    @benchmark
+    def test_merge_unique_large_simple_arrays(self, quiet_logger):
+        # Benchmark:  100k-element Arrays must merge in roughly linear time.
+        import time
+        import ruamel.yaml as ry
+        element_count = 100000
+        lhs_data = ry.comments.CommentedMap({
+            "array": ry.comments.CommentedSeq(
+                ["item{}".format(i) for i in range(element_count)])})
+        rhs_data = ry.comments.CommentedMap({
+            "array": ry.comments.CommentedSeq(
+                ["item{}".format(i) for i in range(
+                    element_count // 2, element_count + element_count // 2)])})
+
+        args = SimpleNamespace(arrays="unique")
+        mc = MergerConfig(quiet_logger, args)
+        merger = Merger(quiet_logger, lhs_data, mc)
+        started = time.perf_counter()
+        merger.merge_with(rhs_data)
+        elapsed = time.perf_counter() - started
+
+        merged = merger.data["array"]
+        assert len(merged) == element_count + element_count // 2
+        assert merged[0] == "item0"
+        assert merged[-1] == "item{}".format(
+            element_count + element_count // 2 - 1)
+        assert elapsed < 30
+
     def test_merge_with_defaults_simple_aoh(
         self, quiet_logger, tmp_path, tmp_path_factory
     ):
@@ -1450,6 +1547,46 @@ merge_key: *shared_anchor_1
             and (open(output_file,'r').read() == open(merged_yaml,'r').read())
         )
 
+    def test_merge_anchors_rename_many(
+        self, quiet_logger, tmp_path, tmp_path_factory
+    ):
+        anchor_count = 300
+        lhs_yaml_file = create_temp_yaml_file(tmp_path_factory, "---\n"
+            + "aliases:\n"
+            + "".join(["  - &anchor{0} LHS Value {0}\n".format(i)
+                for i in range(anchor_count)])
+            + "lhs_keys:\n"
+            + "".join(["  - *anchor{}\n".format(i)
+                for i in range(anchor_count)]))
+        rhs_yaml_file = create_temp_yaml_file(tmp_path_factory, "---\n"
+            + "aliases:\n"
+            + "  - &anchor0_1 RHS Preexisting\n"
+            + "".join(["  - &anchor{0} RHS Value {0}\n".format(i)
+                for i in range(anchor_count)])
+            + "rhs_keys:\n"
+            + "".join(["  - *anchor{}\n".format(i)
+                for i in range(anchor_count)]))
+
+        lhs_yaml = get_yaml_editor()
+        rhs_yaml = get_yaml_editor()
+        (lhs_data, lhs_loaded) = get_yaml_data(lhs_yaml, quiet_logger, lhs_yaml_file)
+        (rhs_data, rhs_loaded) = get_yaml_data(rhs_yaml, quiet_logger, rhs_yaml_file)
+
+        args = SimpleNamespace(anchors="rename")
+        mc = MergerConfig(quiet_logger, args)
+        merger = Merger(quiet_logger, lhs_data, mc)
+        merger.merge_with(rhs_data)
+
+        merged_anchors = [ele.anchor.value for ele in merger.data["aliases"]]
+        assert len(merged_anchors) == len(set(merged_anchors))
+        assert merged_anchors[anchor_count + 1] == "anchor0_1_2"
+        assert merged_anchors[-1] == "anchor{}_1".format(anchor_count - 1)
+        for idx in range(anchor_count):
+            assert merger.data["lhs_keys"][idx] == "LHS Value {}".format(idx)
+            assert merger.data["rhs_keys"][idx] == "RHS Value {}".format(idx)
+            assert (merger.data["rhs_keys"][idx].anchor.value
+                == merged_anchors[anchor_count + 1 + idx])
+
     def test_merge_with_defaults_hash_appends_to_array(
         self, quiet_logger, tmp_path, tmp_path_factory
     ):
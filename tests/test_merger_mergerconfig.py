@@ -548,3 +548,65 @@ class Test_merger_MergerConfig():
 
         console = capsys.readouterr()
         assert "YAML Path matches no nodes" in console.out
+
+    def test_equivalent_rules_apply_in_config_order(
+        self, quiet_logger, tmp_path_factory
+    ):
+        config_file = create_temp_yaml_file(tmp_path_factory, """
+        [rules]
+        /hash = left
+        /array = unique
+        /hash/ = right
+        [keys]
+        /hash/ = name
+        /hash = id
+        """)
+        yaml_file = create_temp_yaml_file(tmp_path_factory, """---
+        hash:
+          key: value
+        array:
+          - element
+        """)
+        lhs_yaml = get_yaml_editor()
+        (yaml_data, yaml_loaded) = get_yaml_data(
+            lhs_yaml, quiet_logger, yaml_file)
+        mc = MergerConfig(quiet_logger, SimpleNamespace(config=config_file))
+        mc.prepare(yaml_data)
+
+        node_coord = NodeCoords(yaml_data["hash"], yaml_data, "hash")
+        assert mc.hash_merge_mode(node_coord) == HashMergeOpts.LEFT
+        assert mc.aoh_merge_key(node_coord, {}) == "name"
+        assert len(mc._compiled_paths) == 2
+        assert len(mc._compiled_rules) == 5
+
+    def test_prepare_reuses_compiled_rules(
+        self, quiet_logger, tmp_path_factory
+    ):
+        config_file = create_temp_yaml_file(tmp_path_factory, """
+        [rules]
+        /hash = left
+        [keys]
+        /hash = name
+        """)
+        lhs_yaml = get_yaml_editor()
+        prepared_nodes = []
+        mc = MergerConfig(quiet_logger, SimpleNamespace(config=config_file))
+        for doc_id in range(3):
+            yaml_file = create_temp_yaml_file(tmp_path_factory, """---
+            hash:
+              document: {}
+            """.format(doc_id))
+            (yaml_data, yaml_loaded) = get_yaml_data(
+                lhs_yaml, quiet_logger, yaml_file)
+            mc.prepare(yaml_data)
+
+            node_coord = NodeCoords(yaml_data["hash"], yaml_data, "hash")
+            assert mc.hash_merge_mode(node_coord) == HashMergeOpts.LEFT
+            assert mc.aoh_merge_key(node_coord, {}) == "name"
+            assert len(mc.rules) == 1
+            assert len(mc.keys) == 1
+            prepared_nodes.append(list(mc.rules)[0].node)
+
+        assert prepared_nodes[0] is not prepared_nodes[2]
+        assert len(mc._compiled_paths) == 1
+        assert mc.prepare_seconds > 0.0
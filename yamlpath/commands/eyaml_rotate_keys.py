@@ -8,20 +8,24 @@ Copyright 2018, 2019 William W. Kimball, Jr. MBA MSIS
 """
 import sys
 import argparse
-from shutil import copy2
-from os import remove, access, R_OK
-from os.path import isfile, exists
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
+from shutil import copy2, copymode
+from os import fdopen, remove, replace, access, R_OK
+from os.path import basename, dirname, isfile, exists, realpath
+from tempfile import mkstemp
 
 from ruamel.yaml.scalarstring import FoldedScalarString
 
 from yamlpath import __version__ as YAMLPATH_VERSION
-from yamlpath.common import Parsers
+from yamlpath.common import Nodes, Parsers
+from yamlpath.enums import YAMLValueFormats
 from yamlpath.eyaml.exceptions import EYAMLCommandException
 from yamlpath.eyaml import EYAMLProcessor
 
 # pylint: disable=locally-disabled,unused-import
 import yamlpath.patches
-from yamlpath.wrappers import ConsolePrinter
+from yamlpath.wrappers import CapturedStream, ConsolePrinter
 
 def processcli():
     """Process command-line arguments."""
@@ -32,7 +36,8 @@ def processcli():
             " re-encrypting using replacement keys."),
         epilog=(
             "Any YAML_FILEs lacking EYAML values will not be modified (or"
-            " backed up, even when -b/--backup is specified).  For more"
+            " backed up, even when -b/--backup is specified).  Each modified"
+            " YAML_FILE is replaced atomically.  For more"
             " information about YAML Paths, please visit"
             " https://github.com/wwkimball/yamlpath/wiki.  To report issues"
             " with this tool or to request enhancements, please visit"
@@ -55,6 +60,13 @@ def processcli():
     parser.add_argument("-x", "--eyaml", default="eyaml",
                         help="the eyaml binary to use when it isn't on the"
                         + " PATH")
+    parser.add_argument("--eyaml-jobs", metavar="N", type=int, default=1,
+                        help="run up to N eyaml commands concurrently when"
+                        + " values must be encrypted or decrypted one at a"
+                        + " time; default=1")
+    parser.add_argument("-j", "--jobs", metavar="N", type=int, default=1,
+                        help="process up to N YAML_FILEs concurrently using"
+                        + " worker processes; default=1")
 
     key_group = parser.add_argument_group(
         "EYAML_KEYS", "All key arguments are required"
@@ -94,97 +106,240 @@ def validateargs(args, log):
                 "EYAML key is not a readable file:  " + check_file
             )
 
+    # There must be at least one EYAML job
+    if args.eyaml_jobs < 1:
+        has_errors = True
+        log.error("The --eyaml-jobs option must be at least 1.")
+
+    # There must be at least one file job
+    if args.jobs < 1:
+        has_errors = True
+        log.error("The --jobs|-j option must be at least 1.")
+
     if has_errors:
         sys.exit(1)
 
-# pylint: disable=locally-disabled,too-many-locals,too-many-branches,too-many-statements
-def main():
-    """Main code."""
-    # Process any command-line arguments
-    args = processcli()
-    log = ConsolePrinter(args)
-    validateargs(args, log)
-    processor = EYAMLProcessor(log, None, binary=args.eyaml)
-
-    # Prep the YAML parser
-    yaml = Parsers.get_yaml_editor()
+def decrypt_nodes(log, processor, eyaml_nodes):
+    """
+    Decrypt a set of EYAML values through as few eyaml commands as possible.
+
+    Parameters:
+    1. log (ConsolePrinter) Instance of ConsolePrinter or subclass
+    2. processor (EYAMLProcessor) The processor set with the old EYAML keys
+    3. eyaml_nodes (List[Tuple[YAMLPath, Any]]) The YAML Path and node of
+       each EYAML value
+
+    Returns:  (Tuple[List[Optional[str]], int]) The decrypted value of each
+    node -- None for those which could not be decrypted -- and the resulting
+    exit state
+    """
+    for (yaml_path, _) in eyaml_nodes:
+        log.verbose("Decrypting value(s) at {}.".format(yaml_path))
+
+    try:
+        return (
+            processor.decrypt_many([node for (_, node) in eyaml_nodes]), 0)
+    except EYAMLCommandException:
+        # Decrypt each value on its own in order to report every failure
+        pass
 
-    # Process the input file(s)
-    in_file_count = len(args.yaml_files)
     exit_state = 0
-    for yaml_file in args.yaml_files:
-        file_changed = False
-        backup_file = yaml_file + ".bak"
-        seen_anchors = []
-
-        # Each YAML_FILE must actually be a file
-        if not isfile(yaml_file):
-            log.error("Not a file:  {}".format(yaml_file))
-            exit_state = 2
-            continue
-
-        # Don't bother with the file change update when there's only one input
-        # file.
-        if in_file_count > 1:
-            log.info("Processing {}...".format(yaml_file))
-
-        # Try to open the file
-        (yaml_data, doc_loaded) = Parsers.get_yaml_data(yaml, log, yaml_file)
-        if not doc_loaded:
-            # An error message has already been logged
+    txtvals = []
+    for (_, node) in eyaml_nodes:
+        try:
+            txtvals.append(processor.decrypt_eyaml(node))
+        except EYAMLCommandException as ex:
+            log.error(ex)
             exit_state = 3
-            continue
-
-        # Process all EYAML values
-        processor.data = yaml_data
-        for yaml_path in processor.find_eyaml_paths():
-            # Use ::get_nodes() instead of ::get_eyaml_values() here in order
-            # to ignore values that have already been decrypted via their
-            # Anchors.
-            for node_coordinate in processor.get_nodes(yaml_path):
-                node = node_coordinate.node
-                # Ignore values which are Aliases for those already decrypted
-                anchor_name = (
-                    node.anchor.value if hasattr(node, "anchor") else None
-                )
-                if anchor_name is not None:
-                    if anchor_name in seen_anchors:
-                        continue
-
-                    seen_anchors.append(anchor_name)
-
-                log.verbose("Decrypting value(s) at {}.".format(yaml_path))
-                processor.publickey = args.oldpublickey
-                processor.privatekey = args.oldprivatekey
-
-                try:
-                    txtval = processor.decrypt_eyaml(node)
-                except EYAMLCommandException as ex:
-                    log.error(ex)
-                    exit_state = 3
-                    continue
-
-                # Prefer block (folded) values unless the original YAML value
-                # was already a massivly long (string) line.
-                output = "block"
-                if not isinstance(node, FoldedScalarString):
-                    output = "string"
-
-                # Re-encrypt the value with new EYAML keys
-                processor.publickey = args.newpublickey
-                processor.privatekey = args.newprivatekey
-
+            txtvals.append(None)
+    return (txtvals, exit_state)
+
+def get_output_format(node):
+    """
+    Get the EYAML output format with which to re-encrypt a node.
+
+    Prefer block (folded) values unless the original YAML value was already a
+    massivly long (string) line.
+    """
+    if isinstance(node, FoldedScalarString):
+        return "block"
+    return "string"
+
+def encrypt_nodes(log, processor, eyaml_nodes, txtvals):
+    """
+    Re-encrypt a set of decrypted EYAML values, several at once.
+
+    Parameters:
+    1. log (ConsolePrinter) Instance of ConsolePrinter or subclass
+    2. processor (EYAMLProcessor) The processor set with the new EYAML keys
+    3. eyaml_nodes (List[Tuple[YAMLPath, Any]]) The YAML Path and original
+       node of each EYAML value
+    4. txtvals (List[Optional[str]]) The decrypted value of each node; None
+       for those which could not be decrypted
+
+    Returns:  (Tuple[List[Optional[str]], int]) The re-encrypted value of each
+    node -- None for those which could not be re-encrypted -- and the
+    resulting exit state
+    """
+    exit_state = 0
+    encvals = [None] * len(eyaml_nodes)
+    for output in ["block", "string"]:
+        indexes = [
+            idx for (idx, (_, node)) in enumerate(eyaml_nodes)
+            if txtvals[idx] is not None and get_output_format(node) == output]
+
+        try:
+            results = processor.encrypt_many(
+                [txtvals[idx] for idx in indexes], output=output)
+        except EYAMLCommandException:
+            # Encrypt each value on its own in order to report every failure
+            results = []
+            for idx in indexes:
                 try:
-                    processor.set_eyaml_value(yaml_path, txtval, output=output)
+                    results.append(
+                        processor.encrypt_eyaml(txtvals[idx], output))
                 except EYAMLCommandException as ex:
                     log.error(ex)
                     exit_state = 3
-                    continue
-
-                file_changed = True
-
-        # Save the changes
-        if file_changed:
+                    results.append(None)
+
+        for (idx, encval) in zip(indexes, results):
+            encvals[idx] = encval
+
+    return (encvals, exit_state)
+
+def find_eyaml_nodes(processor):
+    """
+    Gather every distinct EYAML value and all of its locations at once.
+
+    Parameters:
+    1. processor (EYAMLProcessor) The processor holding the YAML data
+
+    Returns:  (List[Tuple[YAMLPath, Any, List[NodeCoords]]]) The YAML Path of
+    the first location, the node, and every location of each distinct EYAML
+    value, in document order
+    """
+    # Aliases share their Anchor's node, so each node is decrypted only once
+    # no matter how many times it appears.
+    eyaml_nodes = {}
+    for node_coords in processor.find_eyaml_nodes():
+        node_id = id(node_coords.node)
+        if node_id not in eyaml_nodes:
+            eyaml_nodes[node_id] = (node_coords.path, node_coords.node, [])
+        eyaml_nodes[node_id][2].append(node_coords)
+    return list(eyaml_nodes.values())
+
+def replace_node(locations, node, encval):
+    """
+    Replace an EYAML node at every one of its locations.
+
+    Parameters:
+    1. locations (List[NodeCoords]) Every location of the node
+    2. node (Any) The original EYAML node
+    3. encval (str) The re-encrypted value
+
+    Returns:  N/A
+    """
+    # Rotated values have always been written as folded scalars, even those
+    # which were re-encrypted in string format.  The one new node replaces
+    # every location so Aliases remain Aliases.
+    new_node = Nodes.make_new_node(node, encval, YAMLValueFormats.FOLDED)
+    for node_coords in locations:
+        node_coords.parent[node_coords.parentref] = new_node
+
+def write_yaml_file(yaml, yaml_data, yaml_file):
+    """
+    Atomically replace the content of a YAML_FILE.
+
+    The new content is written to a temporary file beside the original, which
+    then replaces it, so an interrupted run never leaves a partial file.
+
+    Parameters:
+    1. yaml (ruamel.yaml.YAML) The YAML editor
+    2. yaml_data (Any) The data to write
+    3. yaml_file (str) The file to replace; symbolic links are followed
+
+    Returns:  N/A
+
+    Raises:
+    - `OSError` when the file cannot be written
+    """
+    target_file = realpath(yaml_file)
+    (tmp_fd, tmp_name) = mkstemp(
+        dir=dirname(target_file), prefix="." + basename(target_file) + ".",
+        suffix=".tmp")
+    try:
+        with fdopen(tmp_fd, "w") as yaml_dump:
+            yaml.dump(yaml_data, yaml_dump)
+        copymode(target_file, tmp_name)
+        replace(tmp_name, target_file)
+        tmp_name = None
+    finally:
+        if tmp_name is not None:
+            remove(tmp_name)
+
+# pylint: disable=locally-disabled,too-many-locals
+def rotate_yaml_file(args, log, yaml_file):
+    """
+    Rotate the EYAML keys of every value within a single YAML_FILE.
+
+    Parameters:
+    1. args (argparse.Namespace) The command-line arguments
+    2. log (ConsolePrinter) Instance of ConsolePrinter or subclass
+    3. yaml_file (str) The file to process
+
+    Returns:  (int) The resulting exit state
+    """
+    backup_file = yaml_file + ".bak"
+
+    # Each YAML_FILE must actually be a file
+    if not isfile(yaml_file):
+        log.error("Not a file:  {}".format(yaml_file))
+        return 2
+
+    # Don't bother with the file change update when there's only one input
+    # file.
+    if len(args.yaml_files) > 1:
+        log.info("Processing {}...".format(yaml_file))
+
+    # Try to open the file
+    yaml = Parsers.get_yaml_editor()
+    (yaml_data, doc_loaded) = Parsers.get_yaml_data(yaml, log, yaml_file)
+    if not doc_loaded:
+        # An error message has already been logged
+        return 3
+
+    # Collect all EYAML values in one pass
+    processor = EYAMLProcessor(
+        log, yaml_data, binary=args.eyaml, jobs=args.eyaml_jobs)
+    eyaml_nodes = find_eyaml_nodes(processor)
+    if not eyaml_nodes:
+        return 0
+
+    # Decrypt them all at once
+    processor.publickey = args.oldpublickey
+    processor.privatekey = args.oldprivatekey
+    (txtvals, exit_state) = decrypt_nodes(
+        log, processor, [(path, node) for (path, node, _) in eyaml_nodes])
+
+    # Re-encrypt each value with new EYAML keys
+    processor.publickey = args.newpublickey
+    processor.privatekey = args.newprivatekey
+    (encvals, encrypt_state) = encrypt_nodes(
+        log, processor, [(path, node) for (path, node, _) in eyaml_nodes],
+        txtvals)
+    exit_state = max(exit_state, encrypt_state)
+
+    # Store the re-encrypted values directly into their nodes
+    file_changed = False
+    for ((_, node, locations), encval) in zip(eyaml_nodes, encvals):
+        if encval is not None:
+            replace_node(locations, node, encval)
+            file_changed = True
+
+    # Save the changes
+    if file_changed:
+        try:
             if args.backup:
                 log.verbose("Saving a backup of {} to {}."
                             .format(yaml_file, backup_file))
@@ -193,8 +348,58 @@ def main():
                 copy2(yaml_file, backup_file)
 
             log.verbose("Writing changed data to {}.".format(yaml_file))
-            with open(yaml_file, 'w') as yaml_dump:
-                yaml.dump(yaml_data, yaml_dump)
+            write_yaml_file(yaml, yaml_data, yaml_file)
+        except OSError as ex:
+            log.error("Unable to write {}:  {}".format(yaml_file, ex))
+            exit_state = max(exit_state, 3)
+
+    return exit_state
+
+def rotate_captured_yaml_file(args, yaml_file):
+    """
+    Rotate the EYAML keys within one YAML_FILE; meant for worker processes.
+
+    Anything the rotation would have written to STDOUT or STDERR is captured
+    so the caller can replay it in the same order as a serial run.
+
+    Parameters:
+    1. args (argparse.Namespace) The command-line arguments
+    2. yaml_file (str) The file to process
+
+    Returns:  (Tuple[int, List[Tuple[str, str]]]) The resulting exit state
+    and the captured console writes
+    """
+    log = ConsolePrinter(args)
+    writes = []
+    with redirect_stdout(CapturedStream("stdout", writes)), \
+            redirect_stderr(CapturedStream("stderr", writes)):
+        exit_state = rotate_yaml_file(args, log, yaml_file)
+    return (exit_state, writes)
+
+def main():
+    """Main code."""
+    # Process any command-line arguments
+    args = processcli()
+    log = ConsolePrinter(args)
+    validateargs(args, log)
+
+    # Process the input file(s), several at once when permitted
+    exit_state = 0
+    if args.jobs > 1 and len(args.yaml_files) > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(args.jobs, len(args.yaml_files))
+        ) as executor:
+            for (file_state, writes) in executor.map(
+                rotate_captured_yaml_file,
+                [args] * len(args.yaml_files), args.yaml_files
+            ):
+                for (stream_name, text) in writes:
+                    getattr(sys, stream_name).write(text)
+                exit_state = max(exit_state, file_state)
+    else:
+        for yaml_file in args.yaml_files:
+            exit_state = max(
+                exit_state, rotate_yaml_file(args, log, yaml_file))
 
     sys.exit(exit_state)
 
@@ -5,8 +5,13 @@ Copyright 2020 William W. Kimball, Jr. MBA MSIS
 """
 import sys
 import argparse
-from os import access, R_OK
-from os.path import isfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+from itertools import zip_longest
+from os import access, walk, R_OK
+from os.path import isdir, isfile, join, relpath
+from typing import Any, Dict, List, Optional, Tuple
 
 from yamlpath import __version__ as YAMLPATH_VERSION
 from yamlpath.common import Parsers
@@ -43,8 +48,27 @@ input files:
   relative position of the two input files is important, this will not be
   inferred; you must use - to indicate which document is read from STDIN.
 
-  It doesn't make any sense to compare multi-document files, so only single-
-  document files are supported.
+  When either YAML_FILE contains multiple documents, the documents are
+  compared in order, first to first, second to second, and so on.  Each
+  document's report is labelled with a "diff YAML_FILE YAML_FILE, document N"
+  line.  A document with no counterpart is compared against an empty one.
+
+directory comparisons:
+  When both YAML_FILEs are directories, every *.yaml, *.yml, *.eyaml, and
+  *.json file within either directory tree is compared against the file at
+  the same relative path within the other.  Files present in only one tree
+  are reported with an "Only in DIRECTORY: FILE" line.  Reports are labelled
+  like those of one-to-many comparisons and are printed in order of relative
+  path, even when up to --jobs|-j pairs of files are compared concurrently.
+  The exit-state is 1 when any pair of files differs.
+
+one-to-many comparisons:
+  With --baseline|-b, the BASELINE document is compared against every
+  YAML_FILE, each of which is read only once.  The report for each YAML_FILE
+  is labelled with a "diff BASELINE YAML_FILE" line and the reports are
+  printed in the same order as the YAML_FILEs, even when up to --jobs|-j of
+  them are compared concurrently by worker processes.  The exit-state is 1
+  when any YAML_FILE differs from the BASELINE.
 
 For more information about YAML Paths, please visit
 https://github.com/wwkimball/yamlpath/wiki.
@@ -94,6 +118,26 @@ https://github.com/wwkimball/yamlpath/issues.
         help="indicate which YAML Path seperator to use when\nrendering"
              " results; default=dot")
 
+    parser.add_argument(
+        "-b", "--baseline",
+        metavar="BASELINE",
+        help="compare this one YAML/JSON/compatible file against\nevery"
+             " YAML_FILE")
+
+    parser.add_argument(
+        "-j", "--jobs",
+        metavar="N",
+        type=int,
+        default=1,
+        help="with --baseline|-b or directories, compare up to N\nfiles"
+             " concurrently using worker processes;\ndefault=1")
+
+    parser.add_argument(
+        "--stream", action="store_true",
+        help="print each difference as soon as it is found, in\ndocument"
+             " order rather than sorted by position; useful\nfor very large"
+             " documents")
+
     eyaml_group = parser.add_argument_group(
         "EYAML options", "Left unset, the EYAML keys will default to your"
         "system or user defaults.\nBoth keys must be set either here or in"
@@ -125,26 +169,64 @@ https://github.com/wwkimball/yamlpath/issues.
         help="suppress all output except system errors")
 
     parser.add_argument("yaml_files", metavar="YAML_FILE",
-                        nargs=2,
-                        help="exactly two YAML/JSON/compatible files to"
-                             " compare; use\n- to read one document from"
-                             " STDIN")
+                        nargs="+",
+                        help="exactly two YAML/JSON/compatible files or"
+                             " directories\nto compare, or any number of files"
+                             " with\n--baseline|-b; use - to read one document"
+                             " from STDIN")
 
     return parser.parse_args()
 
-def validateargs(args, log):
-    """Validate command-line arguments."""
+def validate_yaml_files(args, log):
+    """Validate the YAML_FILE and BASELINE arguments; True when valid."""
     has_errors = False
 
+    # Without a baseline, exactly two files are compared
+    if args.baseline is None and len(args.yaml_files) != 2:
+        has_errors = True
+        log.error(
+            "Exactly two YAML_FILEs must be compared unless --baseline|-b is"
+            " set.")
+
+    # Files cannot be compared to directories and vice versa
+    if args.baseline is None and len(args.yaml_files) == 2:
+        dir_count = sum(1 for infile in args.yaml_files if isdir(infile))
+        if dir_count == 1:
+            has_errors = True
+            log.error(
+                "Both YAML_FILEs must be files or both must be directories.")
+    elif (args.baseline is not None
+          and any(isdir(infile) for infile in args.yaml_files)):
+        has_errors = True
+        log.error(
+            "Each YAML_FILE must be a file when --baseline|-b is set.")
+
     # There can be only one -
     pseudofile_count = 0
-    for infile in args.yaml_files:
+    for infile in args.yaml_files + [args.baseline or ""]:
         if infile.strip() == '-':
             pseudofile_count += 1
     if pseudofile_count > 1:
         has_errors = True
         log.error("Only one YAML_FILE may be the - pseudo-file.")
 
+    return not has_errors
+
+def validateargs(args, log):
+    """Validate command-line arguments."""
+    has_errors = not validate_yaml_files(args, log)
+
+    if args.jobs < 1:
+        has_errors = True
+        log.error("The --jobs|-j option must be at least 1.")
+
+    # Worker processes cannot re-read a BASELINE from STDIN
+    if args.jobs > 1 and args.baseline and args.baseline.strip() == "-":
+        has_errors = True
+        log.error(
+            "The --jobs|-j option cannot be greater than 1 when the"
+            " BASELINE is read from STDIN.")
+
     # --quiet cannot be used with --same or --onlysame
     if args.quiet and (args.same or args.onlysame):
         has_errors = True
@@ -183,12 +265,17 @@ def validateargs(args, log):
     if has_errors:
         sys.exit(1)
 
-def print_report(log, args, diff):
-    """Print user-customized report."""
+def print_report(log, args, entries, label=None, separate=False):
+    """
+    Print user-customized report, optionally labelled.
+
+    Returns whether any differences were found and whether anything was
+    printed.  When separate is set, a blank line precedes anything printed.
+    """
     changes_found = False
     print_sep = False
     print_verbosely = args.verbose or args.debug
-    for entry in diff.get_report():
+    for entry in entries:
         is_different = entry.action is not DiffActions.SAME
         if is_different:
             changes_found = True
@@ -201,47 +288,285 @@ def print_report(log, args, diff):
             or (args.onlysame and not is_different)
             or args.same
         ):
-            if print_sep:
+            if print_sep or separate:
                 log.info("")
+            if not print_sep and label is not None:
+                log.info(label)
             entry.pathsep = args.pathsep
             entry.verbose = print_verbosely
             log.info(entry)
             print_sep = True
+            separate = False
+
+    return (changes_found, print_sep)
+
+def build_differ(log, args, lhs_document):
+    """Prepare a Differ for the basis (LHS) document."""
+    return Differ(
+        DifferConfig(log, args), log, lhs_document,
+        ignore_eyaml_values=args.ignore_eyaml_values, binary=args.eyaml,
+        publickey=args.publickey, privatekey=args.privatekey,
+        report_same=args.same or args.onlysame)
+
+# pylint: disable=locally-disabled,too-many-arguments
+def diff_documents(log, args, diff, rhs_document, label=None, separate=False):
+    """
+    Compare one document against the basis document and report.
+
+    Returns the exit-state of the comparison and whether anything was
+    printed.
+    """
+    try:
+        if args.stream:
+            # Differences are calculated only as they are printed
+            entries = diff.stream_compare_to(rhs_document)
+        else:
+            diff.compare_to(rhs_document)
+            entries = diff.get_report()
+        (changes_found, printed) = print_report(
+            log, args, entries, label, separate)
+        return (1 if changes_found else 0, printed)
+    except EYAMLCommandException as ex:
+        log.critical(ex, 1)
+    return (1, False)
+
+def load_documents(log, yaml_file):
+    """
+    Load every document within a YAML_FILE.
+
+    Returns the documents -- of which there is always at least one, though
+    it may be empty -- and whether they were all loaded.
+    """
+    yaml_editor = Parsers.get_yaml_editor()
+    documents: List[Any] = []
+    for (document, doc_loaded) in Parsers.get_yaml_multidoc_data(
+        yaml_editor, log, yaml_file
+    ):
+        if not doc_loaded:
+            # An error message has already been logged
+            return ([], False)
+        documents.append(document)
+
+    # An empty STDIN is yielded as an empty string but is no document at all
+    if not documents or (yaml_file.strip() == "-" and documents == [""]):
+        documents = [None]
+    return (documents, True)
+
+# Prepared baselines, by file, retained for reuse by each worker process.
+# Those prepared before the worker processes are forked are inherited.
+_BASELINE_DIFFERS: Dict[str, Optional[Differ]] = {}
+
+def get_baseline_differ(log, args, lhs_file):
+    """Get the prepared Differ of a BASELINE, parsing it only once."""
+    if lhs_file not in _BASELINE_DIFFERS:
+        lhs_yaml = Parsers.get_yaml_editor()
+        (lhs_document, doc_loaded) = Parsers.get_yaml_data(
+            lhs_yaml, log, lhs_file)
+        _BASELINE_DIFFERS[lhs_file] = (
+            build_differ(log, args, lhs_document) if doc_loaded else None)
+    return _BASELINE_DIFFERS[lhs_file]
+
+# pylint: disable=locally-disabled,too-many-locals,too-many-arguments
+def diff_files(
+    log, args, lhs_file, rhs_file, labelled=False, separate=False
+):
+    """
+    Compare every document of two files, in order, and report.
+
+    With --baseline|-b, the lhs_file is the BASELINE, whose one prepared
+    document is compared against every document of the rhs_file.  When
+    separate is set, a blank line precedes anything printed.
+
+    Returns the aggregate exit-state of the comparisons and whether anything
+    was printed.
+    """
+    differs: List[Differ] = []
+    if args.baseline is not None:
+        baseline_differ = get_baseline_differ(log, args, lhs_file)
+        if baseline_differ is None:
+            # An error message has already been logged
+            return (1, False)
+    else:
+        (lhs_documents, doc_loaded) = load_documents(log, lhs_file)
+        if not doc_loaded:
+            return (1, False)
+
+    (rhs_documents, doc_loaded) = load_documents(log, rhs_file)
+    if not doc_loaded:
+        return (1, False)
+
+    if args.baseline is not None:
+        differs = [baseline_differ] * len(rhs_documents)
+    else:
+        differs = [
+            build_differ(log, args, lhs_document)
+            for lhs_document in lhs_documents]
+
+    exit_state = 0
+    printed = False
+    doc_count = max(len(differs), len(rhs_documents))
+    for (doc_index, (diff, rhs_document)) in enumerate(
+        zip_longest(differs, rhs_documents)
+    ):
+        if diff is None:
+            # This RHS document has no LHS counterpart
+            diff = build_differ(log, args, None)
+
+        label = None
+        if doc_count > 1:
+            label = "diff {} {}, document {}".format(
+                lhs_file, rhs_file, doc_index + 1)
+        elif labelled:
+            label = "diff {} {}".format(lhs_file, rhs_file)
+
+        (doc_state, doc_printed) = diff_documents(
+            diff.logger, args, diff, rhs_document, label,
+            separate or printed)
+        exit_state = max(exit_state, doc_state)
+        printed = printed or doc_printed
+
+    return (exit_state, printed)
+
+def diff_files_captured(
+    args: argparse.Namespace, lhs_file: str, rhs_file: str
+) -> Tuple[int, bool, str, str]:
+    """
+    Compare two files, capturing the report; meant for worker processes.
+
+    Everything the comparison would have written to STDOUT and STDERR is
+    captured so the caller can print the reports in a deterministic order.
+
+    Parameters:
+    1. args (argparse.Namespace) The command-line arguments.
+    2. lhs_file (str) The LHS file or BASELINE.
+    3. rhs_file (str) The RHS file to compare against the lhs_file.
+
+    Returns:  (Tuple[int, bool, str, str]) The exit-state of the comparison,
+    whether a report was printed, and the captured STDOUT and STDERR.
+    """
+    stdout = StringIO()
+    stderr = StringIO()
+    with redirect_stdout(stdout), redirect_stderr(stderr):
+        log = ConsolePrinter(args)
+        try:
+            (exit_state, printed) = diff_files(
+                log, args, lhs_file, rhs_file, labelled=True)
+        except SystemExit as ex:
+            exit_state = 1 if ex.code is None else int(ex.code)
+            printed = False
+    return (exit_state, printed, stdout.getvalue(), stderr.getvalue())
+
+def get_directory_files(directory):
+    """Get the relative path of every YAML/JSON file within a directory."""
+    yaml_files = set()
+    for (dir_path, _, file_names) in walk(directory):
+        for file_name in file_names:
+            if file_name.lower().endswith(
+                    (".yaml", ".yml", ".eyaml", ".json")):
+                yaml_files.add(relpath(join(dir_path, file_name), directory))
+    return yaml_files
+
+def get_directory_tasks(lhs_dir, rhs_dir):
+    """
+    Plan the comparison of two directory trees, in order of relative path.
+
+    Returns a list of (lhs_file, rhs_file, message) where message is set
+    only for files found in just one of the directories.
+    """
+    lhs_files = get_directory_files(lhs_dir)
+    rhs_files = get_directory_files(rhs_dir)
+    tasks: List[Tuple[str, str, Optional[str]]] = []
+    for rel_file in sorted(lhs_files | rhs_files):
+        lhs_file = join(lhs_dir, rel_file)
+        rhs_file = join(rhs_dir, rel_file)
+        message = None
+        if rel_file not in rhs_files:
+            message = "Only in {}: {}".format(lhs_dir, rel_file)
+        elif rel_file not in lhs_files:
+            message = "Only in {}: {}".format(rhs_dir, rel_file)
+        tasks.append((lhs_file, rhs_file, message))
+    return tasks
+
+def diff_many(args, tasks):
+    """
+    Compare many pairs of files, in order, possibly concurrently.
+
+    Parameters:
+    1. args (argparse.Namespace) The command-line arguments.
+    2. tasks (List[Tuple[str, str, Optional[str]]]) The pairs of files to
+       compare, or, when set, the message to print instead of comparing them.
+
+    Returns:  (int) The aggregate exit-state of every comparison
+    """
+    log = ConsolePrinter(args)
+    executor: Optional[ProcessPoolExecutor] = None
+    comparing: Dict[int, Any] = {}
+    if args.jobs > 1 and len(tasks) > 1:
+        executor = ProcessPoolExecutor(max_workers=args.jobs)
+        for (task_index, (lhs_file, rhs_file, message)) in enumerate(tasks):
+            if message is None and rhs_file.strip() != "-":
+                comparing[task_index] = executor.submit(
+                    diff_files_captured, args, lhs_file, rhs_file)
 
-    return changes_found
+    exit_state = 0
+    printed_report = False
+    for (task_index, (lhs_file, rhs_file, message)) in enumerate(tasks):
+        if message is None and task_index not in comparing:
+            # Compared here, so differences are printed as they are found
+            try:
+                (task_state, reported) = diff_files(
+                    log, args, lhs_file, rhs_file, labelled=True,
+                    separate=printed_report)
+            except SystemExit as ex:
+                (task_state, reported) = (
+                    1 if ex.code is None else int(ex.code), False)
+            exit_state = max(exit_state, task_state)
+            printed_report = printed_report or reported
+            continue
+
+        if message is not None:
+            (task_state, reported, stdout, stderr) = (
+                1, not args.quiet, "" if args.quiet else message + "\n", "")
+        else:
+            (task_state, reported, stdout, stderr) = (
+                comparing[task_index].result())
+        exit_state = max(exit_state, task_state)
+
+        sys.stderr.write(stderr)
+        sys.stderr.flush()
+
+        # Reports are separated from one another by a blank line
+        if reported and printed_report:
+            sys.stdout.write("\n")
+        printed_report = printed_report or reported
+        sys.stdout.write(stdout)
+        sys.stdout.flush()
+
+    if executor is not None:
+        executor.shutdown()
+
+    return exit_state
 
 def main():
     """Main code."""
     args = processcli()
     log = ConsolePrinter(args)
     validateargs(args, log)
-    exit_state = 0
-    lhs_file = args.yaml_files[0]
-    rhs_file = args.yaml_files[1]
-    lhs_yaml = Parsers.get_yaml_editor()
-    rhs_yaml = Parsers.get_yaml_editor()
-
-    (lhs_document, doc_loaded) = Parsers.get_yaml_data(lhs_yaml, log, lhs_file)
-    if not doc_loaded:
-        # An error message has already been logged
-        sys.exit(1)
 
-    (rhs_document, doc_loaded) = Parsers.get_yaml_data(rhs_yaml, log, rhs_file)
-    if not doc_loaded:
-        # An error message has already been logged
-        sys.exit(1)
+    if args.baseline is not None:
+        _BASELINE_DIFFERS.clear()
+        if get_baseline_differ(log, args, args.baseline) is None:
+            # An error message has already been logged
+            sys.exit(1)
+        sys.exit(diff_many(args, [
+            (args.baseline, rhs_file, None) for rhs_file in args.yaml_files]))
 
-    diff = Differ(
-        DifferConfig(log, args), log, lhs_document,
-        ignore_eyaml_values=args.ignore_eyaml_values, binary=args.eyaml,
-        publickey=args.publickey, privatekey=args.privatekey)
-
-    try:
-        diff.compare_to(rhs_document)
-    except EYAMLCommandException as ex:
-        log.critical(ex, 1)
+    lhs_file = args.yaml_files[0]
+    rhs_file = args.yaml_files[1]
+    if isdir(lhs_file):
+        sys.exit(diff_many(args, get_directory_tasks(lhs_file, rhs_file)))
 
-    exit_state = 1 if print_report(log, args, diff) else 0
+    (exit_state, _) = diff_files(log, args, lhs_file, rhs_file)
     sys.exit(exit_state)
 
 if __name__ == "__main__":
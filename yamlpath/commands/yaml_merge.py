@@ -9,10 +9,12 @@ Copyright 2020 William W. Kimball, Jr. MBA MSIS
 import sys
 import argparse
 import json
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
 from os import access, R_OK, remove
 from os.path import isfile, exists
 from shutil import copy2
-from typing import Any
+from typing import Any, Dict, Generator, List, Optional, Tuple
 
 from yamlpath import __version__ as YAMLPATH_VERSION
 from yamlpath.common import Parsers
@@ -24,10 +26,10 @@ from yamlpath.merger.enums import (
     OutputDocTypes,
 )
 from yamlpath.merger.exceptions import MergeException
-from yamlpath.merger import Merger, MergerConfig
+from yamlpath.merger import Merger, MergerConfig, MergeCache
 from yamlpath.exceptions import YAMLPathException
 
-from yamlpath.wrappers import ConsolePrinter
+from yamlpath.wrappers import CapturedStream, ConsolePrinter
 
 def processcli():
     """Process command-line arguments."""
@@ -62,6 +64,20 @@ input files:
   Any file, including input from STDIN, may be a multi-document YAML, JSON,
   or compatible file.
 
+  With --jobs|-j greater than 1, YAML_FILEs are parsed concurrently by that
+  many worker processes but are still merged strictly in their left-to-right
+  order, so the result is identical to a serial run.
+
+merge cache:
+  With --cache, the results of merging the first 1, 2, 4, 8, ... YAML_FILEs
+  and of all but the last are cached on disk along with the final result,
+  keyed by the content of those files, the effective merge options, and the
+  version of this tool.  A later merge of the same YAML_FILEs resumes from
+  the longest cached leading subset which is unchanged.  No YAML_FILE at or
+  after - (STDIN) is cached.  The least recently used results are evicted
+  once the cache exceeds its size limit.  The cache is ignored unless it is
+  owned by you and writable by no other user.
+
 For more information about YAML Paths, please visit
 https://github.com/wwkimball/yamlpath/wiki.
 
@@ -151,6 +167,37 @@ https://github.com/wwkimball/yamlpath/issues.
             "provided), or match the type of the first document;\n"
             "default=auto"))
 
+    parser.add_argument(
+        "-j", "--jobs",
+        metavar="N",
+        type=int,
+        default=1,
+        help=(
+            "parse up to N YAML_FILEs concurrently using worker\n"
+            "processes; merging remains in order; default=1"))
+
+    cache_group = parser.add_argument_group(
+        "merge cache options")
+    cache_group.add_argument(
+        "--cache", action="store_true",
+        help="read and write cached merge results (see \"merge cache\")")
+    cache_group.add_argument(
+        "--cache-dir",
+        metavar="DIRECTORY",
+        default=MergeCache.get_default_cache_dir(),
+        help=(
+            "directory in which merge results are cached;\n"
+            "default={}".format(MergeCache.get_default_cache_dir())))
+    cache_group.add_argument(
+        "--cache-size",
+        metavar="MEGABYTES",
+        type=int,
+        default=MergeCache.DEFAULT_MAX_BYTES // (1024 * 1024),
+        help=(
+            "size limit of the merge cache before the least\n"
+            "recently used results are evicted; default={}"
+            .format(MergeCache.DEFAULT_MAX_BYTES // (1024 * 1024))))
+
     parser.add_argument(
         "-S", "--nostdin", action="store_true",
         help=(
@@ -236,15 +283,95 @@ def validateargs(args, log):
         has_errors = True
         log.error("The --backup|-b option applies only to OVERWRITE files.")
 
+    # There must be at least one job
+    if args.jobs < 1:
+        has_errors = True
+        log.error("The --jobs|-j option must be at least 1.")
+
+    # The cache cannot be smaller than nothing
+    if args.cache_size < 0:
+        has_errors = True
+        log.error("The --cache-size option cannot be negative.")
+
     if has_errors:
         sys.exit(1)
 
-def merge_multidoc(yaml_file, yaml_editor, log, merger, merger_primed):
+def parse_yaml_file(
+    yaml_file: str, log_args: argparse.Namespace
+) -> List[Tuple[Any, bool, List[Tuple[str, str]]]]:
+    """
+    Parse every document within a YAML_FILE; meant for worker processes.
+
+    Anything the parser would have written to STDOUT or STDERR is captured
+    separately for each document so the caller can replay it at the same
+    point a serial run would have written it.
+
+    Parameters:
+    1. yaml_file (str) The file to parse.
+    2. log_args (argparse.Namespace) Logging settings for the ConsolePrinter.
+
+    Returns:  (List[Tuple[Any, bool, List[Tuple[str, str]]]]) The parsed
+    data, load status, and captured console writes of each document.
+    """
+    log = ConsolePrinter(log_args)
+    yaml_editor = Parsers.get_yaml_editor()
+    documents: List[Tuple[Any, bool, List[Tuple[str, str]]]] = []
+    writes: List[Tuple[str, str]] = []
+    with redirect_stdout(CapturedStream("stdout", writes)), \
+            redirect_stderr(CapturedStream("stderr", writes)):
+        for (yaml_data, doc_loaded) in Parsers.get_yaml_multidoc_data(
+            yaml_editor, log, yaml_file
+        ):
+            documents.append((yaml_data, doc_loaded, list(writes)))
+            writes.clear()
+    return documents
+
+def parse_yaml_files(
+    executor: ProcessPoolExecutor, args: argparse.Namespace,
+    yaml_files: List[str]
+) -> Dict[int, Any]:
+    """
+    Begin parsing every readable YAML_FILE, except STDIN, concurrently.
+
+    A YAML_FILE which is listed more than once is parsed once per listing
+    because merging must never share any node with a prior merge source.
+
+    Parameters:
+    1. executor (ProcessPoolExecutor) The worker pool.
+    2. args (argparse.Namespace) The command-line arguments.
+    3. yaml_files (List[str]) The YAML_FILEs to parse.
+
+    Returns:  (Dict[int, Future]) The pending parse result of each YAML_FILE,
+    keyed by its position in yaml_files.
+    """
+    log_args = argparse.Namespace(
+        quiet=args.quiet, verbose=args.verbose, debug=args.debug)
+    parsing: Dict[int, Any] = {}
+    for (file_index, yaml_file) in enumerate(yaml_files):
+        if yaml_file.strip() != "-" and isfile(yaml_file):
+            parsing[file_index] = executor.submit(
+                parse_yaml_file, yaml_file, log_args)
+    return parsing
+
+def replay_parsed_documents(
+    documents: List[Tuple[Any, bool, List[Tuple[str, str]]]]
+) -> Generator[Tuple[Any, bool], None, None]:
+    """Relay pre-parsed documents along with their captured output."""
+    for (yaml_data, doc_loaded, writes) in documents:
+        for (stream_name, text) in writes:
+            getattr(sys, stream_name).write(text)
+        yield (yaml_data, doc_loaded)
+
+# pylint: disable=locally-disabled,too-many-arguments
+def merge_multidoc(
+    yaml_file, yaml_editor, log, merger, merger_primed, documents=None
+):
     """Merge all documents within a multi-document source."""
     exit_state = 0
-    for (yaml_data, doc_loaded) in Parsers.get_yaml_multidoc_data(
-        yaml_editor, log, yaml_file
-    ):
+    if documents is None:
+        documents = Parsers.get_yaml_multidoc_data(
+            yaml_editor, log, yaml_file)
+    for (yaml_data, doc_loaded) in documents:
         if not doc_loaded:
             # An error message has already been logged
             exit_state = 3
@@ -268,9 +395,10 @@ def merge_multidoc(yaml_file, yaml_editor, log, merger, merger_primed):
               .format(exit_state))
     return exit_state
 
+# pylint: disable=locally-disabled,too-many-arguments
 def process_yaml_file(
     merger: Merger, log: ConsolePrinter, rhs_yaml: Any, rhs_file: str,
-    merger_primed: bool
+    merger_primed: bool, parsing: Optional[Future] = None
 ):
     """Merge RHS document(s) into the prime document."""
     # Except for - (STDIN), each YAML_FILE must actually be a file; because
@@ -283,7 +411,34 @@ def process_yaml_file(
         "Processing {}...".format(
             "STDIN" if rhs_file.strip() == "-" else rhs_file))
 
-    return merge_multidoc(rhs_file, rhs_yaml, log, merger, merger_primed)
+    documents = None
+    if parsing is not None:
+        documents = replay_parsed_documents(parsing.result())
+
+    return merge_multidoc(
+        rhs_file, rhs_yaml, log, merger, merger_primed, documents)
+
+def get_cache_keys(
+    log: ConsolePrinter, config: MergerConfig, yaml_files: List[str]
+) -> List[str]:
+    """
+    Get the merge cache key of each cacheable, leading subset of YAML_FILEs.
+
+    Only the YAML_FILEs ahead of the first which is - (STDIN) or which cannot
+    be read are cacheable.
+    """
+    digests: List[str] = []
+    for yaml_file in yaml_files:
+        if yaml_file.strip() == "-" or not isfile(yaml_file):
+            break
+        try:
+            digests.append(MergeCache.get_file_digest(yaml_file))
+        except OSError as ex:
+            log.debug(
+                "yaml_merge::get_cache_keys:  Unable to digest {}:  {}"
+                .format(yaml_file, ex))
+            break
+    return MergeCache.get_prefix_keys(config, digests)
 
 def write_output_document(args, log, merger, yaml_editor):
     """Save a backup of the overwrite file, if requested."""
@@ -313,6 +468,7 @@ def write_output_document(args, log, merger, yaml_editor):
 
 def main():
     """Main code."""
+    # pylint: disable=locally-disabled,too-many-locals
     args = processcli()
     log = ConsolePrinter(args)
     validateargs(args, log)
@@ -327,7 +483,33 @@ def main():
     exit_state = 0
     consumed_stdin = False
     merger_primed = False
-    for yaml_file in args.yaml_files:
+
+    # Resume from the longest leading subset of YAML_FILEs which has already
+    # been merged, unchanged.
+    merge_cache: Optional[MergeCache] = None
+    cache_keys: List[str] = []
+    resume_count = 0
+    if args.cache:
+        merge_cache = MergeCache(
+            log, args.cache_dir, args.cache_size * 1024 * 1024)
+        cache_keys = get_cache_keys(log, merger.config, args.yaml_files)
+        (resume_count, cached_data) = merge_cache.find_longest_prefix(
+            cache_keys)
+        if resume_count > 0:
+            log.verbose(
+                "Resuming from the cached merge result of the first {}"
+                " YAML_FILE(s).".format(resume_count))
+            merger.data = cached_data
+            merger_primed = True
+    yaml_files = args.yaml_files[resume_count:]
+
+    executor: Optional[ProcessPoolExecutor] = None
+    parsing: Dict[int, Any] = {}
+    if args.jobs > 1 and len(yaml_files) > 1:
+        executor = ProcessPoolExecutor(max_workers=args.jobs)
+        parsing = parse_yaml_files(executor, args, yaml_files)
+
+    for file_index, yaml_file in enumerate(yaml_files, start=resume_count):
         if yaml_file.strip() == '-':
             consumed_stdin = True
 
@@ -335,14 +517,25 @@ def main():
             "yaml_merge::main:  Processing file, {}".format(
                 "STDIN" if yaml_file.strip() == "-" else yaml_file))
         proc_state = process_yaml_file(
-            merger, log, yaml_editor, yaml_file, merger_primed)
+            merger, log, yaml_editor, yaml_file, merger_primed,
+            parsing.get(file_index - resume_count))
 
         if proc_state == 0:
             merger_primed = True
+            if (merge_cache is not None
+                    and file_index < len(cache_keys)
+                    and MergeCache.is_checkpoint(
+                        file_index + 1, len(cache_keys))):
+                merge_cache.store(cache_keys[file_index], merger.data)
         else:
             exit_state = proc_state
             break
 
+    if executor is not None:
+        for pending in parsing.values():
+            pending.cancel()
+        executor.shutdown()
+
     # Check for a waiting STDIN document
     if (exit_state == 0
         and not consumed_stdin
@@ -352,6 +545,10 @@ def main():
         exit_state = process_yaml_file(
             merger, log, yaml_editor, '-', merger_primed)
 
+    log.verbose(
+        "Prepared merge rules in {:.3f} seconds."
+        .format(merger.config.prepare_seconds))
+
     # Output the final document
     if exit_state == 0:
         write_output_document(args, log, merger, yaml_editor)
@@ -9,18 +9,14 @@ Copyright 2019, 2020 William W. Kimball, Jr. MBA MSIS
 """
 import sys
 import argparse
-import json
 from os import access, R_OK
 from os.path import isfile
-from typing import Any, Generator, List, Optional, Tuple
-
-from ruamel.yaml.comments import CommentedSeq, CommentedMap
+from typing import Any, Dict, Generator, List, Optional, Set, Tuple
 
 from yamlpath import __version__ as YAMLPATH_VERSION
 from yamlpath.common import Parsers, Searches
 from yamlpath.exceptions import YAMLPathException
 from yamlpath.enums import (
-    AnchorMatches,
     IncludeAliases,
     PathSeperators,
     PathSearchMethods
@@ -29,6 +25,12 @@ from yamlpath.path import SearchTerms
 from yamlpath import YAMLPath
 from yamlpath.wrappers import ConsolePrinter
 from yamlpath.eyaml import EYAMLProcessor
+from yamlpath.commands.yaml_paths_helpers import (
+    format_result,
+    search_for_all_paths,
+    stream_results,
+    yield_child_nodes
+)
 
 def processcli():
     """Process command-line arguments."""
@@ -86,6 +88,12 @@ def processcli():
         "-X", "--noexpression",
         action="store_true",
         help="omit search expression decorators from the output")
+    valdump_group.add_argument(
+        "--ndjson",
+        action="store_true",
+        help="print each result as a JSON object on a line of its own; it has\
+            file, document, expression, path, and value members as permitted\
+            by the other result printing options")
     valdump_group.add_argument(
         "-P", "--noyamlpath",
         action="store_true",
@@ -93,6 +101,13 @@ def processcli():
             indicate whether a file has any matches without printing them\
             all, perhaps especially with --noexpression)")
 
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="print each result as soon as it is found, in document order\
+              rather than grouped by search expression; useful for very large\
+              documents")
+
     parser.add_argument(
         "-t", "--pathsep",
         default="dot",
@@ -257,7 +272,7 @@ def validateargs(args, log):
     if has_errors:
         sys.exit(1)
 
-# pylint: disable=locally-disabled,too-many-arguments,too-many-locals,too-many-branches
+# pylint: disable=locally-disabled,too-many-arguments
 def yield_children(logger: ConsolePrinter, data: Any,
                    terms: SearchTerms, pathsep: PathSeperators,
                    build_path: str, seen_anchors: List[str],
@@ -267,357 +282,36 @@ def yield_children(logger: ConsolePrinter, data: Any,
 
     Except for unwanted aliases, the dump is unconditional.
     """
-    include_key_aliases: bool = kwargs.pop("include_key_aliases", True)
-    include_value_aliases: bool = kwargs.pop("include_value_aliases", False)
-    search_anchors: bool = kwargs.pop("search_anchors", False)
-    logger.debug(
-        "Dumping all children in data of type, {}:"
-        .format(type(data)), data=data,
-        prefix="yaml_paths::yield_children:  ")
-
-    exclude_alias_matchers = [AnchorMatches.UNSEARCHABLE_ALIAS,
-                              AnchorMatches.ALIAS_EXCLUDED]
-
-    if isinstance(data, CommentedSeq):
-        if not build_path and pathsep is PathSeperators.FSLASH:
-            build_path = str(pathsep)
-        build_path += "["
-
-        for idx, ele in enumerate(data):
-            anchor_matched = Searches.search_anchor(
-                ele, terms, seen_anchors, search_anchors=search_anchors,
-                include_aliases=include_value_aliases)
-            logger.debug(
-                ("yaml_paths::yield_children<list>:  "
-                 + "element[{}] has anchor search => {}.")
-                .format(idx, anchor_matched))
-
-            # Build the temporary YAML Path using either Anchor or Index
-            if anchor_matched is AnchorMatches.NO_ANCHOR:
-                # Not an anchor/alias, so ref this node by its index
-                tmp_path = build_path + str(idx) + "]"
-            else:
-                tmp_path = "{}&{}]".format(
-                    build_path,
-                    YAMLPath.escape_path_section(ele.anchor.value, pathsep)
-                )
-
-            if (not include_value_aliases
-                    and anchor_matched in exclude_alias_matchers):
-                continue
-
-            if isinstance(ele, (CommentedMap, CommentedSeq)):
-                for path in yield_children(
-                        logger, ele, terms, pathsep, tmp_path, seen_anchors,
-                        search_anchors=search_anchors,
-                        include_key_aliases=include_key_aliases,
-                        include_value_aliases=include_value_aliases):
-                    yield path
-            else:
-                yield YAMLPath(tmp_path)
-
-    elif isinstance(data, CommentedMap):
-        if build_path:
-            build_path += str(pathsep)
-        elif pathsep is PathSeperators.FSLASH:
-            build_path = str(pathsep)
-
-        pool = data.non_merged_items()
-        if include_key_aliases or include_value_aliases:
-            pool = data.items()
-
-        for key, val in pool:
-            tmp_path = build_path + YAMLPath.escape_path_section(key, pathsep)
-
-            key_anchor_matched = Searches.search_anchor(
-                key, terms, seen_anchors, search_anchors=search_anchors,
-                include_aliases=include_key_aliases)
-            val_anchor_matched = Searches.search_anchor(
-                val, terms, seen_anchors, search_anchors=search_anchors,
-                include_aliases=include_value_aliases)
-            logger.debug(
-                ("yaml_paths::yield_children<dict>:  "
-                 + "key[{}]:value have value anchor search => {}:{}.")
-                .format(key, key_anchor_matched, val_anchor_matched))
-
-            if (
-                    (not include_key_aliases
-                     and key_anchor_matched in exclude_alias_matchers)
-                    or (not include_value_aliases
-                        and val_anchor_matched in exclude_alias_matchers)
-            ):
-                continue
-
-            if isinstance(val, (CommentedSeq, CommentedMap)):
-                for path in yield_children(
-                        logger, val, terms, pathsep, tmp_path, seen_anchors,
-                        search_anchors=search_anchors,
-                        include_key_aliases=include_key_aliases,
-                        include_value_aliases=include_value_aliases):
-                    yield path
-            else:
-                yield YAMLPath(tmp_path)
-
-    else:
-        if not build_path and pathsep is PathSeperators.FSLASH:
-            build_path = str(pathsep)
-        yield YAMLPath(build_path)
-
-# pylint: disable=locally-disabled,too-many-arguments,too-many-locals,too-many-branches,too-many-statements
+    for path, _ in yield_child_nodes(
+            logger, data, terms, pathsep, build_path, seen_anchors,
+            **kwargs):
+        yield path
+
+# pylint: disable=locally-disabled,too-many-arguments
 def search_for_paths(logger: ConsolePrinter, processor: EYAMLProcessor,
                      data: Any, terms: SearchTerms,
                      pathsep: PathSeperators = PathSeperators.DOT,
                      build_path: str = "",
                      seen_anchors: Optional[List[str]] = None,
+                     decrypted_values: Optional[Dict[str, str]] = None,
                      **kwargs: bool) -> Generator[YAMLPath, None, None]:
     """
     Recursively search a data structure for nodes matching an expression.
 
     The nodes can be keys, values, and/or elements.  When dealing with anchors
     and their aliases, the caller indicates whether to include only the
-    original anchor or the anchor and all of its (duplicate) aliases.
+    original anchor or the anchor and all of its (duplicate) aliases.  When
+    decrypting EYAML values, those already decrypted -- as by
+    EYAMLProcessor::decrypt_all -- can be supplied via `decrypted_values` to
+    avoid running the eyaml command for each of them.
     """
-    search_values: bool = kwargs.pop("search_values", True)
-    search_keys: bool = kwargs.pop("search_keys", False)
-    search_anchors: bool = kwargs.pop("search_anchors", False)
-    include_key_aliases: bool = kwargs.pop("include_key_aliases", True)
-    include_value_aliases: bool = kwargs.pop("include_value_aliases", False)
-    decrypt_eyaml: bool = kwargs.pop("decrypt_eyaml", False)
-    expand_children: bool = kwargs.pop("expand_children", False)
-    strsep = str(pathsep)
-    invert = terms.inverted
-    method = terms.method
-    term = terms.term
-
     if seen_anchors is None:
         seen_anchors = []
 
-    if isinstance(data, CommentedSeq):
-        # Build the path
-        if not build_path and pathsep is PathSeperators.FSLASH:
-            build_path = strsep
-        build_path += "["
-
-        for idx, ele in enumerate(data):
-            # Any element may or may not have an Anchor/Alias
-            anchor_matched = Searches.search_anchor(
-                ele, terms, seen_anchors, search_anchors=search_anchors,
-                include_aliases=include_value_aliases)
-            logger.debug(
-                ("yaml_paths::search_for_paths<list>:"
-                 + "anchor search => {}.")
-                .format(anchor_matched)
-            )
-
-            # Build the temporary YAML Path using either Anchor or Index
-            if anchor_matched is AnchorMatches.NO_ANCHOR:
-                # Not an anchor/alias, so ref this node by its index
-                tmp_path = build_path + str(idx) + "]"
-            else:
-                tmp_path = "{}&{}]".format(
-                    build_path,
-                    YAMLPath.escape_path_section(ele.anchor.value, pathsep)
-                )
-
-            if anchor_matched is AnchorMatches.ALIAS_EXCLUDED:
-                continue
-
-            if anchor_matched in [AnchorMatches.MATCH,
-                                  AnchorMatches.ALIAS_INCLUDED]:
-                logger.debug(
-                    ("yaml_paths::search_for_paths<list>:"
-                     + "yielding an Anchor/Alias match, {}.")
-                    .format(tmp_path)
-                )
-                if expand_children:
-                    for path in yield_children(
-                            logger, ele, terms, pathsep, tmp_path,
-                            seen_anchors, search_anchors=search_anchors,
-                            include_key_aliases=include_key_aliases,
-                            include_value_aliases=include_value_aliases):
-                        yield path
-                else:
-                    yield YAMLPath(tmp_path)
-                continue
-
-            if isinstance(ele, (CommentedSeq, CommentedMap)):
-                logger.debug(
-                    "Recursing into complex data:", data=ele,
-                    prefix="yaml_paths::search_for_paths<list>:  ",
-                    footer=">>>> >>>> >>>> >>>> >>>> >>>> >>>>")
-                for subpath in search_for_paths(
-                        logger, processor, ele, terms, pathsep, tmp_path,
-                        seen_anchors, search_values=search_values,
-                        search_keys=search_keys, search_anchors=search_anchors,
-                        include_key_aliases=include_key_aliases,
-                        include_value_aliases=include_value_aliases,
-                        decrypt_eyaml=decrypt_eyaml,
-                        expand_children=expand_children
-                ):
-                    logger.debug(
-                        "Yielding RECURSED match, {}.".format(subpath),
-                        prefix="yaml_paths::search_for_paths<list>:  ",
-                        footer="<<<< <<<< <<<< <<<< <<<< <<<< <<<<"
-                    )
-                    yield subpath
-            elif search_values:
-                if (anchor_matched is AnchorMatches.UNSEARCHABLE_ALIAS
-                        and not include_value_aliases):
-                    continue
-
-                check_value = ele
-                if decrypt_eyaml and processor.is_eyaml_value(ele):
-                    check_value = processor.decrypt_eyaml(ele)
-
-                matches = Searches.search_matches(method, term, check_value)
-                if (matches and not invert) or (invert and not matches):
-                    logger.debug(
-                        ("yaml_paths::search_for_paths<list>:"
-                         + "yielding VALUE match, {}:  {}."
-                        ).format(check_value, tmp_path)
-                    )
-                    yield YAMLPath(tmp_path)
-
-    # pylint: disable=too-many-nested-blocks
-    elif isinstance(data, CommentedMap):
-        if build_path:
-            build_path += strsep
-        elif pathsep is PathSeperators.FSLASH:
-            build_path = strsep
-
-        pool = data.non_merged_items()
-        if include_key_aliases or include_value_aliases:
-            pool = data.items()
-
-        for key, val in pool:
-            tmp_path = build_path + YAMLPath.escape_path_section(key, pathsep)
-
-            # Search the value anchor to have it on record, in case the key
-            # anchor match would otherwise block the value anchor from
-            # appearing in seen_anchors (which is important).
-            val_anchor_matched = Searches.search_anchor(
-                val, terms, seen_anchors, search_anchors=search_anchors,
-                include_aliases=include_value_aliases)
-            logger.debug(
-                ("yaml_paths::search_for_paths<dict>:"
-                 + "VALUE anchor search => {}.")
-                .format(val_anchor_matched)
-            )
-
-            # Search the key when the caller wishes it.
-            if search_keys:
-                # The key itself may be an Anchor or Alias.  Search it when the
-                # caller wishes.
-                key_anchor_matched = Searches.search_anchor(
-                    key, terms, seen_anchors, search_anchors=search_anchors,
-                    include_aliases=include_key_aliases)
-                logger.debug(
-                    ("yaml_paths::search_for_paths<dict>:"
-                     + "KEY anchor search, {}:  {}.")
-                    .format(key, key_anchor_matched)
-                )
-
-                if key_anchor_matched in [AnchorMatches.MATCH,
-                                          AnchorMatches.ALIAS_INCLUDED]:
-                    logger.debug(
-                        ("yaml_paths::search_for_paths<dict>:"
-                         + "yielding a KEY-ANCHOR match, {}."
-                        ).format(key, tmp_path)
-                    )
-                    if expand_children:
-                        for path in yield_children(
-                                logger, val, terms, pathsep, tmp_path,
-                                seen_anchors, search_anchors=search_anchors,
-                                include_key_aliases=include_key_aliases,
-                                include_value_aliases=include_value_aliases):
-                            yield path
-                    else:
-                        yield YAMLPath(tmp_path)
-                    continue
-
-                # Search the name of the key, itself
-                matches = Searches.search_matches(method, term, key)
-                if (matches and not invert) or (invert and not matches):
-                    logger.debug(
-                        ("yaml_paths::search_for_paths<dict>:"
-                         + "yielding KEY name match, {}:  {}."
-                        ).format(key, tmp_path)
-                    )
-                    if expand_children:
-                        # Include every non-excluded child node under this
-                        # matched parent node.
-                        for path in yield_children(
-                                logger, val, terms, pathsep, tmp_path,
-                                seen_anchors, search_anchors=search_anchors,
-                                include_key_aliases=include_key_aliases,
-                                include_value_aliases=include_value_aliases):
-                            yield path
-                    else:
-                        # No other matches within this node matter because they
-                        # are already in the result.
-                        yield YAMLPath(tmp_path)
-                    continue
-
-            # The value may itself be anchored; search it if requested
-            if val_anchor_matched is AnchorMatches.ALIAS_EXCLUDED:
-                continue
-
-            if val_anchor_matched in [AnchorMatches.MATCH,
-                                      AnchorMatches.ALIAS_INCLUDED]:
-                logger.debug(
-                    ("yaml_paths::search_for_paths<dict>:"
-                     + "yielding a VALUE-ANCHOR match, {}.")
-                    .format(tmp_path)
-                )
-                if expand_children:
-                    for path in yield_children(
-                            logger, val, terms, pathsep, tmp_path,
-                            seen_anchors, search_anchors=search_anchors,
-                            include_key_aliases=include_key_aliases,
-                            include_value_aliases=include_value_aliases):
-                        yield path
-                else:
-                    yield YAMLPath(tmp_path)
-                continue
-
-            if isinstance(val, (CommentedSeq, CommentedMap)):
-                logger.debug(
-                    "Recursing into complex data:", data=val,
-                    prefix="yaml_paths::search_for_paths<dict>:  ",
-                    footer=">>>> >>>> >>>> >>>> >>>> >>>> >>>>"
-                )
-                for subpath in search_for_paths(
-                        logger, processor, val, terms, pathsep, tmp_path,
-                        seen_anchors, search_values=search_values,
-                        search_keys=search_keys, search_anchors=search_anchors,
-                        include_key_aliases=include_key_aliases,
-                        include_value_aliases=include_value_aliases,
-                        decrypt_eyaml=decrypt_eyaml,
-                        expand_children=expand_children
-                ):
-                    logger.debug(
-                        "Yielding RECURSED match, {}.".format(subpath),
-                        prefix="yaml_paths::search_for_paths<dict>:  ",
-                        footer="<<<< <<<< <<<< <<<< <<<< <<<< <<<<"
-                    )
-                    yield subpath
-            elif search_values:
-                if (val_anchor_matched is AnchorMatches.UNSEARCHABLE_ALIAS
-                        and not include_value_aliases):
-                    continue
-
-                check_value = val
-                if decrypt_eyaml and processor.is_eyaml_value(val):
-                    check_value = processor.decrypt_eyaml(val)
-
-                matches = Searches.search_matches(method, term, check_value)
-                if (matches and not invert) or (invert and not matches):
-                    logger.debug(
-                        ("yaml_paths::search_for_paths<dict>:"
-                         + "yielding VALUE match, {}:  {}."
-                        ).format(check_value, tmp_path)
-                    )
-                    yield YAMLPath(tmp_path)
+    for path, _, _ in search_for_all_paths(
+            logger, processor, data, [terms], pathsep, build_path,
+            [seen_anchors], decrypted_values, **kwargs):
+        yield path
 
 def get_search_term(logger: ConsolePrinter,
                     expression: str) -> Optional[SearchTerms]:
@@ -658,53 +352,20 @@ def get_search_term(logger: ConsolePrinter,
     return exterm
 
 def print_results(
-    args: Any, processor: EYAMLProcessor, yaml_file: str,
-    yaml_paths: List[Tuple[str, YAMLPath]], document_index: int
+    args: Any, yaml_file: str, yaml_paths: List[Tuple[str, YAMLPath, Any]],
+    document_index: int
 ) -> None:
-    """Dump search results to STDOUT with optional and dynamic formatting."""
-    in_expressions = len(args.search)
-    print_file_path = not args.nofile
-    print_expression = in_expressions > 1 and not args.noexpression
-    print_yaml_path = not args.noyamlpath
-    print_value = args.values
-    buffers = [
-        ": " if print_file_path or print_expression and (
-            print_yaml_path or print_value
-            ) else "",
-        ": " if print_yaml_path and print_value else "",
-    ]
-    for entry in yaml_paths:
-        expression, result = entry
-        resline = ""
-
-        if print_file_path:
-            display_file_name = ("STDIN"
-                                 if yaml_file.strip() == "-"
-                                 else yaml_file)
-            resline += "{}/{}".format(display_file_name, document_index)
-
-        if print_expression:
-            resline += "[{}]".format(expression)
-
-        resline += buffers[0]
-        if print_yaml_path:
-            resline += "{}".format(result)
-
-        resline += buffers[1]
-        if print_value:
-            # These results can have only one match, but make sure lest the
-            # output become messy.
-            for node_coordinate in processor.get_nodes(result, mustexist=True):
-                node = node_coordinate.node
-                if isinstance(node, (dict, list)):
-                    resline += "{}".format(
-                        json.dumps(Parsers.jsonify_yaml_data(node)))
-                else:
-                    resline += "{}".format(str(node).replace("\n", r"\n"))
-                break
+    """
+    Dump search results to STDOUT with optional and dynamic formatting.
 
-        print(resline)
+    Each result is the search expression which found it, its YAML Path, and
+    its node.
+    """
+    for expression, result, node in yaml_paths:
+        print(format_result(
+            args, yaml_file, document_index, expression, result, node))
 
+# pylint: disable=locally-disabled,too-many-locals,too-many-branches
 def process_yaml_file(
     args, yaml, log, yaml_file, processor, search_values, search_keys,
     include_key_aliases, include_value_aliases, file_tally = 0
@@ -714,7 +375,32 @@ def process_yaml_file(
     exit_state = 0
     subdoc_index = -1
 
-    # pylint: disable=too-many-nested-blocks
+    # Compile every search and exception expression once so that each
+    # document can be searched for all of them in a single pass.
+    search_expressions: List[str] = []
+    search_terms: List[SearchTerms] = []
+    for expression in args.search:
+        exterm = get_search_term(log, expression)
+        log.debug(("yaml_paths::process_yaml_file:"
+                + "converting search expression '{}' into '{}'"
+                ).format(expression, exterm))
+        if exterm is None:
+            exit_state = 1
+            continue
+        search_expressions.append(expression)
+        search_terms.append(exterm)
+
+    search_count = len(search_terms)
+    for expression in args.except_expression or []:
+        exterm = get_search_term(log, expression)
+        log.debug(("yaml_paths::process_yaml_file:"
+                + "converted except expression '{}' into '{}'"
+                ).format(expression, exterm))
+        if exterm is None:
+            exit_state = 1
+            continue
+        search_terms.append(exterm)
+
     for (yaml_data, doc_loaded) in Parsers.get_yaml_multidoc_data(
         yaml, log, yaml_file
     ):
@@ -725,65 +411,57 @@ def process_yaml_file(
             exit_state = 3
             continue
 
-        # Process all searches
         processor.data = yaml_data
-        yaml_paths = []
-        for expression in args.search:
-            exterm = get_search_term(log, expression)
-            log.debug(("yaml_paths::process_yaml_file:"
-                    + "converting search expression '{}' into '{}'"
-                    ).format(expression, exterm))
-            if exterm is None:
-                exit_state = 1
-                continue
-
-            for result in search_for_paths(
-                    log, processor, yaml_data, exterm, args.pathsep,
-                    search_values=search_values, search_keys=search_keys,
-                    search_anchors=args.refnames,
-                    include_key_aliases=include_key_aliases,
-                    include_value_aliases=include_value_aliases,
-                    decrypt_eyaml=args.decrypt,
-                    expand_children=args.expand):
-                # Record only unique results
-                add_entry = True
-                for entry in yaml_paths:
-                    if str(result) == str(entry[1]):
-                        add_entry = False
-                        break
-                if add_entry:
-                    yaml_paths.append((expression, result))
-
-        if not yaml_paths:
-            # Nothing further to do when there are no results
+        if not search_count:
+            # Nothing further to do when there are no valid searches
             continue
 
-        if args.except_expression:
-            for expression in args.except_expression:
-                exterm = get_search_term(log, expression)
-                log.debug(("yaml_paths::process_yaml_file:"
-                        + "converted except expression '{}' into '{}'"
-                        ).format(expression, exterm))
-                if exterm is None:
-                    exit_state = 1
-                    continue
-
-                for result in search_for_paths(
-                        log, processor, yaml_data, exterm, args.pathsep,
-                        search_values=search_values,
-                        search_keys=search_keys,
-                        search_anchors=args.refnames,
-                        include_key_aliases=include_key_aliases,
-                        include_value_aliases=include_value_aliases,
-                        decrypt_eyaml=args.decrypt,
-                        expand_children=args.expand):
-                    for entry in yaml_paths:
-                        if str(result) == str(entry[1]):
-                            yaml_paths.remove(entry)
-                            break  # Entries are already unique
+        # Decrypt every EYAML value of the document at once rather than
+        # running the eyaml command for each value of every search.
+        decrypted_values = None
+        if args.decrypt and search_values:
+            decrypted_values = processor.decrypt_all()
+
+        # Search for every expression at once
+        all_results = search_for_all_paths(
+            log, processor, yaml_data, search_terms, args.pathsep,
+            decrypted_values=decrypted_values,
+            search_values=search_values, search_keys=search_keys,
+            search_anchors=args.refnames,
+            include_key_aliases=include_key_aliases,
+            include_value_aliases=include_value_aliases,
+            decrypt_eyaml=args.decrypt,
+            expand_children=args.expand)
+        if args.stream:
+            stream_results(
+                args, yaml_file, subdoc_index, search_expressions,
+                all_results)
+            continue
+
+        # Record the results of each search expression separately and those
+        # of every exception expression together.
+        search_results: List[List[Tuple[YAMLPath, Any]]] = [
+            [] for _ in range(search_count)]
+        excluded_results: Set[str] = set()
+        for result, node, term_indexes in all_results:
+            for term_index in term_indexes:
+                if term_index < search_count:
+                    search_results[term_index].append((result, node))
+                else:
+                    excluded_results.add(str(result))
+
+        # Record only unique, non-excluded results, each attributed to the
+        # first search expression to find it and in the order found.
+        yaml_paths: Dict[str, Tuple[str, YAMLPath, Any]] = {}
+        for expression, results in zip(search_expressions, search_results):
+            for result, node in results:
+                result_key = str(result)
+                if (result_key not in excluded_results
+                        and result_key not in yaml_paths):
+                    yaml_paths[result_key] = (expression, result, node)
 
         print_results(
-            args, processor, yaml_file, yaml_paths, subdoc_index)
+            args, yaml_file, list(yaml_paths.values()), subdoc_index)
 
     return exit_state
 
@@ -0,0 +1,562 @@
+"""
+Implement the search and output helpers of the yaml-paths command.
+
+Every search expression is evaluated during a single walk of the data, and
+each result is carried along with its node so it need not be retrieved again.
+Results can be formatted as text or NDJSON and streamed as they are found.
+
+Copyright 2019, 2020 William W. Kimball, Jr. MBA MSIS
+"""
+import json
+from copy import deepcopy
+from hashlib import blake2b
+from typing import (
+    Any, Dict, Generator, Iterable, List, Optional, Set, Tuple)
+
+from ruamel.yaml.comments import CommentedSeq, CommentedMap
+
+from yamlpath.common import Anchors, Parsers, Searches
+from yamlpath.enums import AnchorMatches, PathSeperators
+from yamlpath.path import SearchTerms
+from yamlpath import YAMLPath
+from yamlpath.wrappers import ConsolePrinter
+from yamlpath.eyaml import EYAMLProcessor
+
+# pylint: disable=locally-disabled,too-many-arguments,too-many-locals,too-many-branches
+def yield_child_nodes(
+    logger: ConsolePrinter, data: Any, terms: SearchTerms,
+    pathsep: PathSeperators, build_path: str, seen_anchors: List[str],
+    **kwargs: bool
+) -> Generator[Tuple[YAMLPath, Any], None, None]:
+    """
+    Dump the YAML Path and node of every child node beneath a given parent.
+
+    Except for unwanted aliases, the dump is unconditional.
+    """
+    include_key_aliases: bool = kwargs.pop("include_key_aliases", True)
+    include_value_aliases: bool = kwargs.pop("include_value_aliases", False)
+    search_anchors: bool = kwargs.pop("search_anchors", False)
+    logger.debug(
+        "Dumping all children in data of type, {}:"
+        .format(type(data)), data=data,
+        prefix="yaml_paths::yield_child_nodes:  ")
+
+    exclude_alias_matchers = [AnchorMatches.UNSEARCHABLE_ALIAS,
+                              AnchorMatches.ALIAS_EXCLUDED]
+
+    if isinstance(data, CommentedSeq):
+        if not build_path and pathsep is PathSeperators.FSLASH:
+            build_path = str(pathsep)
+        build_path += "["
+
+        for idx, ele in enumerate(data):
+            anchor_matched = Searches.search_anchor(
+                ele, terms, seen_anchors, search_anchors=search_anchors,
+                include_aliases=include_value_aliases)
+            logger.debug(
+                ("yaml_paths::yield_child_nodes<list>:  "
+                 + "element[{}] has anchor search => {}.")
+                .format(idx, anchor_matched))
+
+            # Build the temporary YAML Path using either Anchor or Index
+            if anchor_matched is AnchorMatches.NO_ANCHOR:
+                # Not an anchor/alias, so ref this node by its index
+                tmp_path = build_path + str(idx) + "]"
+            else:
+                tmp_path = "{}&{}]".format(
+                    build_path,
+                    YAMLPath.escape_path_section(ele.anchor.value, pathsep)
+                )
+
+            if (not include_value_aliases
+                    and anchor_matched in exclude_alias_matchers):
+                continue
+
+            if isinstance(ele, (CommentedMap, CommentedSeq)):
+                for child in yield_child_nodes(
+                        logger, ele, terms, pathsep, tmp_path, seen_anchors,
+                        search_anchors=search_anchors,
+                        include_key_aliases=include_key_aliases,
+                        include_value_aliases=include_value_aliases):
+                    yield child
+            else:
+                yield (YAMLPath(tmp_path), ele)
+
+    elif isinstance(data, CommentedMap):
+        if build_path:
+            build_path += str(pathsep)
+        elif pathsep is PathSeperators.FSLASH:
+            build_path = str(pathsep)
+
+        pool = data.non_merged_items()
+        if include_key_aliases or include_value_aliases:
+            pool = data.items()
+
+        for key, val in pool:
+            tmp_path = build_path + YAMLPath.escape_path_section(key, pathsep)
+
+            key_anchor_matched = Searches.search_anchor(
+                key, terms, seen_anchors, search_anchors=search_anchors,
+                include_aliases=include_key_aliases)
+            val_anchor_matched = Searches.search_anchor(
+                val, terms, seen_anchors, search_anchors=search_anchors,
+                include_aliases=include_value_aliases)
+            logger.debug(
+                ("yaml_paths::yield_child_nodes<dict>:  "
+                 + "key[{}]:value have value anchor search => {}:{}.")
+                .format(key, key_anchor_matched, val_anchor_matched))
+
+            if (
+                    (not include_key_aliases
+                     and key_anchor_matched in exclude_alias_matchers)
+                    or (not include_value_aliases
+                        and val_anchor_matched in exclude_alias_matchers)
+            ):
+                continue
+
+            if isinstance(val, (CommentedSeq, CommentedMap)):
+                for child in yield_child_nodes(
+                        logger, val, terms, pathsep, tmp_path, seen_anchors,
+                        search_anchors=search_anchors,
+                        include_key_aliases=include_key_aliases,
+                        include_value_aliases=include_value_aliases):
+                    yield child
+            else:
+                yield (YAMLPath(tmp_path), val)
+
+    else:
+        if not build_path and pathsep is PathSeperators.FSLASH:
+            build_path = str(pathsep)
+        yield (YAMLPath(build_path), data)
+
+def search_for_all_paths(
+    logger: ConsolePrinter, processor: EYAMLProcessor, data: Any,
+    terms: List[SearchTerms], pathsep: PathSeperators = PathSeperators.DOT,
+    build_path: str = "", seen_anchors: Optional[List[List[str]]] = None,
+    decrypted_values: Optional[Dict[str, str]] = None, **kwargs: bool
+) -> Generator[Tuple[YAMLPath, Any, List[int]], None, None]:
+    """
+    Search a data structure once for nodes matching any of several expressions.
+
+    This is equivalent to running `search_for_paths` once per expression
+    except the data is walked only once.  Each result is yielded along with
+    its node and the indexes of every expression in `terms` which matched it,
+    so the node need not be retrieved again via its YAML Path.  Taken one
+    expression at a time, the results are yielded in the same order as
+    `search_for_paths` would yield them for that expression alone.
+
+    Parameters:
+    1. logger (ConsolePrinter) Instance of ConsolePrinter or subclass
+    2. processor (EYAMLProcessor) Processor for any EYAML values
+    3. data (Any) The data to search
+    4. terms (List[SearchTerms]) The search expressions
+    5. pathsep (PathSeperators) The YAML Path seperator for results
+    6. build_path (str) The YAML Path of `data`
+    7. seen_anchors (Optional[List[List[str]]]) The Anchors already seen by
+       each expression, in the order of `terms`
+    8. decrypted_values (Optional[Dict[str, str]]) EYAML values which have
+       already been decrypted
+
+    Keyword Arguments:  The same as for `search_for_paths`
+
+    Returns:  (Generator[Tuple[YAMLPath, Any, List[int]], None, None]) Each
+    matching YAML Path, its node, and the indexes of the expressions which
+    matched it
+    """
+    if seen_anchors is None:
+        seen_anchors = [[] for _ in terms]
+
+    return _search_terms_for_paths(
+        logger, processor, data, terms, list(range(len(terms))), [], pathsep,
+        build_path, seen_anchors, decrypted_values,
+        search_values=kwargs.pop("search_values", True),
+        search_keys=kwargs.pop("search_keys", False),
+        search_anchors=kwargs.pop("search_anchors", False),
+        include_key_aliases=kwargs.pop("include_key_aliases", True),
+        include_value_aliases=kwargs.pop("include_value_aliases", False),
+        decrypt_eyaml=kwargs.pop("decrypt_eyaml", False),
+        expand_children=kwargs.pop("expand_children", False))
+
+# pylint: disable=locally-disabled,too-many-arguments,too-many-locals,too-many-branches,too-many-statements
+def _search_terms_for_paths(
+    logger: ConsolePrinter, processor: EYAMLProcessor, data: Any,
+    terms: List[SearchTerms], active_terms: List[int],
+    expanding_terms: List[int], pathsep: PathSeperators, build_path: str,
+    seen_anchors: List[List[str]],
+    decrypted_values: Optional[Dict[str, str]], **kwargs: bool
+) -> Generator[Tuple[YAMLPath, Any, List[int]], None, None]:
+    """
+    Recursively search a data structure for nodes matching any expression.
+
+    Only the expressions indexed by `active_terms` are evaluated; those which
+    match a parent node are not evaluated against its children.  The
+    expressions indexed by `expanding_terms` already matched a parent node, so
+    every child node they permit is a result.  Because all expressions visit
+    each node together, every expression which matches a node is reported
+    with it in a single result.
+    """
+    search_values: bool = kwargs["search_values"]
+    search_keys: bool = kwargs["search_keys"]
+    search_anchors: bool = kwargs["search_anchors"]
+    include_key_aliases: bool = kwargs["include_key_aliases"]
+    include_value_aliases: bool = kwargs["include_value_aliases"]
+    decrypt_eyaml: bool = kwargs["decrypt_eyaml"]
+    expand_children: bool = kwargs["expand_children"]
+    strsep = str(pathsep)
+    exclude_alias_matchers = [AnchorMatches.UNSEARCHABLE_ALIAS,
+                              AnchorMatches.ALIAS_EXCLUDED]
+    anchor_matchers = [AnchorMatches.MATCH, AnchorMatches.ALIAS_INCLUDED]
+
+    def is_match(term_index: int, value: Any) -> bool:
+        search_terms = terms[term_index]
+        matches = Searches.search_matches(
+            search_terms.method, search_terms.term, value)
+        return (matches and not search_terms.inverted) or (
+            search_terms.inverted and not matches)
+
+    def search_node(
+        node: Any, tmp_path: str, matched_terms: List[int],
+        searching_terms: List[int], child_expanding_terms: List[int]
+    ) -> Generator[Tuple[YAMLPath, Any, List[int]], None, None]:
+        if isinstance(node, (CommentedSeq, CommentedMap)):
+            if matched_terms:
+                yield (YAMLPath(tmp_path), node, sorted(matched_terms))
+            if not (searching_terms or child_expanding_terms):
+                return
+
+            logger.debug(
+                "Recursing into complex data:", data=node,
+                prefix="yaml_paths::search_for_paths:  ",
+                footer=">>>> >>>> >>>> >>>> >>>> >>>> >>>>")
+            for subpath in _search_terms_for_paths(
+                    logger, processor, node, terms, searching_terms,
+                    child_expanding_terms, pathsep, tmp_path, seen_anchors,
+                    decrypted_values, **kwargs
+            ):
+                logger.debug(
+                    "Yielding RECURSED match, {}.".format(subpath[0]),
+                    prefix="yaml_paths::search_for_paths:  ",
+                    footer="<<<< <<<< <<<< <<<< <<<< <<<< <<<<"
+                )
+                yield subpath
+            return
+
+        # Any expressions matching this scalar by value are reported together
+        # with those which already matched it in any other way.
+        if search_values and searching_terms:
+            check_value = node
+            if decrypt_eyaml and processor.is_eyaml_value(node):
+                if decrypted_values and node in decrypted_values:
+                    check_value = decrypted_values[node]
+                else:
+                    check_value = processor.decrypt_eyaml(node)
+
+            value_terms = [term_index for term_index in searching_terms
+                           if is_match(term_index, check_value)]
+            if value_terms:
+                logger.debug(
+                    ("yaml_paths::search_for_paths:"
+                     + "yielding VALUE match, {}:  {}."
+                    ).format(check_value, tmp_path)
+                )
+                matched_terms = matched_terms + value_terms
+
+        if matched_terms:
+            yield (YAMLPath(tmp_path), node, sorted(matched_terms))
+
+    if isinstance(data, CommentedSeq):
+        # Build the path
+        if not build_path and pathsep is PathSeperators.FSLASH:
+            build_path = strsep
+        build_path += "["
+
+        for idx, ele in enumerate(data):
+            # Build the temporary YAML Path using either Anchor or Index
+            if Anchors.get_node_anchor(ele) is None:
+                # Not an anchor/alias, so ref this node by its index
+                tmp_path = build_path + str(idx) + "]"
+            else:
+                tmp_path = "{}&{}]".format(
+                    build_path,
+                    YAMLPath.escape_path_section(ele.anchor.value, pathsep)
+                )
+
+            # Any element may or may not have an Anchor/Alias, which each
+            # expression tracks separately.
+            is_complex = isinstance(ele, (CommentedSeq, CommentedMap))
+            matched_terms: List[int] = []
+            searching_terms: List[int] = []
+            child_expanding_terms: List[int] = []
+            for term_index in expanding_terms:
+                anchor_matched = Searches.search_anchor(
+                    ele, terms[term_index], seen_anchors[term_index],
+                    search_anchors=search_anchors,
+                    include_aliases=include_value_aliases)
+                if (not include_value_aliases
+                        and anchor_matched in exclude_alias_matchers):
+                    continue
+                if is_complex:
+                    child_expanding_terms.append(term_index)
+                else:
+                    matched_terms.append(term_index)
+
+            anchor_matches = {
+                term_index: Searches.search_anchor(
+                    ele, terms[term_index], seen_anchors[term_index],
+                    search_anchors=search_anchors,
+                    include_aliases=include_value_aliases)
+                for term_index in active_terms}
+            logger.debug(
+                ("yaml_paths::search_for_paths<list>:"
+                 + "anchor search => {}.")
+                .format(anchor_matches)
+            )
+
+            for term_index, anchor_matched in anchor_matches.items():
+                if anchor_matched is AnchorMatches.ALIAS_EXCLUDED:
+                    continue
+
+                if anchor_matched in anchor_matchers:
+                    logger.debug(
+                        ("yaml_paths::search_for_paths<list>:"
+                         + "yielding an Anchor/Alias match, {}.")
+                        .format(tmp_path)
+                    )
+                    if expand_children and is_complex:
+                        child_expanding_terms.append(term_index)
+                    else:
+                        matched_terms.append(term_index)
+                    continue
+
+                if (anchor_matched is AnchorMatches.UNSEARCHABLE_ALIAS
+                        and not include_value_aliases
+                        and not is_complex):
+                    continue
+
+                searching_terms.append(term_index)
+
+            yield from search_node(
+                ele, tmp_path, matched_terms, searching_terms,
+                child_expanding_terms)
+
+    # pylint: disable=too-many-nested-blocks
+    elif isinstance(data, CommentedMap):
+        if build_path:
+            build_path += strsep
+        elif pathsep is PathSeperators.FSLASH:
+            build_path = strsep
+
+        pool = data.non_merged_items()
+        if include_key_aliases or include_value_aliases:
+            pool = data.items()
+
+        for key, val in pool:
+            tmp_path = build_path + YAMLPath.escape_path_section(key, pathsep)
+            is_complex = isinstance(val, (CommentedSeq, CommentedMap))
+            matched_terms = []
+            searching_terms = []
+            child_expanding_terms = []
+            for term_index in expanding_terms:
+                key_anchor_matched = Searches.search_anchor(
+                    key, terms[term_index], seen_anchors[term_index],
+                    search_anchors=search_anchors,
+                    include_aliases=include_key_aliases)
+                val_anchor_matched = Searches.search_anchor(
+                    val, terms[term_index], seen_anchors[term_index],
+                    search_anchors=search_anchors,
+                    include_aliases=include_value_aliases)
+                if (
+                        (not include_key_aliases
+                         and key_anchor_matched in exclude_alias_matchers)
+                        or (not include_value_aliases
+                            and val_anchor_matched in exclude_alias_matchers)
+                ):
+                    continue
+                if is_complex:
+                    child_expanding_terms.append(term_index)
+                else:
+                    matched_terms.append(term_index)
+
+            # Search the value anchor to have it on record, in case the key
+            # anchor match would otherwise block the value anchor from
+            # appearing in seen_anchors (which is important).
+            val_anchor_matches = {
+                term_index: Searches.search_anchor(
+                    val, terms[term_index], seen_anchors[term_index],
+                    search_anchors=search_anchors,
+                    include_aliases=include_value_aliases)
+                for term_index in active_terms}
+            logger.debug(
+                ("yaml_paths::search_for_paths<dict>:"
+                 + "VALUE anchor search => {}.")
+                .format(val_anchor_matches)
+            )
+
+            for term_index, val_anchor_matched in val_anchor_matches.items():
+                # Search the key when the caller wishes it.
+                if search_keys:
+                    # The key itself may be an Anchor or Alias.  Search it
+                    # when the caller wishes.
+                    key_anchor_matched = Searches.search_anchor(
+                        key, terms[term_index], seen_anchors[term_index],
+                        search_anchors=search_anchors,
+                        include_aliases=include_key_aliases)
+                    logger.debug(
+                        ("yaml_paths::search_for_paths<dict>:"
+                         + "KEY anchor search, {}:  {}.")
+                        .format(key, key_anchor_matched)
+                    )
+
+                    # Search the name of the key, itself, unless its anchor
+                    # already matched.  No other matches within this node
+                    # matter because they are already in the result.
+                    if (key_anchor_matched in anchor_matchers
+                            or is_match(term_index, key)):
+                        logger.debug(
+                            ("yaml_paths::search_for_paths<dict>:"
+                             + "yielding a KEY match, {}:  {}."
+                            ).format(key, tmp_path)
+                        )
+                        if expand_children and is_complex:
+                            # Include every non-excluded child node under
+                            # this matched parent node.
+                            child_expanding_terms.append(term_index)
+                        else:
+                            matched_terms.append(term_index)
+                        continue
+
+                # The value may itself be anchored; search it if requested
+                if val_anchor_matched is AnchorMatches.ALIAS_EXCLUDED:
+                    continue
+
+                if val_anchor_matched in anchor_matchers:
+                    logger.debug(
+                        ("yaml_paths::search_for_paths<dict>:"
+                         + "yielding a VALUE-ANCHOR match, {}.")
+                        .format(tmp_path)
+                    )
+                    if expand_children and is_complex:
+                        child_expanding_terms.append(term_index)
+                    else:
+                        matched_terms.append(term_index)
+                    continue
+
+                if (val_anchor_matched is AnchorMatches.UNSEARCHABLE_ALIAS
+                        and not include_value_aliases
+                        and not is_complex):
+                    continue
+
+                searching_terms.append(term_index)
+
+            yield from search_node(
+                val, tmp_path, matched_terms, searching_terms,
+                child_expanding_terms)
+
+def format_result(
+    args: Any, yaml_file: str, document_index: int, expression: str,
+    result: YAMLPath, node: Any
+) -> str:
+    """
+    Format one search result for output, as text or as a line of NDJSON.
+
+    Parameters:
+    1. args (Any) The command-line arguments
+    2. yaml_file (str) The file which was searched; - for STDIN
+    3. document_index (int) The index of the searched document in yaml_file
+    4. expression (str) The search expression which found the result
+    5. result (YAMLPath) The YAML Path of the result
+    6. node (Any) The node found at the result
+
+    Returns:  (str) The formatted result
+    """
+    print_file_path = not args.nofile
+    print_yaml_path = not args.noyamlpath
+    print_value = args.values
+    display_file_name = "STDIN" if yaml_file.strip() == "-" else yaml_file
+
+    # Complex values are copied lest the searched data be changed.
+    if print_value and isinstance(node, (dict, list)):
+        node = Parsers.jsonify_yaml_data(deepcopy(node))
+
+    if args.ndjson:
+        record: Dict[str, Any] = {}
+        if print_file_path:
+            record["file"] = display_file_name
+            record["document"] = document_index
+        if not args.noexpression:
+            record["expression"] = expression
+        if print_yaml_path:
+            record["path"] = str(result)
+        if print_value:
+            record["value"] = (
+                node if isinstance(node, (dict, list))
+                else Parsers.jsonify_yaml_data(node))
+        return json.dumps(record, default=str)
+
+    print_expression = len(args.search) > 1 and not args.noexpression
+    resline = ""
+    if print_file_path:
+        resline += "{}/{}".format(display_file_name, document_index)
+
+    if print_expression:
+        resline += "[{}]".format(expression)
+
+    if print_file_path or print_expression and (
+            print_yaml_path or print_value):
+        resline += ": "
+
+    if print_yaml_path:
+        resline += "{}".format(result)
+
+    if print_yaml_path and print_value:
+        resline += ": "
+
+    if print_value:
+        if isinstance(node, (dict, list)):
+            resline += "{}".format(json.dumps(node))
+        else:
+            resline += "{}".format(str(node).replace("\n", r"\n"))
+
+    return resline
+
+def stream_results(
+    args: Any, yaml_file: str, document_index: int,
+    search_expressions: List[str],
+    results: Iterable[Tuple[YAMLPath, Any, List[int]]]
+) -> None:
+    """
+    Dump search results to STDOUT as soon as each is found.
+
+    Results are printed in document order.  Only a fixed-size digest of each
+    result's YAML Path is retained to suppress duplicates.  Any result which
+    was also matched by an exception expression -- indexed after those of
+    `search_expressions` -- is suppressed, as are any later duplicates of it.
+
+    Parameters:
+    1. args (Any) The command-line arguments
+    2. yaml_file (str) The file which was searched; - for STDIN
+    3. document_index (int) The index of the searched document in yaml_file
+    4. search_expressions (List[str]) The search expressions, in the order of
+       the expression indexes of `results`
+    5. results (Iterable[Tuple[YAMLPath, Any, List[int]]]) The results, as
+       yielded by `search_for_all_paths`
+
+    Returns:  N/A
+    """
+    search_count = len(search_expressions)
+    seen_results: Set[bytes] = set()
+    for result, node, term_indexes in results:
+        result_digest = blake2b(
+            str(result).encode("utf-8"), digest_size=16).digest()
+        if result_digest in seen_results:
+            continue
+        seen_results.add(result_digest)
+
+        # The expression indexes are sorted, so only the last can belong to
+        # an exception expression.
+        if term_indexes[-1] >= search_count:
+            continue
+
+        print(format_result(
+            args, yaml_file, document_index,
+            search_expressions[term_indexes[0]], result, node))
@@ -155,6 +155,14 @@ def processcli():
         help="the eyaml binary to use when it isn't on the PATH")
     eyaml_group.add_argument("-r", "--privatekey", help="EYAML private key")
     eyaml_group.add_argument("-u", "--publickey", help="EYAML public key")
+    eyaml_group.add_argument(
+        "--eyaml-jobs",
+        metavar="N",
+        type=int,
+        default=1,
+        help=(
+            "run up to N eyaml commands concurrently when matched values must"
+            " be decrypted one at a time; default=1"))
 
     parser.add_argument(
         "-S", "--nostdin", action="store_true",
@@ -261,6 +269,11 @@ def validateargs(args, log):
         log.error(
             "EYAML public key is not a readable file:  " + args.publickey)
 
+    # There must be at least one EYAML job
+    if args.eyaml_jobs < 1:
+        has_errors = True
+        log.error("The --eyaml-jobs option must be at least 1.")
+
     # When set, --random-from must have at least two characters
     if len(args.random_from) < 2:
         has_errors = True
@@ -526,7 +539,8 @@ def main():
     # Load the present nodes at the specified YAML Path
     processor = EYAMLProcessor(
         log, yaml_data, binary=args.eyaml,
-        publickey=args.publickey, privatekey=args.privatekey)
+        publickey=args.publickey, privatekey=args.privatekey,
+        jobs=args.eyaml_jobs)
     change_node_coordinates = _get_nodes(
         log, processor, change_path, must_exist=must_exist,
         default_value=("" if new_value else " "))
@@ -542,29 +556,31 @@ def main():
 
     # Check the value(s), if desired
     if args.check:
-        for node_coordinate in change_node_coordinates:
-            if processor.is_eyaml_value(node_coordinate.node):
-                # Sanity check:  If either --publickey or --privatekey were set
-                # then they must both be set in order to decrypt this value.
-                # This is enforced only when the value must be decrypted due to
-                # a --check request.
-                if (
-                        (args.publickey and not args.privatekey)
-                        or (args.privatekey and not args.publickey)
-                ):
-                    log.error(
-                        "Neither or both private and public EYAML keys must be"
-                        + " set when --check is required to decrypt the old"
-                        + " value.")
-                    sys.exit(1)
-
-                try:
-                    check_value = processor.decrypt_eyaml(node_coordinate.node)
-                except EYAMLCommandException as ex:
-                    log.critical(ex, 1)
-            else:
-                check_value = node_coordinate.node
+        old_values = [
+            node_coordinate.node
+            for node_coordinate in change_node_coordinates]
+        if any(processor.is_eyaml_value(value) for value in old_values):
+            # Sanity check:  If either --publickey or --privatekey were set
+            # then they must both be set in order to decrypt these values.
+            # This is enforced only when the values must be decrypted due to
+            # a --check request.
+            if (
+                    (args.publickey and not args.privatekey)
+                    or (args.privatekey and not args.publickey)
+            ):
+                log.error(
+                    "Neither or both private and public EYAML keys must be"
+                    + " set when --check is required to decrypt the old"
+                    + " value.")
+                sys.exit(1)
+
+            # Decrypt all of the old values at once
+            try:
+                old_values = processor.decrypt_many(old_values)
+            except EYAMLCommandException as ex:
+                log.critical(ex, 1)
 
+        for check_value in old_values:
             if not args.check == check_value:
                 log.critical(
                     '"{}" does not match the check value.'
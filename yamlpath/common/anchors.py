@@ -3,7 +3,7 @@ Implement Anchors, a static library of generally-useful code for YAML Anchors.
 
 Copyright 2020 William W. Kimball, Jr. MBA MSIS
 """
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from ruamel.yaml.comments import CommentedSeq, CommentedMap
 
@@ -56,18 +56,35 @@ class Anchors:
 
         Returns:  N/A
         """
+        Anchors.rename_anchors(dom, {anchor: new_anchor})
+
+    @staticmethod
+    def rename_anchors(dom: Any, renames: Dict[str, str]):
+        """
+        Rename every use of any number of anchors in a single document pass.
+
+        Parameters:
+        1. dom (Any) The document to modify.
+        2. renames (Dict[str, str]) Map of old anchor names to the new names
+           which shall replace them.
+
+        Returns:  N/A
+        """
+        if not renames:
+            return
+
         if isinstance(dom, CommentedMap):
             for key, val in dom.non_merged_items():
-                if hasattr(key, "anchor") and key.anchor.value == anchor:
-                    key.anchor.value = new_anchor
-                if hasattr(val, "anchor") and val.anchor.value == anchor:
-                    val.anchor.value = new_anchor
-                Anchors.rename_anchor(val, anchor, new_anchor)
+                if hasattr(key, "anchor") and key.anchor.value in renames:
+                    key.anchor.value = renames[key.anchor.value]
+                if hasattr(val, "anchor") and val.anchor.value in renames:
+                    val.anchor.value = renames[val.anchor.value]
+                Anchors.rename_anchors(val, renames)
         elif isinstance(dom, CommentedSeq):
             for ele in dom:
-                Anchors.rename_anchor(ele, anchor, new_anchor)
-        elif hasattr(dom, "anchor") and dom.anchor.value == anchor:
-            dom.anchor.value = new_anchor
+                Anchors.rename_anchors(ele, renames)
+        elif hasattr(dom, "anchor") and dom.anchor.value in renames:
+            dom.anchor.value = renames[dom.anchor.value]
 
     @staticmethod
     def replace_merge_anchor(data: Any, old_node: Any, repl_node: Any) -> None:
@@ -107,33 +124,93 @@ class Anchors:
 
         Returns:  N/A
         """
-        anchor_name = repl_node.anchor.value
+        Anchors.replace_anchors(data, [(old_node, repl_node)])
+
+    @staticmethod
+    def replace_anchors(
+        data: Any, replacements: List[Tuple[Any, Any]]
+    ) -> None:
+        """
+        Replace every use of any number of anchors in a single DOM pass.
+
+        Parameters:
+        1. data (Any) The DOM to adjust.
+        2. replacements (List[Tuple[Any, Any]]) Pairs of former anchor nodes
+           and the replacement anchor nodes which shall supplant them.
+
+        Returns:  N/A
+        """
+        if not replacements:
+            return
+
+        repl_by_name: Dict[str, Any] = {}
+        repl_by_id: Dict[int, Any] = {}
+        for old_node, repl_node in replacements:
+            repl_by_name[repl_node.anchor.value] = repl_node
+            repl_by_id[id(old_node)] = repl_node
+        Anchors._replace_anchors(data, repl_by_name, repl_by_id)
+
+    @staticmethod
+    def _replace_merge_anchors(data: Any, repl_by_id: Dict[int, Any]) -> None:
+        """
+        Replace anchor merge references to any number of former nodes.
+
+        Parameters:
+        1. data (Any) The DOM to adjust.
+        2. repl_by_id (Dict[int, Any]) Replacement anchor nodes keyed by the
+           id() of the former anchor nodes they supplant.
+
+        Returns:  N/A
+        """
+        if hasattr(data, "merge") and len(data.merge) > 0:
+            for midx, merge_node in enumerate(data.merge):
+                if id(merge_node[1]) in repl_by_id:
+                    data.merge[midx] = (
+                        merge_node[0], repl_by_id[id(merge_node[1])])
+
+    @staticmethod
+    def _replace_anchors(
+        data: Any, repl_by_name: Dict[str, Any], repl_by_id: Dict[int, Any]
+    ) -> None:
+        """
+        Recursively replace every use of any number of anchors within a DOM.
+
+        Parameters:
+        1. data (Any) The DOM to adjust.
+        2. repl_by_name (Dict[str, Any]) Replacement anchor nodes keyed by
+           their anchor names.
+        3. repl_by_id (Dict[int, Any]) Replacement anchor nodes keyed by the
+           id() of the former anchor nodes they supplant.
+
+        Returns:  N/A
+        """
         if isinstance(data, CommentedMap):
-            Anchors.replace_merge_anchor(data, old_node, repl_node)
+            Anchors._replace_merge_anchors(data, repl_by_id)
             for idx, key in [
                 (idx, key) for idx, key in enumerate(data.keys())
                 if hasattr(key, "anchor")
-                    and key.anchor.value == anchor_name
+                    and key.anchor.value in repl_by_name
             ]:
-                Anchors.replace_merge_anchor(key, old_node, repl_node)
-                data.insert(idx, repl_node, data.pop(key))
+                Anchors._replace_merge_anchors(key, repl_by_id)
+                data.insert(
+                    idx, repl_by_name[key.anchor.value], data.pop(key))
 
             for key, val in data.non_merged_items():
-                Anchors.replace_merge_anchor(key, old_node, repl_node)
-                Anchors.replace_merge_anchor(val, old_node, repl_node)
+                Anchors._replace_merge_anchors(key, repl_by_id)
+                Anchors._replace_merge_anchors(val, repl_by_id)
                 if (hasattr(val, "anchor")
-                        and val.anchor.value == anchor_name):
-                    data[key] = repl_node
+                        and val.anchor.value in repl_by_name):
+                    data[key] = repl_by_name[val.anchor.value]
                 else:
-                    Anchors.replace_anchor(val, old_node, repl_node)
+                    Anchors._replace_anchors(val, repl_by_name, repl_by_id)
         elif isinstance(data, CommentedSeq):
             for idx, ele in enumerate(data):
-                Anchors.replace_merge_anchor(ele, old_node, repl_node)
+                Anchors._replace_merge_anchors(ele, repl_by_id)
                 if (hasattr(ele, "anchor")
-                        and ele.anchor.value == anchor_name):
-                    data[idx] = repl_node
+                        and ele.anchor.value in repl_by_name):
+                    data[idx] = repl_by_name[ele.anchor.value]
                 else:
-                    Anchors.replace_anchor(ele, old_node, repl_node)
+                    Anchors._replace_anchors(ele, repl_by_name, repl_by_id)
 
     @staticmethod
     def generate_unique_anchor_name(
@@ -1,4 +1,5 @@
 """YAML Path diff calculation classes."""
 from .diffentry import DiffEntry
 from .differconfig import DifferConfig
+from .listsynchronizer import ListSynchronizer
 from .differ import Differ
@@ -4,7 +4,7 @@ Implement DiffEntry.
 Copyright 2020 William W. Kimball, Jr. MBA MSIS
 """
 import json
-from typing import Any
+from typing import Any, Tuple
 
 from ruamel.yaml.comments import CommentedBase, TaggedScalar
 
@@ -14,8 +14,19 @@ from yamlpath import YAMLPath
 from .enums.diffactions import DiffActions
 
 
+# pylint: disable=locally-disabled,too-many-instance-attributes
 class DiffEntry:
-    """One entry of a diff."""
+    """
+    One entry of a diff.
+
+    A large diff can have very many entries, so each is kept compact.  Only
+    the unparsed form of the YAML Path is stored; a YAMLPath is recreated
+    from it only on demand.
+    """
+
+    __slots__ = (
+        "_action", "_path", "_path_seperator", "_pathsep", "_lhs", "_rhs",
+        "_key_tag", "_sort_key", "_verbose")
 
     def __init__(
         self, action: DiffActions, path: YAMLPath, lhs: Any, rhs: Any,
@@ -23,7 +34,9 @@ class DiffEntry:
     ):
         """Initiate a new DiffEntry."""
         self._action: DiffActions = action
-        self._path: YAMLPath = path
+        self._path: str = path.original
+        self._path_seperator: PathSeperators = path.seperator
+        self._pathsep: PathSeperators = self._path_seperator
         self._lhs: Any = lhs
         self._rhs: Any = rhs
         self._key_tag = kwargs.pop("key_tag", None)
@@ -38,21 +51,21 @@ class DiffEntry:
         rhs_iteration = kwargs.pop("rhs_iteration", 0)
         lhs_iteration = 0 if lhs_iteration is None else lhs_iteration
         rhs_iteration = 0 if rhs_iteration is None else rhs_iteration
-        lhs_line = float(lhs_lc)
-        if lhs_line == 0.0 or self.action is DiffActions.ADD:
+        if lhs_lc == (0, 0) or self.action is DiffActions.ADD:
             lhs_lc, rhs_lc = rhs_lc, lhs_lc
-        self._index = "{}.{}.{}.{}".format(
-            lhs_lc, lhs_iteration, rhs_lc, rhs_iteration)
+        self._sort_key: Tuple[int, int, int, int, int, int] = (
+            lhs_lc[0], lhs_lc[1], int(lhs_iteration),
+            rhs_lc[0], rhs_lc[1], int(rhs_iteration))
 
     def __str__(self) -> str:
         """Get the string representation of this object."""
         diffaction = self._action
-        path = self._path if self._path else "-"
+        path = self.path if self._path else "-"
         key_tag = ""
         if self._key_tag:
             key_tag = " {}".format(self._key_tag)
         output = "{}{} {}{}\n".format(
-            diffaction, self._index if self.verbose else "", path, key_tag)
+            diffaction, self.index if self.verbose else "", path, key_tag)
         if diffaction is DiffActions.ADD:
             output += DiffEntry._present_data(self._rhs, ">")
         elif diffaction is DiffActions.CHANGE:
@@ -73,7 +86,9 @@ class DiffEntry:
     @property
     def path(self) -> YAMLPath:
         """Get the YAML Path of this difference (read-only)."""
-        return self._path
+        yaml_path = YAMLPath(self._path, self._path_seperator)
+        yaml_path.seperator = self._pathsep
+        return yaml_path
 
     @property
     def lhs(self) -> Any:
@@ -83,19 +98,22 @@ class DiffEntry:
     @property
     def index(self) -> str:
         """Get the sortable index for this entry (read-only)."""
-        return self._index
+        return "{}.{}.{}.{}.{}.{}".format(*self._sort_key)
+
+    @property
+    def sort_key(self) -> Tuple[int, int, int, int, int, int]:
+        """Get the document-order sort key of this entry (read-only)."""
+        return self._sort_key
 
     @property
     def pathsep(self) -> PathSeperators:
         """Seperator used to delimit reported YAML Paths (accessor)."""
-        return self._path.seperator
+        return self._pathsep
 
     @pathsep.setter
     def pathsep(self, value: PathSeperators) -> None:
         """Seperator used to delimit reported YAML Paths (mutator)."""
-        # No unnecessary changes
-        if value is not self.pathsep:
-            self._path.seperator = value
+        self._pathsep = value
 
     @property
     def verbose(self) -> bool:
@@ -110,22 +128,22 @@ class DiffEntry:
             self._verbose = value
 
     @classmethod
-    def _get_lc(cls, data: Any) -> str:
-        """Get the line.column of a data element."""
-        data_lc = "0.0"
+    def _get_lc(cls, data: Any) -> Tuple[int, int]:
+        """Get the line and column of a data element."""
+        data_lc = (0, 0)
         if isinstance(data, CommentedBase):
             dlc = data.lc
-            data_lc = "{}.{}".format(
+            data_lc = (
                 dlc.line if dlc.line is not None else 0,
                 dlc.col if dlc.col is not None else 0
             )
         return data_lc
 
     @classmethod
-    def _get_index(cls, data: Any, parent: Any) -> str:
+    def _get_index(cls, data: Any, parent: Any) -> Tuple[int, int]:
         """Get the document index of a data element."""
         data_lc = DiffEntry._get_lc(data)
-        if data_lc == "0.0":
+        if data_lc == (0, 0):
             data_lc = DiffEntry._get_lc(parent)
         return data_lc
 
@@ -3,10 +3,13 @@ Implement YAML document Differ.
 
 Copyright 2020 William W. Kimball, Jr. MBA MSIS
 """
+from datetime import date
+from hashlib import sha256
 from itertools import zip_longest
-from typing import Any, Dict, Generator, List, Optional, Tuple
+from typing import (
+    Any, Dict, Generator, Iterable, List, Optional, Tuple)
 
-from ruamel.yaml.comments import CommentedMap, CommentedSeq
+from ruamel.yaml.comments import CommentedMap, CommentedSeq, TaggedScalar
 
 from yamlpath import YAMLPath
 from yamlpath.wrappers import ConsolePrinter, NodeCoords
@@ -14,11 +17,16 @@ from yamlpath.eyaml import EYAMLProcessor
 from .enums import ArrayDiffOpts, AoHDiffOpts, DiffActions
 from .diffentry import DiffEntry
 from .differconfig import DifferConfig
+from .listsynchronizer import ListSynchronizer
 
 
+# pylint: disable=locally-disabled,too-many-instance-attributes
 class Differ:
     """Calculates the difference between two YAML documents."""
 
+    # Scalar types which are digested as-is when detecting identical subtrees
+    _PLAIN_SCALAR_TYPES = (str, int, float, bool, type(None))
+
     def __init__(
         self, config: DifferConfig, logger: ConsolePrinter, document: Any,
         **kwargs
@@ -30,17 +38,37 @@ class Differ:
         1. logger (ConsolePrinter) Instance of ConsoleWriter or subclass
         2. document (Any) The basis document
 
+        Keyword Arguments:
+        * report_same (bool) Whether to report SAME entries; when False,
+          identical subtrees of the two documents are skipped without being
+          compared node-by-node; default=True
+        * Any other keyword arguments are passed to EYAMLProcessor
+
         Returns:  N/A
 
         Raises:  N/A
         """
         ignore_eyaml = kwargs.pop("ignore_eyaml_values", True)
+        report_same = kwargs.pop("report_same", True)
 
         self.config: DifferConfig = config
         self.logger: ConsolePrinter = logger
         self._data: Any = document
         self._diffs: List[DiffEntry] = []
         self._ignore_eyaml: bool = ignore_eyaml
+        self._report_same: bool = report_same
+
+        # Structural digests of collection nodes, keyed by node identity.  The
+        # basis document is never changed, so its digests are kept for the
+        # life of this Differ while those of each compared document are not.
+        self._lhs_digests: Dict[int, Optional[bytes]] = {}
+        self._rhs_digests: Dict[int, Optional[bytes]] = {}
+
+        # Likewise, the key positions of every basis Hash are kept so this
+        # Differ can be efficiently reused to compare many documents.
+        self._lhs_key_indicies: Dict[int, Dict[Any, int]] = {}
+        self._synchronizer: ListSynchronizer = ListSynchronizer(
+            config, logger)
         self._eyamlproc = (None
                            if ignore_eyaml
                            else EYAMLProcessor(logger, document, **kwargs))
@@ -49,16 +77,60 @@ class Differ:
         """Perform the diff calculation."""
         self._diffs.clear()
         self.config.prepare(document)
-        self._diff_between(YAMLPath(), self._data, document)
+        self._rhs_digests.clear()
+        self._diffs.extend(
+            self._diff_between(YAMLPath(), self._data, document))
+        self._rhs_digests.clear()
+
+    def compare_each(
+        self, documents: Iterable[Any]
+    ) -> Generator[List[DiffEntry], None, None]:
+        """
+        Compare many documents, one at a time, against the basis document.
+
+        Whatever is learned about the basis document while comparing it to
+        one document is reused while comparing it to the next.
+
+        Parameters:
+        1. documents (Iterable[Any]) The documents to compare against the
+           basis document
+
+        Returns:  (Generator[List[DiffEntry], None, None]) The sorted report
+        of each document, in turn
+        """
+        for document in documents:
+            self.compare_to(document)
+            yield list(self.get_report())
+
+    def stream_compare_to(
+        self, document: Any
+    ) -> Generator[DiffEntry, None, None]:
+        """
+        Perform the diff calculation, yielding each entry as it is found.
+
+        Entries are yielded in the order the two documents are walked (LHS
+        document order, with new RHS nodes following their LHS siblings)
+        rather than the sorted order of get_report.  None are retained, so
+        get_report will afterward yield nothing.
+
+        Parameters:
+        1. document (Any) The document to compare against the basis document
+
+        Returns:  (Generator[DiffEntry, None, None]) Each difference
+        """
+        self._diffs.clear()
+        self.config.prepare(document)
+        self._rhs_digests.clear()
+        yield from self._diff_between(YAMLPath(), self._data, document)
+        self._rhs_digests.clear()
 
     def get_report(self) -> Generator[DiffEntry, None, None]:
         """Get the diff report."""
-        for entry in sorted(
-            self._diffs, key=lambda e: [int(i) for i in e.index.split('.')]
-        ):
-            yield entry
+        yield from sorted(self._diffs, key=lambda e: e.sort_key)
 
-    def _purge_document(self, path: YAMLPath, data: Any):
+    def _purge_document(
+        self, path: YAMLPath, data: Any
+    ) -> Generator[DiffEntry, None, None]:
         """Delete every node in the document."""
         if isinstance(data, CommentedMap):
             lhs_iteration = -1
@@ -66,24 +138,22 @@ class Differ:
                 lhs_iteration += 1
                 next_path = (path +
                     YAMLPath.escape_path_section(key, path.seperator))
-                self._diffs.append(
-                    DiffEntry(
-                        DiffActions.DELETE, next_path, val, None,
-                        lhs_parent=data, lhs_iteration=lhs_iteration))
+                yield DiffEntry(
+                    DiffActions.DELETE, next_path, val, None,
+                    lhs_parent=data, lhs_iteration=lhs_iteration)
         elif isinstance(data, CommentedSeq):
             for idx, ele in enumerate(data):
                 next_path = path + "[{}]".format(idx)
-                self._diffs.append(
-                    DiffEntry(
-                        DiffActions.DELETE, next_path, ele, None,
-                        lhs_parent=data, lhs_iteration=idx))
+                yield DiffEntry(
+                    DiffActions.DELETE, next_path, ele, None,
+                    lhs_parent=data, lhs_iteration=idx)
         else:
             if data is not None:
-                self._diffs.append(
-                    DiffEntry(DiffActions.DELETE, path, data, None)
-                )
+                yield DiffEntry(DiffActions.DELETE, path, data, None)
 
-    def _add_everything(self, path: YAMLPath, data: Any) -> None:
+    def _add_everything(
+        self, path: YAMLPath, data: Any
+    ) -> Generator[DiffEntry, None, None]:
         """Add every node in the document."""
         if isinstance(data, CommentedMap):
             rhs_iteration = -1
@@ -91,26 +161,22 @@ class Differ:
                 rhs_iteration += 1
                 next_path = (path +
                     YAMLPath.escape_path_section(key, path.seperator))
-                self._diffs.append(
-                    DiffEntry(
-                        DiffActions.ADD, next_path, None, val,
-                        rhs_parent=data, rhs_iteration=rhs_iteration))
+                yield DiffEntry(
+                    DiffActions.ADD, next_path, None, val,
+                    rhs_parent=data, rhs_iteration=rhs_iteration)
         elif isinstance(data, CommentedSeq):
             for idx, ele in enumerate(data):
                 next_path = path + "[{}]".format(idx)
-                self._diffs.append(
-                    DiffEntry(
-                        DiffActions.ADD, next_path, None, ele,
-                        rhs_parent=data, rhs_iteration=idx))
+                yield DiffEntry(
+                    DiffActions.ADD, next_path, None, ele,
+                    rhs_parent=data, rhs_iteration=idx)
         else:
             if data is not None:
-                self._diffs.append(
-                    DiffEntry(DiffActions.ADD, path, None, data)
-                )
+                yield DiffEntry(DiffActions.ADD, path, None, data)
 
     def _diff_scalars(
         self, path: YAMLPath, lhs: Any, rhs: Any, **kwargs
-    ) -> None:
+    ) -> Generator[DiffEntry, None, None]:
         """Diff two Scalar values."""
         self.logger.debug(
             "Comparing LHS:",
@@ -133,18 +199,20 @@ class Differ:
                 rhs_val = self._eyamlproc.decrypt_eyaml(rhs)
                 rhs = rhs.replace("\r", "").replace(" ", "")
 
-        if lhs_val == rhs_val:
-            self._diffs.append(
-                DiffEntry(DiffActions.SAME, path, lhs, rhs, **kwargs)
-            )
-        else:
-            self._diffs.append(
-                DiffEntry(DiffActions.CHANGE, path, lhs, rhs, **kwargs)
-            )
+        # Tagged Scalars are equal only by identity, so compare their parts
+        if isinstance(lhs_val, TaggedScalar):
+            lhs_val = (lhs_val.tag.value, lhs_val.value)
+        if isinstance(rhs_val, TaggedScalar):
+            rhs_val = (rhs_val.tag.value, rhs_val.value)
+
+        if lhs_val != rhs_val:
+            yield DiffEntry(DiffActions.CHANGE, path, lhs, rhs, **kwargs)
+        elif self._report_same:
+            yield DiffEntry(DiffActions.SAME, path, lhs, rhs, **kwargs)
 
     def _diff_dicts(
         self, path: YAMLPath, lhs: CommentedMap, rhs: CommentedMap
-    ) -> None:
+    ) -> Generator[DiffEntry, None, None]:
         """Diff two dicts."""
         self.logger.debug(
             "Comparing LHS:",
@@ -163,17 +231,18 @@ class Differ:
                 "Dictionaries have different YAML Tags; {} != {}:".format(
                     lhs_tag, rhs_tag),
                 prefix="Differ::_diff_dicts:  ")
-            self._diffs.append(
-                DiffEntry(
-                    DiffActions.DELETE, path, lhs, None, key_tag=lhs_tag))
-            self._diffs.append(
-                DiffEntry(
-                    DiffActions.ADD, path, None, rhs, key_tag=rhs_tag))
+            yield DiffEntry(
+                DiffActions.DELETE, path, lhs, None, key_tag=lhs_tag)
+            yield DiffEntry(
+                DiffActions.ADD, path, None, rhs, key_tag=rhs_tag)
             return
 
-        lhs_keys = set(lhs)
-        rhs_keys = set(rhs)
-        lhs_key_indicies = Differ._get_key_indicies(lhs)
+        lhs_id = id(lhs)
+        if lhs_id in self._lhs_key_indicies:
+            lhs_key_indicies = self._lhs_key_indicies[lhs_id]
+        else:
+            lhs_key_indicies = Differ._get_key_indicies(lhs)
+            self._lhs_key_indicies[lhs_id] = lhs_key_indicies
         rhs_key_indicies = Differ._get_key_indicies(rhs)
 
         self.logger.debug(
@@ -185,44 +254,39 @@ class Differ:
             prefix="Differ::_diff_dicts:  ",
             data=rhs_key_indicies)
 
-        # Look for changes
-        for key, val in [
-            (key, val) for key, val in rhs.items()
-            if key in lhs and key in rhs
-        ]:
-            next_path = (path +
-                YAMLPath.escape_path_section(key, path.seperator))
-            self._diff_between(
-                next_path, lhs[key], val,
-                lhs_parent=lhs, lhs_iteration=lhs_key_indicies[key],
-                rhs_parent=rhs, rhs_iteration=rhs_key_indicies[key],
-                parentref=key)
-
-        # Look for deleted keys
-        for key in lhs_keys - rhs_keys:
+        # Look for changed and deleted keys in LHS document order
+        for key, val in lhs.items():
             next_path = (path +
                 YAMLPath.escape_path_section(key, path.seperator))
-            self._diffs.append(
-                DiffEntry(
-                    DiffActions.DELETE, next_path, lhs[key], None,
+            if key in rhs:
+                yield from self._diff_between(
+                    next_path, val, rhs[key],
+                    lhs_parent=lhs, lhs_iteration=lhs_key_indicies[key],
+                    rhs_parent=rhs, rhs_iteration=rhs_key_indicies[key],
+                    parentref=key)
+            else:
+                yield DiffEntry(
+                    DiffActions.DELETE, next_path, val, None,
                     lhs_parent=lhs, lhs_iteration=lhs_key_indicies[key],
                     rhs_parent=rhs,
-                    key_tag=key.tag.value if hasattr(key, "tag") else None))
+                    key_tag=key.tag.value if hasattr(key, "tag") else None)
 
-        # Look for new keys
-        for key in rhs_keys - lhs_keys:
+        # Look for new keys in RHS document order
+        for key, val in rhs.items():
+            if key in lhs:
+                continue
             next_path = (path +
                 YAMLPath.escape_path_section(key, path.seperator))
-            self._diffs.append(
-                DiffEntry(
-                    DiffActions.ADD, next_path, None, rhs[key],
-                    lhs_parent=lhs,
-                    rhs_parent=rhs, rhs_iteration=rhs_key_indicies[key],
-                    key_tag=key.tag.value if hasattr(key, "tag") else None))
+            yield DiffEntry(
+                DiffActions.ADD, next_path, None, val,
+                lhs_parent=lhs,
+                rhs_parent=rhs, rhs_iteration=rhs_key_indicies[key],
+                key_tag=key.tag.value if hasattr(key, "tag") else None)
 
+    # pylint: disable=locally-disabled,too-many-locals
     def _diff_synced_lists(
         self, path: YAMLPath, lhs: CommentedSeq, rhs: CommentedSeq
-    ) -> None:
+    ) -> Generator[DiffEntry, None, None]:
         """Diff two synchronized lists."""
         self.logger.debug("Differ::_diff_synced_lists:  Starting...")
         self.logger.debug(
@@ -243,49 +307,78 @@ class Differ:
             prefix="Differ::_diff_syncd_lists:  ",
             data=syn_pairs)
 
+        # Hold the DELETEs for this list by their element index, which is the
+        # only part of their YAML Paths that differs, until every ADD is known.
+        pending_deletes: Dict[Optional[int], DiffEntry] = {}
         for (lidx, lele, ridx, rele) in syn_pairs:
             if lele is None:
                 next_path = path + "[{}]".format(ridx)
                 diff_action = DiffActions.ADD
                 opposite_val = None
-                pop_index = -1
-                for idx, ele in reversed(list(enumerate(self._diffs))):
-                    if (ele.action is DiffActions.DELETE
-                        and ele.path == next_path
-                    ):
-                        pop_index = idx
-                        break
 
                 # This YAML Path has ALREADY been recorded as a DELETE.  Since
-                # a DELETE->ADD action is really just a CHANGE, remove the
+                # a DELETE->ADD action is really just a CHANGE, discard the
                 # conflicting entry and convert this pending ADD to a CHANGE.
-                if pop_index > -1:
-                    opposite_val = self._diffs.pop(pop_index).lhs
+                pending_delete = pending_deletes.pop(ridx, None)
+                if pending_delete is not None:
+                    opposite_val = pending_delete.lhs
                     diff_action = DiffActions.CHANGE
 
-                self._diffs.append(DiffEntry(
+                yield DiffEntry(
                     diff_action, next_path, opposite_val, rele,
                     lhs_parent=lhs, lhs_iteration=lidx,
-                    rhs_parent=rhs, rhs_iteration=ridx))
+                    rhs_parent=rhs, rhs_iteration=ridx)
             elif rele is None:
                 next_path = path + "[{}]".format(lidx)
-                self._diffs.append(
-                    DiffEntry(
-                        DiffActions.DELETE, next_path, lele, None,
-                        lhs_parent=lhs, lhs_iteration=lidx,
-                        rhs_parent=rhs, rhs_iteration=ridx))
+                pending_deletes[lidx] = DiffEntry(
+                    DiffActions.DELETE, next_path, lele, None,
+                    lhs_parent=lhs, lhs_iteration=lidx,
+                    rhs_parent=rhs, rhs_iteration=ridx)
             else:
                 next_path = path + "[{}]".format(lidx)
-                self._diff_between(
+                yield from self._diff_between(
                     next_path, lele, rele,
                     lhs_parent=lhs, lhs_iteration=lidx,
                     rhs_parent=rhs, rhs_iteration=ridx,
                     parentref=ridx)
 
+        yield from pending_deletes.values()
+
+    def _diff_aligned_lists(
+        self, path: YAMLPath, lhs: CommentedSeq, rhs: CommentedSeq
+    ) -> Generator[DiffEntry, None, None]:
+        """Diff two lists aligned by their longest common subsequence."""
+        syn_pairs = ListSynchronizer.synchronize_lists_by_lcs(lhs, rhs)
+        self.logger.debug(
+            "Got aligned pairs of Array elements at YAML Path, {}:"
+            .format(path if path else "/"),
+            prefix="Differ::_diff_aligned_lists:  ",
+            data=syn_pairs)
+
+        for (lidx, lele, ridx, rele) in syn_pairs:
+            if lidx is None:
+                yield DiffEntry(
+                    DiffActions.ADD, path + "[{}]".format(ridx), None,
+                    rele,
+                    lhs_parent=lhs, lhs_iteration=lidx,
+                    rhs_parent=rhs, rhs_iteration=ridx)
+            elif ridx is None:
+                yield DiffEntry(
+                    DiffActions.DELETE, path + "[{}]".format(lidx), lele,
+                    None,
+                    lhs_parent=lhs, lhs_iteration=lidx,
+                    rhs_parent=rhs, rhs_iteration=ridx)
+            else:
+                yield from self._diff_between(
+                    path + "[{}]".format(ridx), lele, rele,
+                    lhs_parent=lhs, lhs_iteration=lidx,
+                    rhs_parent=rhs, rhs_iteration=ridx,
+                    parentref=ridx)
+
     def _diff_arrays_of_scalars(
         self, path: YAMLPath, lhs: CommentedSeq, rhs: CommentedSeq,
         node_coord: NodeCoords, **kwargs
-    ) -> None:
+    ) -> Generator[DiffEntry, None, None]:
         """Diff two lists of scalars."""
         self.logger.debug(
             "Comparing LHS:",
@@ -298,7 +391,10 @@ class Differ:
 
         diff_mode = self.config.array_diff_mode(node_coord)
         if diff_mode is ArrayDiffOpts.VALUE:
-            self._diff_synced_lists(path, lhs, rhs)
+            yield from self._diff_synced_lists(path, lhs, rhs)
+            return
+        if diff_mode is ArrayDiffOpts.LCS:
+            yield from self._diff_aligned_lists(path, lhs, rhs)
             return
 
         idx = 0
@@ -307,35 +403,32 @@ class Differ:
             next_path = path + "[{}]".format(idx)
             idx += 1
             if lele is None:
-                self._diffs.append(
-                    DiffEntry(
-                        DiffActions.ADD, next_path, None, rele,
-                        lhs_parent=lhs, lhs_iteration=idx,
-                        rhs_parent=rhs, rhs_iteration=idx))
+                yield DiffEntry(
+                    DiffActions.ADD, next_path, None, rele,
+                    lhs_parent=lhs, lhs_iteration=idx,
+                    rhs_parent=rhs, rhs_iteration=idx)
             elif rele is None:
-                self._diffs.append(
-                    DiffEntry(
-                        DiffActions.DELETE, next_path, lele, None,
-                        lhs_parent=lhs, lhs_iteration=idx,
-                        rhs_parent=rhs, rhs_iteration=idx))
+                yield DiffEntry(
+                    DiffActions.DELETE, next_path, lele, None,
+                    lhs_parent=lhs, lhs_iteration=idx,
+                    rhs_parent=rhs, rhs_iteration=idx)
             elif diff_deeply:
-                self._diff_between(
+                yield from self._diff_between(
                     next_path, lele, rele,
                     lhs_parent=lhs, lhs_iteration=idx,
                     rhs_parent=rhs, rhs_iteration=idx,
                     parentref=idx)
             elif lele != rele:
-                self._diffs.append(
-                    DiffEntry(
-                        DiffActions.CHANGE, next_path, lele, rele,
-                        lhs_parent=lhs, lhs_iteration=idx,
-                        rhs_parent=rhs, rhs_iteration=idx,
-                        parentref=idx))
+                yield DiffEntry(
+                    DiffActions.CHANGE, next_path, lele, rele,
+                    lhs_parent=lhs, lhs_iteration=idx,
+                    rhs_parent=rhs, rhs_iteration=idx,
+                    parentref=idx)
 
     def _diff_arrays_of_hashes(
         self, path: YAMLPath, lhs: CommentedSeq, rhs: CommentedSeq,
         node_coord: NodeCoords
-    ) -> None:
+    ) -> Generator[DiffEntry, None, None]:
         """Diff two lists-of-dictionaries."""
         self.logger.debug(
             "Comparing LHS:",
@@ -348,15 +441,18 @@ class Differ:
 
         diff_mode = self.config.aoh_diff_mode(node_coord)
         if diff_mode is AoHDiffOpts.POSITION:
-            self._diff_arrays_of_scalars(
+            yield from self._diff_arrays_of_scalars(
                 path, lhs, rhs, node_coord, diff_deeply=False)
             return
         if diff_mode is AoHDiffOpts.DPOS:
-            self._diff_arrays_of_scalars(
+            yield from self._diff_arrays_of_scalars(
                 path, lhs, rhs, node_coord, diff_deeply=True)
             return
         if diff_mode is AoHDiffOpts.VALUE:
-            self._diff_synced_lists(path, lhs, rhs)
+            yield from self._diff_synced_lists(path, lhs, rhs)
+            return
+        if diff_mode is AoHDiffOpts.LCS:
+            yield from self._diff_aligned_lists(path, lhs, rhs)
             return
         deep_diff = diff_mode is AoHDiffOpts.DEEP
 
@@ -383,22 +479,20 @@ class Differ:
         for (lidx, lele, ridx, rele) in syn_pairs:
             if lele is None:
                 next_path = path + "[{}]".format(ridx)
-                self._diffs.append(
-                    DiffEntry(
-                        DiffActions.ADD, next_path, None, rele,
-                        lhs_parent=lhs, lhs_iteration=lidx,
-                        rhs_parent=rhs, rhs_iteration=ridx))
+                yield DiffEntry(
+                    DiffActions.ADD, next_path, None, rele,
+                    lhs_parent=lhs, lhs_iteration=lidx,
+                    rhs_parent=rhs, rhs_iteration=ridx)
             elif rele is None:
                 next_path = path + "[{}]".format(lidx)
-                self._diffs.append(
-                    DiffEntry(
-                        DiffActions.DELETE, next_path, lele, None,
-                        lhs_parent=lhs, lhs_iteration=lidx,
-                        rhs_parent=rhs, rhs_iteration=ridx))
+                yield DiffEntry(
+                    DiffActions.DELETE, next_path, lele, None,
+                    lhs_parent=lhs, lhs_iteration=lidx,
+                    rhs_parent=rhs, rhs_iteration=ridx)
             else:
                 if deep_diff:
                     next_path = path + "[{}]".format(ridx)
-                    self._diff_between(
+                    yield from self._diff_between(
                         next_path, lele, rele,
                         lhs_parent=lhs, lhs_iteration=lidx,
                         rhs_parent=rhs, rhs_iteration=ridx,
@@ -409,15 +503,17 @@ class Differ:
                     diff_action = (DiffActions.SAME
                                   if lele == rele
                                   else DiffActions.CHANGE)
-                    self._diffs.append(
-                        DiffEntry(diff_action, next_path, lele, rele,
+                    if (diff_action is DiffActions.SAME
+                            and not self._report_same):
+                        continue
+                    yield DiffEntry(diff_action, next_path, lele, rele,
                         lhs_parent=lhs, lhs_iteration=lidx,
                         rhs_parent=rhs, rhs_iteration=ridx,
-                        parentref=lidx))
+                        parentref=lidx)
 
     def _diff_lists(
         self, path: YAMLPath, lhs: CommentedSeq, rhs: CommentedSeq, **kwargs
-    ) -> None:
+    ) -> Generator[DiffEntry, None, None]:
         """Diff two lists."""
         self.logger.debug(
             "Comparing LHS:",
@@ -434,14 +530,16 @@ class Differ:
         if len(rhs) > 0:
             if isinstance(rhs[0], CommentedMap):
                 # This list is an Array-of-Hashes
-                self._diff_arrays_of_hashes(path, lhs, rhs, node_coord)
+                yield from self._diff_arrays_of_hashes(
+                    path, lhs, rhs, node_coord)
             else:
                 # This list is an Array-of-Arrays or a simple list of Scalars
-                self._diff_arrays_of_scalars(path, lhs, rhs, node_coord)
+                yield from self._diff_arrays_of_scalars(
+                    path, lhs, rhs, node_coord)
 
     def _diff_between(
         self, path: YAMLPath, lhs: Any, rhs: Any, **kwargs
-    ) -> None:
+    ) -> Generator[DiffEntry, None, None]:
         """Calculate the differences between two document nodes."""
         self.logger.debug(
             "Comparing LHS:",
@@ -465,15 +563,23 @@ class Differ:
             or (lhs_is_scalar and rhs_is_scalar)
         )
         if same_types:
+            if (not (self._report_same or lhs_is_scalar)
+                    and self._subtrees_match(lhs, rhs)):
+                self.logger.debug(
+                    "Skipping identical subtrees at YAML Path, {}."
+                    .format(path if path else "/"),
+                    prefix="Differ::_diff_between:  ")
+                return
+
             if lhs_is_dict:
-                self._diff_dicts(path, lhs, rhs)
+                yield from self._diff_dicts(path, lhs, rhs)
             elif lhs_is_list:
-                self._diff_lists(path, lhs, rhs, **kwargs)
+                yield from self._diff_lists(path, lhs, rhs, **kwargs)
             else:
-                self._diff_scalars(path, lhs, rhs, **kwargs)
+                yield from self._diff_scalars(path, lhs, rhs, **kwargs)
         else:
-            self._purge_document(path, lhs)
-            self._add_everything(path, rhs)
+            yield from self._purge_document(path, lhs)
+            yield from self._add_everything(path, rhs)
 
     @classmethod
     def synchronize_lists_by_value(
@@ -482,112 +588,78 @@ class Differ:
         Optional[int], Optional[Any], Optional[int], Optional[Any]
     ]]:
         """Synchronize two lists by value."""
-        # Build a parallel index array to track the original RHS element
-        # indexes of any surviving elements.
-        rhs_reduced = []
-        for original_idx, val in enumerate(rhs):
-            rhs_reduced.append((original_idx, val))
-
-        syn_pairs: List[Tuple[
-            Optional[int], Optional[Any], Optional[int], Optional[Any]
-        ]] = []
-        for lhs_idx, lhs_ele in enumerate(lhs):
-            del_index = -1
-            for reduced_idx, rhs_pair in enumerate(rhs_reduced):
-                (_, rhs_ele) = rhs_pair
-                if rhs_ele == lhs_ele:
-                    del_index = reduced_idx
-                    break
-
-            if del_index > -1:
-                (rhs_original_idx, rhs_ele) = rhs_reduced.pop(del_index)
-                syn_pairs.append((lhs_idx, lhs_ele, rhs_original_idx, rhs_ele))
-            else:
-                syn_pairs.append((lhs_idx, lhs_ele, None, None))
+        return ListSynchronizer.synchronize_lists_by_value(lhs, rhs)
 
-        for rhs_pair in rhs_reduced:
-            (rhs_original_idx, rhs_ele) = rhs_pair
-            syn_pairs.append((None, None, rhs_original_idx, rhs_ele))
-
-        return syn_pairs
-
-    #pylint: disable=too-many-locals
     def synchronize_lods_by_key(
         self, path: YAMLPath, lhs: CommentedSeq, rhs: CommentedSeq
     ) -> List[Tuple[
         Optional[int], Optional[Any], Optional[int], Optional[Any]
     ]]:
         """Synchronize two lists-of-dictionaries by identity key."""
-        # Build a parallel index array to track the original RHS element
-        # indexes of any surviving elements.
-        key_attr: str = ""
-        if len(rhs) > 0 and isinstance(rhs[0], CommentedMap):
-            (key_attr, _) = self.config.aoh_diff_key(
-                NodeCoords(rhs[0], rhs, 0))
-            self.logger.debug(
-                "Differ::synchronize_lods_by_key:  RHS AoH yielded key_attr:"
-                "  {}.".format(key_attr))
-
-        rhs_reduced = []
-        for original_idx, val in enumerate(rhs):
-            rhs_reduced.append((original_idx, val))
-
-        syn_pairs: List[Tuple[
-            Optional[int], Optional[Any], Optional[int], Optional[Any]
-        ]] = []
-        for lhs_idx, lhs_ele in enumerate(lhs):
-            if not key_attr in lhs_ele:
-                # Impossible to match this LHS record to any RHS record
-                self.logger.debug(
-                    "LHS record has no identity key, {}, for record at {}:"
-                    .format(key_attr, path),
-                    data=lhs_ele,
-                    prefix="Differ::synchronize_lods_by_key:  ")
-                syn_pairs.append((lhs_idx, lhs_ele, None, None))
-                continue
+        return self._synchronizer.synchronize_lods_by_key(path, lhs, rhs)
 
-            del_index = -1
-            for reduced_idx, rhs_pair in enumerate(rhs_reduced):
-                (rhs_idx, rhs_ele) = rhs_pair
-
-                # Check for a custom identity key assignment for this record
-                use_key = key_attr
-                (alt_key, is_user_key) = self.config.aoh_diff_key(
-                    NodeCoords(rhs_ele, rhs, rhs_idx))
-
-                if is_user_key and alt_key:
-                    use_key = alt_key
-                    self.logger.debug(
-                        "Using alternate key, {}, for record at {}[{}]."
-                        .format(use_key, path, rhs_idx),
-                        data=rhs_ele,
-                        prefix="Differ::synchronize_lods_by_key:  ")
-                else:
-                    self.logger.debug(
-                        "Using inferred key, {}, for record at {}[{}]."
-                        .format(use_key, path, rhs_idx),
-                        data=rhs_ele,
-                        prefix="Differ::synchronize_lods_by_key:  ")
-
-                if not use_key in rhs_ele:
-                    # Impossible to match this RHS record to any LHS record
+    def _subtrees_match(self, lhs: Any, rhs: Any) -> bool:
+        """Indicate whether two subtrees are structurally identical."""
+        lhs_digest = Differ._get_structure_token(lhs, self._lhs_digests)
+        return (lhs_digest is not None
+                and lhs_digest == Differ._get_structure_token(
+                    rhs, self._rhs_digests))
+
+    @classmethod
+    def _get_structure_token(
+        cls, data: Any, digests: Dict[int, Optional[bytes]]
+    ) -> Any:
+        """
+        Get a token of a subtree's keys, values, YAML Tags, and their order.
+
+        Collections are represented by a digest of the tokens of their
+        children, which is cached in digests, while Scalars represent
+        themselves.  Subtrees with equal tokens compare as wholly SAME.  None
+        is returned for any subtree containing a value which cannot be safely
+        compared this way (like NaN, which is unequal even to itself).
+        """
+        if isinstance(data, (CommentedMap, CommentedSeq)):
+            data_id = id(data)
+            if data_id in digests:
+                return digests[data_id]
+
+            tokens: List[Any] = [
+                type(data).__name__,
+                data.tag.value if hasattr(data, "tag") else None]
+            children = (
+                (ele for pair in data.items() for ele in pair)
+                if isinstance(data, CommentedMap)
+                else data)
+            digest: Optional[bytes] = None
+            for child in children:
+                # Fast path for the most common Scalars
+                child_type = type(child)
+                if child_type in Differ._PLAIN_SCALAR_TYPES:
+                    # pylint: disable=locally-disabled,comparison-with-itself
+                    if child_type is float and child != child:
+                        break
+                    tokens.append(child)
                     continue
 
-                if rhs_ele[use_key] == lhs_ele[use_key]:
-                    del_index = reduced_idx
+                token = cls._get_structure_token(child, digests)
+                if token is None:
                     break
-
-            if del_index > -1:
-                (rhs_original_idx, rhs_ele) = rhs_reduced.pop(del_index)
-                syn_pairs.append((lhs_idx, lhs_ele, rhs_original_idx, rhs_ele))
+                tokens.append(token)
             else:
-                syn_pairs.append((lhs_idx, lhs_ele, None, None))
-
-        for rhs_pair in rhs_reduced:
-            (rhs_original_idx, rhs_ele) = rhs_pair
-            syn_pairs.append((None, None, rhs_original_idx, rhs_ele))
-
-        return syn_pairs
+                digest = sha256(repr(tokens).encode("utf-8")).digest()
+
+            digests[data_id] = digest
+            return digest
+
+        if isinstance(data, TaggedScalar):
+            token = cls._get_structure_token(data.value, digests)
+            return None if token is None else ("!", data.tag.value, token)
+        if data is None or isinstance(data, (str, int, date)):
+            return (data,)
+        # pylint: disable=locally-disabled,comparison-with-itself
+        if isinstance(data, float) and data == data:
+            return (data,)
+        return None
 
     @classmethod
     def _get_key_indicies(cls, data: CommentedMap) -> Dict[Any, int]:
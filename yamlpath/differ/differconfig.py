@@ -4,7 +4,7 @@ Config file processor for the Differ.
 Copyright 2020 William W. Kimball, Jr. MBA MSIS
 """
 import configparser
-from typing import Any, Dict, Tuple, Union
+from typing import Any, Dict, List, Tuple, Union
 from argparse import Namespace
 
 from yamlpath.exceptions import YAMLPathException
@@ -31,6 +31,7 @@ class DifferConfig:
         self.config: Union[None, configparser.ConfigParser] = None
         self.rules: Dict[NodeCoords, str] = {}
         self.keys: Dict[NodeCoords, str] = {}
+        self._user_rules: Dict[str, List[Tuple[YAMLPath, str]]] = {}
 
         self._load_config()
 
@@ -101,7 +102,10 @@ class DifferConfig:
             # This node may be a child of one of the registered keys.  That
             # registered key's node will match this node's parent.
             for eval_nc, eval_key in self.keys.items():
-                if node_coord.parent == eval_nc.node:
+                # Checking identity first spares deeply comparing the same
+                # (potentially very large) parent node for every record.
+                if (node_coord.parent is eval_nc.node
+                        or node_coord.parent == eval_nc.node):
                     diff_key = eval_key
                     break
 
@@ -155,26 +159,10 @@ class DifferConfig:
                 .format(section))
             return
 
-        for rule_key in self.config[section]:
-            rule_value = self.config[section][rule_key]
-
-            if "=" in rule_value:
-                # There were at least two = signs on the configuration line
-                conf_line = rule_key + "=" + rule_value
-                delim_pos = conf_line.rfind("=")
-                rule_key = conf_line[0:delim_pos].strip()
-                rule_value = conf_line[delim_pos + 1:].strip()
-                self.log.debug(
-                    "DifferConfig::_prepare_user_rules:  Reconstituted"
-                    " configuration line '{}' to extract adjusted key '{}'"
-                    " with value '{}'".format(conf_line, rule_key, rule_value))
-
-            rule_path = YAMLPath(rule_key)
-            yaml_path = YAMLPath(rule_path)
+        for (yaml_path, rule_value) in self._get_user_rules(section):
             self.log.debug(
                 "DifferConfig::_prepare_user_rules:  Matching '{}' nodes to"
-                " YAML Path '{}' from key, {}."
-                .format(section, yaml_path, rule_key))
+                " YAML Path '{}'.".format(section, yaml_path))
             try:
                 for node_coord in proc.get_nodes(yaml_path, mustexist=True):
                     self.log.debug(
@@ -199,6 +187,50 @@ class DifferConfig:
                 "... NODE:", data=node_coord,
                 prefix="DifferConfig::_prepare_user_rules:  ")
 
+    def _get_user_rules(self, section: str) -> List[Tuple[YAMLPath, str]]:
+        """
+        Get the parsed YAML Path and value of every rule in a section.
+
+        Rules are parsed only once no matter how many documents they are
+        matched against.
+
+        Parameters:
+        1. section (str) User-configuration file section defining the diff
+           rules to parse.
+
+        Returns:  (List[Tuple[YAMLPath, str]]) The YAML Path and value of each
+        rule in the section.
+        """
+        if section in self._user_rules:
+            return self._user_rules[section]
+
+        rules: List[Tuple[YAMLPath, str]] = []
+        if self.config is not None and section in self.config:
+            for rule_key in self.config[section]:
+                rule_value = self.config[section][rule_key]
+
+                if "=" in rule_value:
+                    # There were at least two = signs on the configuration
+                    # line
+                    conf_line = rule_key + "=" + rule_value
+                    delim_pos = conf_line.rfind("=")
+                    rule_key = conf_line[0:delim_pos].strip()
+                    rule_value = conf_line[delim_pos + 1:].strip()
+                    self.log.debug(
+                        "DifferConfig::_get_user_rules:  Reconstituted"
+                        " configuration line '{}' to extract adjusted key"
+                        " '{}' with value '{}'"
+                        .format(conf_line, rule_key, rule_value))
+
+                yaml_path = YAMLPath(rule_key)
+                self.log.debug(
+                    "DifferConfig::_get_user_rules:  Parsed '{}' YAML Path"
+                    " '{}' from key, {}.".format(section, yaml_path, rule_key))
+                rules.append((yaml_path, rule_value))
+
+        self._user_rules[section] = rules
+        return rules
+
     def _load_config(self) -> None:
         """Load the external configuration file."""
         config = configparser.ConfigParser()
@@ -32,6 +32,11 @@ class AoHDiffOpts(Enum):
     `VALUE`
         AoH records are synchronized as whole units (no deep traversal) before
         being compared.
+
+    `LCS`
+        Like DPOS except the records are first aligned by their longest common
+        subsequence, so only minimal runs of records are reported as added or
+        deleted and only the aligned record pairs are deeply traversed.
     """
 
     DEEP = auto()
@@ -39,6 +44,7 @@ class AoHDiffOpts(Enum):
     KEY = auto()
     POSITION = auto()
     VALUE = auto()
+    LCS = auto()
 
     def __str__(self) -> str:
         """
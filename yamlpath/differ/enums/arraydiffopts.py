@@ -19,10 +19,17 @@ class ArrayDiffOpts(Enum):
 
     `VALUE`
         Array alements are synchronized by value before being compared.
+
+    `LCS`
+        Array elements are aligned by their longest common subsequence before
+        being compared, so only minimal runs of elements are reported as added
+        or deleted; unaligned elements between those runs are compared based
+        on their ordinal position.
     """
 
     POSITION = auto()
     VALUE = auto()
+    LCS = auto()
 
     def __str__(self) -> str:
         """
@@ -0,0 +1,395 @@
+"""
+Implement the pairing of Array elements for comparison.
+
+Copyright 2020 William W. Kimball, Jr. MBA MSIS
+"""
+from collections import deque
+from itertools import zip_longest
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from ruamel.yaml.comments import CommentedMap, CommentedSeq
+
+from yamlpath import YAMLPath
+from yamlpath.wrappers import ConsolePrinter, NodeCoords
+from .differconfig import DifferConfig
+
+
+class ListSynchronizer:
+    """Pairs the elements of two Arrays so they can be compared."""
+
+    # Largest edit distance the LCS alignment will search for within any
+    # single unaligned span of two Arrays before giving up on aligning that
+    # span, which is then compared by position instead.
+    LCS_MAX_EDITS = 1000
+
+    def __init__(self, config: DifferConfig, logger: ConsolePrinter) -> None:
+        """
+        Instantiate this class into an object.
+
+        Parameters:
+        1. config (DifferConfig) Configuration of the comparison
+        2. logger (ConsolePrinter) Instance of ConsoleWriter or subclass
+
+        Returns:  N/A
+
+        Raises:  N/A
+        """
+        self.config: DifferConfig = config
+        self.logger: ConsolePrinter = logger
+
+
+    @classmethod
+    def synchronize_lists_by_value(
+        cls, lhs: CommentedSeq, rhs: CommentedSeq
+    ) -> List[Tuple[
+        Optional[int], Optional[Any], Optional[int], Optional[Any]
+    ]]:
+        """Synchronize two lists by value."""
+        # Index every RHS element by the fingerprint of its value so each LHS
+        # element need only be compared against RHS elements which could
+        # possibly be equal to it.  Each bucket retains the original RHS order.
+        rhs_index: Dict[Any, Deque[Tuple[int, Any]]] = {}
+        for rhs_idx, rhs_ele in enumerate(rhs):
+            rhs_index.setdefault(
+                cls._get_fingerprint(rhs_ele), deque()
+            ).append((rhs_idx, rhs_ele))
+
+        rhs_paired = [False] * len(rhs)
+        syn_pairs: List[Tuple[
+            Optional[int], Optional[Any], Optional[int], Optional[Any]
+        ]] = []
+        for lhs_idx, lhs_ele in enumerate(lhs):
+            bucket = rhs_index.get(cls._get_fingerprint(lhs_ele))
+            bucket_pos = cls._find_first_equal(bucket, lhs_ele)
+            if bucket is not None and bucket_pos > -1:
+                (rhs_idx, rhs_ele) = bucket[bucket_pos]
+                del bucket[bucket_pos]
+                rhs_paired[rhs_idx] = True
+                syn_pairs.append((lhs_idx, lhs_ele, rhs_idx, rhs_ele))
+            else:
+                syn_pairs.append((lhs_idx, lhs_ele, None, None))
+
+        for rhs_idx, rhs_ele in enumerate(rhs):
+            if not rhs_paired[rhs_idx]:
+                syn_pairs.append((None, None, rhs_idx, rhs_ele))
+
+        return syn_pairs
+
+    @classmethod
+    def synchronize_lists_by_lcs(
+        cls, lhs: CommentedSeq, rhs: CommentedSeq
+    ) -> List[Tuple[
+        Optional[int], Optional[Any], Optional[int], Optional[Any]
+    ]]:
+        """
+        Synchronize two lists by their longest common subsequence.
+
+        Elements which are common to both lists, in order, are paired.
+        Between each run of common elements, the unaligned elements of both
+        lists are paired by position with any excess becoming unpaired.
+        """
+        # Reduce every element to a small integer so the alignment search
+        # compares only integers.
+        fingerprint_ids: Dict[Any, int] = {}
+        lhs_ids = [
+            fingerprint_ids.setdefault(
+                cls._get_fingerprint(ele), len(fingerprint_ids))
+            for ele in lhs]
+        rhs_ids = [
+            fingerprint_ids.setdefault(
+                cls._get_fingerprint(ele), len(fingerprint_ids))
+            for ele in rhs]
+
+        syn_pairs: List[Tuple[
+            Optional[int], Optional[Any], Optional[int], Optional[Any]
+        ]] = []
+        lhs_pos = 0
+        rhs_pos = 0
+        for (lhs_match, rhs_match) in cls._get_lcs_matches(
+                lhs_ids, rhs_ids) + [(len(lhs), len(rhs))]:
+            # Pair the unaligned span ahead of this match by position
+            for (lhs_idx, rhs_idx) in zip_longest(
+                range(lhs_pos, lhs_match), range(rhs_pos, rhs_match)
+            ):
+                syn_pairs.append((
+                    lhs_idx, None if lhs_idx is None else lhs[lhs_idx],
+                    rhs_idx, None if rhs_idx is None else rhs[rhs_idx]))
+
+            if lhs_match < len(lhs):
+                syn_pairs.append((
+                    lhs_match, lhs[lhs_match], rhs_match, rhs[rhs_match]))
+            lhs_pos = lhs_match + 1
+            rhs_pos = rhs_match + 1
+
+        return syn_pairs
+
+    #pylint: disable=too-many-locals
+    def synchronize_lods_by_key(
+        self, path: YAMLPath, lhs: CommentedSeq, rhs: CommentedSeq
+    ) -> List[Tuple[
+        Optional[int], Optional[Any], Optional[int], Optional[Any]
+    ]]:
+        """Synchronize two lists-of-dictionaries by identity key."""
+        key_attr: str = ""
+        if len(rhs) > 0 and isinstance(rhs[0], CommentedMap):
+            (key_attr, _) = self.config.aoh_diff_key(
+                NodeCoords(rhs[0], rhs, 0))
+            self.logger.debug(
+                "RHS AoH yielded key_attr:  {}.".format(key_attr),
+                prefix="ListSynchronizer::synchronize_lods_by_key:  ")
+
+        # Index every RHS record by its identity key and the fingerprint of
+        # that key's value.  Records may have custom identity keys, so track
+        # every distinct key in use.  Each bucket retains the original RHS
+        # order.
+        use_keys: Dict[Any, None] = {}
+        rhs_index: Dict[Tuple[Any, Any], Deque[Tuple[int, Any]]] = {}
+        for rhs_idx, rhs_ele in enumerate(rhs):
+            use_key = self._get_record_key(
+                path, NodeCoords(rhs_ele, rhs, rhs_idx), key_attr)
+            if not isinstance(rhs_ele, dict) or not use_key in rhs_ele:
+                # Impossible to match this RHS record to any LHS record
+                continue
+
+            use_keys[use_key] = None
+            rhs_index.setdefault(
+                (use_key, self._get_fingerprint(rhs_ele[use_key])), deque()
+            ).append((rhs_idx, rhs_ele[use_key]))
+
+        rhs_paired = [False] * len(rhs)
+        syn_pairs: List[Tuple[
+            Optional[int], Optional[Any], Optional[int], Optional[Any]
+        ]] = []
+        for lhs_idx, lhs_ele in enumerate(lhs):
+            if not isinstance(lhs_ele, dict) or not key_attr in lhs_ele:
+                # Impossible to match this LHS record to any RHS record
+                self.logger.debug(
+                    "LHS record has no identity key, {}, for record at {}:"
+                    .format(key_attr, path),
+                    data=lhs_ele,
+                    prefix="ListSynchronizer::synchronize_lods_by_key:  ")
+                syn_pairs.append((lhs_idx, lhs_ele, None, None))
+                continue
+
+            # Pair with the first surviving RHS record, in RHS order, having
+            # the same identity key value by any identity key in use.
+            match_idx = -1
+            match_bucket: Optional[Deque[Tuple[int, Any]]] = None
+            match_pos = -1
+            for use_key in use_keys:
+                if not use_key in lhs_ele:
+                    continue
+                bucket = rhs_index.get(
+                    (use_key, self._get_fingerprint(lhs_ele[use_key])))
+                bucket_pos = self._find_first_equal(
+                    bucket, lhs_ele[use_key])
+                if (bucket is not None and bucket_pos > -1
+                        and (match_idx < 0
+                             or bucket[bucket_pos][0] < match_idx)):
+                    match_idx = bucket[bucket_pos][0]
+                    match_bucket = bucket
+                    match_pos = bucket_pos
+
+            if match_bucket is not None:
+                del match_bucket[match_pos]
+                rhs_paired[match_idx] = True
+                syn_pairs.append(
+                    (lhs_idx, lhs_ele, match_idx, rhs[match_idx]))
+            else:
+                syn_pairs.append((lhs_idx, lhs_ele, None, None))
+
+        for rhs_idx, rhs_ele in enumerate(rhs):
+            if not rhs_paired[rhs_idx]:
+                syn_pairs.append((None, None, rhs_idx, rhs_ele))
+
+        return syn_pairs
+
+    def _get_record_key(
+        self, path: YAMLPath, node_coord: NodeCoords, key_attr: str
+    ) -> str:
+        """Get the identity key of one record of an Array-of-Hashes."""
+        # Check for a custom identity key assignment for this record
+        use_key = key_attr
+        (alt_key, is_user_key) = self.config.aoh_diff_key(node_coord)
+
+        if is_user_key and alt_key:
+            use_key = alt_key
+            self.logger.debug(
+                "Using alternate key, {}, for record at {}[{}]."
+                .format(use_key, path, node_coord.parentref),
+                data=node_coord.node,
+                prefix="ListSynchronizer::synchronize_lods_by_key:  ")
+        else:
+            self.logger.debug(
+                "Using inferred key, {}, for record at {}[{}]."
+                .format(use_key, path, node_coord.parentref),
+                data=node_coord.node,
+                prefix="ListSynchronizer::synchronize_lods_by_key:  ")
+        return use_key
+
+    @classmethod
+    def _get_fingerprint(cls, data: Any) -> Any:
+        """
+        Get a hashable fingerprint of a value.
+
+        Equal values always have equal fingerprints, though unequal values may
+        share a fingerprint.
+        """
+        if isinstance(data, dict):
+            return (dict, frozenset(
+                (key, cls._get_fingerprint(val))
+                for key, val in data.items()))
+        if isinstance(data, list):
+            return (list, tuple(cls._get_fingerprint(ele) for ele in data))
+        try:
+            hash(data)
+        except TypeError:
+            # All otherwise unhashable values share a single fingerprint
+            return (object,)
+        return data
+
+    @classmethod
+    def _get_lcs_matches(
+        cls, lhs: List[int], rhs: List[int]
+    ) -> List[Tuple[int, int]]:
+        """
+        Get the aligned index pairs of the longest common subsequence.
+
+        This is Myers' linear-space O((N+M)D) algorithm, repeatedly bisecting
+        each unaligned span at the middle of its shortest edit script.  Any
+        span which shares no elements or which needs more than LCS_MAX_EDITS
+        edits is left unaligned.
+
+        Parameters:
+        1. lhs (List[int]) Element identities of the LHS list
+        2. rhs (List[int]) Element identities of the RHS list
+
+        Returns:  (List[Tuple[int, int]]) Ascending LHS and RHS index pairs of
+        the aligned elements
+        """
+        matches: List[Tuple[int, int]] = []
+        spans = [(0, len(lhs), 0, len(rhs))]
+        while spans:
+            (lhs_lo, lhs_hi, rhs_lo, rhs_hi) = spans.pop()
+
+            # Align any common prefix and suffix without searching
+            while (lhs_lo < lhs_hi and rhs_lo < rhs_hi
+                   and lhs[lhs_lo] == rhs[rhs_lo]):
+                matches.append((lhs_lo, rhs_lo))
+                lhs_lo += 1
+                rhs_lo += 1
+            while (lhs_lo < lhs_hi and rhs_lo < rhs_hi
+                   and lhs[lhs_hi - 1] == rhs[rhs_hi - 1]):
+                lhs_hi -= 1
+                rhs_hi -= 1
+                matches.append((lhs_hi, rhs_hi))
+
+            if (lhs_lo == lhs_hi or rhs_lo == rhs_hi
+                    or set(lhs[lhs_lo:lhs_hi]).isdisjoint(
+                        rhs[rhs_lo:rhs_hi])):
+                continue
+
+            split = cls._bisect_lcs(lhs, lhs_lo, lhs_hi, rhs, rhs_lo, rhs_hi)
+            if split is not None:
+                (lhs_mid, rhs_mid) = split
+                spans.append((lhs_lo, lhs_mid, rhs_lo, rhs_mid))
+                spans.append((lhs_mid, lhs_hi, rhs_mid, rhs_hi))
+
+        matches.sort()
+        return matches
+
+    # pylint: disable=locally-disabled,too-many-arguments,too-many-locals,too-many-branches
+    @classmethod
+    def _bisect_lcs(
+        cls, lhs: List[int], lhs_lo: int, lhs_hi: int,
+        rhs: List[int], rhs_lo: int, rhs_hi: int
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Find where the middle snake of two spans' shortest edit script ends.
+
+        The spans must not share a common first or last element.  Returns None
+        when the spans cannot be aligned within LCS_MAX_EDITS edits.
+        """
+        lhs_len = lhs_hi - lhs_lo
+        rhs_len = rhs_hi - rhs_lo
+        max_d = (lhs_len + rhs_len + 1) // 2
+        v_offset = max_d
+        v_length = 2 * max_d
+        forward = [-1] * v_length
+        forward[v_offset + 1] = 0
+        reverse = forward[:]
+        delta = lhs_len - rhs_len
+
+        # An odd delta means the forward path will overlap the reverse path
+        front = delta % 2 != 0
+
+        # Trim the ends of the search which have run off either span
+        k1start = k1end = k2start = k2end = 0
+        for edits in range(min(max_d, cls.LCS_MAX_EDITS)):
+            # Walk the forward path one step
+            for k1 in range(-edits + k1start, edits + 1 - k1end, 2):
+                k1_offset = v_offset + k1
+                if k1 == -edits or (
+                        k1 != edits
+                        and forward[k1_offset - 1] < forward[k1_offset + 1]):
+                    x1 = forward[k1_offset + 1]
+                else:
+                    x1 = forward[k1_offset - 1] + 1
+                y1 = x1 - k1
+                while (x1 < lhs_len and y1 < rhs_len
+                       and lhs[lhs_lo + x1] == rhs[rhs_lo + y1]):
+                    x1 += 1
+                    y1 += 1
+                forward[k1_offset] = x1
+                if x1 > lhs_len:
+                    k1end += 2
+                elif y1 > rhs_len:
+                    k1start += 2
+                elif front:
+                    k2_offset = v_offset + delta - k1
+                    if (0 <= k2_offset < v_length
+                            and reverse[k2_offset] != -1
+                            and x1 >= lhs_len - reverse[k2_offset]):
+                        return (lhs_lo + x1, rhs_lo + y1)
+
+            # Walk the reverse path one step
+            for k2 in range(-edits + k2start, edits + 1 - k2end, 2):
+                k2_offset = v_offset + k2
+                if k2 == -edits or (
+                        k2 != edits
+                        and reverse[k2_offset - 1] < reverse[k2_offset + 1]):
+                    x2 = reverse[k2_offset + 1]
+                else:
+                    x2 = reverse[k2_offset - 1] + 1
+                y2 = x2 - k2
+                while (x2 < lhs_len and y2 < rhs_len
+                       and lhs[lhs_hi - x2 - 1] == rhs[rhs_hi - y2 - 1]):
+                    x2 += 1
+                    y2 += 1
+                reverse[k2_offset] = x2
+                if x2 > lhs_len:
+                    k2end += 2
+                elif y2 > rhs_len:
+                    k2start += 2
+                elif not front:
+                    k1_offset = v_offset + delta - k2
+                    if (0 <= k1_offset < v_length
+                            and forward[k1_offset] != -1):
+                        x1 = forward[k1_offset]
+                        if x1 >= lhs_len - x2:
+                            return (
+                                lhs_lo + x1,
+                                rhs_lo + x1 - (k1_offset - v_offset))
+
+        return None
+
+    @staticmethod
+    def _find_first_equal(
+        bucket: Optional[Deque[Tuple[int, Any]]], value: Any
+    ) -> int:
+        """Get the position of the first bucket entry equal to a value."""
+        if bucket:
+            for bucket_pos, (_, candidate) in enumerate(bucket):
+                if candidate == value:
+                    return bucket_pos
+        return -1
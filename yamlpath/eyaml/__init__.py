@@ -1,2 +1,3 @@
 """EYAML specializations of the core YAML Path processing classes."""
+from .decryptioncache import DecryptionCache
 from .eyamlprocessor import EYAMLProcessor
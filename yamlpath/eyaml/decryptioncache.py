@@ -0,0 +1,135 @@
+"""
+Implement an in-memory cache of decrypted EYAML values.
+
+Copyright 2020 William W. Kimball, Jr. MBA MSIS
+"""
+from collections import OrderedDict
+from hashlib import sha256
+from threading import Lock
+from typing import Any, Dict, Iterable, Optional
+
+
+class DecryptionCache:
+    """
+    Size-bounded, least-recently-used cache of decrypted EYAML values.
+
+    Each entry is identified by a digest of the normalized encrypted value and
+    the identity of the keys used to decrypt it, so the same encrypted value
+    is never reported as decrypted by keys which were not used to decrypt it.
+
+    Decrypted values are secrets, so they are held only in memory.  They are
+    never written to disk and are omitted whenever the cache is pickled.
+    """
+
+    DEFAULT_MAX_ENTRIES = 4096
+
+    def __init__(
+        self, max_entries: int = DEFAULT_MAX_ENTRIES, enabled: bool = True
+    ) -> None:
+        """
+        Instantiate this class into an object.
+
+        Parameters:
+        1. max_entries (int) Number of decrypted values to hold before the
+           least recently used are evicted
+        2. enabled (bool) Whether to cache decrypted values at all
+
+        Returns:  N/A
+
+        Raises:  N/A
+        """
+        self.max_entries: int = max_entries
+        self._enabled: bool = enabled
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock: Lock = Lock()
+
+    def __len__(self) -> int:
+        """Get the number of cached values."""
+        return len(self._entries)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Get the picklable state of this cache, less its entries."""
+        return {"max_entries": self.max_entries, "_enabled": self._enabled}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Restore this cache from its pickled state, empty."""
+        self.max_entries = state["max_entries"]
+        self._enabled = state["_enabled"]
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Indicate whether decrypted values are cached."""
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value: bool) -> None:
+        """
+        Enable or disable the cache.
+
+        Disabling the cache also discards every cached value.
+        """
+        self._enabled = value
+        if not value:
+            self.clear()
+
+    @staticmethod
+    def get_key(value: str, key_identity: Iterable[Optional[str]]) -> str:
+        """
+        Get the cache key of an encrypted value.
+
+        Parameters:
+        1. value (str) The normalized encrypted value
+        2. key_identity (Iterable[Optional[str]]) Whatever identifies the keys
+           used to decrypt the value
+
+        Returns:  (str) Hexadecimal SHA-256 digest of the value and keys
+        """
+        digest = sha256()
+        for part in key_identity:
+            digest.update("{}\0".format(part).encode("utf-8"))
+        digest.update(value.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Get a cached, decrypted value.
+
+        Parameters:
+        1. key (str) The cache key of the encrypted value, per get_key
+
+        Returns:  (Optional[str]) The decrypted value or None when it is not
+        cached
+        """
+        if not self._enabled:
+            return None
+        with self._lock:
+            plain_text = self._entries.get(key)
+            if plain_text is not None:
+                self._entries.move_to_end(key)
+            return plain_text
+
+    def put(self, key: str, plain_text: str) -> None:
+        """
+        Cache a decrypted value, evicting the least recently used beyond the
+        size limit.
+
+        Parameters:
+        1. key (str) The cache key of the encrypted value, per get_key
+        2. plain_text (str) The decrypted value
+
+        Returns:  N/A
+        """
+        if not self._enabled or self.max_entries < 1:
+            return
+        with self._lock:
+            self._entries[key] = plain_text
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Discard every cached value."""
+        with self._lock:
+            self._entries.clear()
@@ -3,27 +3,40 @@ Implements an EYAML-capable version of YAML Path.
 
 Copyright 2018, 2019, 2020 William W. Kimball, Jr. MBA MSIS
 """
-import re
-from subprocess import run, PIPE, CalledProcessError
-from os import access, sep, X_OK
+from concurrent.futures import ThreadPoolExecutor
+from os import access, sep, stat, X_OK
+from os.path import realpath
 from shutil import which
-from typing import Any, Generator, List, Optional
+from typing import (
+    Any, Callable, Dict, Generator, Iterable, List, Optional, Set, TypeVar)
 
 from ruamel.yaml.comments import CommentedSeq, CommentedMap
 
 from yamlpath import YAMLPath
+from yamlpath.eyaml.decryptioncache import DecryptionCache
 from yamlpath.eyaml.enums import EYAMLOutputFormats
 from yamlpath.enums import YAMLValueFormats
-from yamlpath.eyaml.exceptions import EYAMLCommandException
-from yamlpath.wrappers import ConsolePrinter
+from yamlpath.eyaml.providers import EYAMLProvider, SubprocessEYAMLProvider
+from yamlpath.wrappers import ConsolePrinter, NodeCoords
 from yamlpath import Processor
 
+ResultT = TypeVar("ResultT")
+
 
 class EYAMLProcessor(Processor):
-    """Extend Processor to understand EYAML values."""
+    """
+    Extend Processor to understand EYAML values.
+
+    Decrypted values are remembered in `decryption_cache`, which is shared by
+    every instance unless one is given its own.  Set its `enabled` property to
+    False to stop caching decrypted values or call its `clear()` method to
+    forget them.
+    """
+
+    decryption_cache: DecryptionCache = DecryptionCache()
 
     def __init__(self, logger: ConsolePrinter, data: Any,
-                 **kwargs: Optional[str]) -> None:
+                 **kwargs: Any) -> None:
         """
         Instantiate an EYAMLProcessor.
 
@@ -35,8 +48,7 @@ class EYAMLProcessor(Processor):
         Parameters:
         1. logger (ConsolePrinter) Instance of ConsolePrinter or subclass
         2. data (Any) Parsed YAML data
-        3. **kwargs (Optional[str]) can contain the following keyword
-           parameters:
+        3. **kwargs (Any) can contain the following keyword parameters:
             * binary (str) The external eyaml command to use when performing
               data encryption or decryption; if no path is provided, the
               command will be sought on the system PATH.  Defaut="eyaml"
@@ -44,6 +56,15 @@ class EYAMLProcessor(Processor):
               for use with data encryption
             * privatekey (Optional[str]) Fully-qualified path to the public key
               for use with data decryption
+            * jobs (int) The greatest number of eyaml commands to run at once
+              when values must be encrypted or decrypted one at a time.
+              Default=1
+            * decryption_cache (DecryptionCache) The cache of decrypted
+              values to use instead of the one shared by all instances
+            * provider (EYAMLProvider) The means of encrypting and decrypting
+              values.  Default=SubprocessEYAMLProvider(), which runs the
+              eyaml command; PKCS7EYAMLProvider() instead works in-process
+              when the optional cryptography package is installed
 
         Returns:  N/A
 
@@ -52,6 +73,12 @@ class EYAMLProcessor(Processor):
         self.eyaml: Optional[str] = kwargs.pop("binary", "eyaml")
         self.publickey: Optional[str] = kwargs.pop("publickey", None)
         self.privatekey: Optional[str] = kwargs.pop("privatekey", None)
+        self.jobs: int = kwargs.pop("jobs", 1)
+        self._eyaml_executables: Dict[Optional[str], Optional[str]] = {}
+        self.provider: EYAMLProvider = kwargs.pop(
+            "provider", None) or SubprocessEYAMLProvider()
+        if "decryption_cache" in kwargs:
+            self.decryption_cache = kwargs.pop("decryption_cache")
         super().__init__(logger, data)
 
     # pylint: disable=locally-disabled,too-many-branches
@@ -114,6 +141,119 @@ class EYAMLProcessor(Processor):
         for path in self._find_eyaml_paths(self.data):
             yield path
 
+    def _find_eyaml_nodes(
+            self, data: Any, build_path: str, seen_collections: Set[int]
+    ) -> Generator[NodeCoords, None, None]:
+        """
+        Find every location of every encrypted value.
+
+        Parameters:
+            1. data (Any) The parsed YAML data to process
+            2. build_path (str) A YAML Path under construction
+            3. seen_collections (Set[int]) The identity of every Hash and
+               Array already searched
+
+        Returns:  (Generator[NodeCoords, None, None]) each location as it is
+            discovered
+
+        Raises:  N/A
+        """
+        if id(data) in seen_collections:
+            return
+
+        if isinstance(data, CommentedSeq):
+            seen_collections.add(id(data))
+            build_path += "["
+            for idx, ele in enumerate(data):
+                if hasattr(ele, "anchor") and ele.anchor.value is not None:
+                    tmp_path = build_path + "&" + ele.anchor.value + "]"
+                else:
+                    tmp_path = build_path + str(idx) + "]"
+
+                if self.is_eyaml_value(ele):
+                    yield NodeCoords(ele, data, idx, YAMLPath(tmp_path))
+                else:
+                    for coords in self._find_eyaml_nodes(
+                            ele, tmp_path, seen_collections):
+                        yield coords
+
+        elif isinstance(data, CommentedMap):
+            seen_collections.add(id(data))
+            if build_path:
+                build_path += "."
+
+            for key, val in data.non_merged_items():
+                tmp_path = build_path + str(key)
+                if self.is_eyaml_value(val):
+                    yield NodeCoords(val, data, key, YAMLPath(tmp_path))
+                else:
+                    for coords in self._find_eyaml_nodes(
+                            val, tmp_path, seen_collections):
+                        yield coords
+
+    def find_eyaml_nodes(self) -> Generator[NodeCoords, None, None]:
+        """
+        Find every location of every encrypted value in a single traversal.
+
+        Unlike find_eyaml_paths, each Hash and Array is searched only once, no
+        matter how many Aliases refer to it, so every location reported is
+        distinct.  An encrypted value which is Aliased is reported once for
+        its Anchor and once for each of its Aliases, each location sharing the
+        same node.
+
+        Parameters:  N/A
+
+        Returns:  (Generator[NodeCoords, None, None]) the node, parent, and
+            parent reference of each location, along with its YAML Path
+
+        Raises:  N/A
+        """
+        for coords in self._find_eyaml_nodes(self.data, "", set()):
+            yield coords
+
+    def _find_eyaml_values(self, data: Any) -> Generator[str, None, None]:
+        """
+        Find every encrypted value.
+
+        Parameters:
+            1. data (Any) The parsed YAML data to process
+
+        Returns:  (Generator[str, None, None]) each EYAML value as it is
+            discovered
+
+        Raises:  N/A
+        """
+        if isinstance(data, CommentedSeq):
+            children: Iterable[Any] = data
+        elif isinstance(data, CommentedMap):
+            children = (val for (_, val) in data.non_merged_items())
+        else:
+            return
+
+        for child in children:
+            if self.is_eyaml_value(child):
+                yield child
+            else:
+                for value in self._find_eyaml_values(child):
+                    yield value
+
+    def decrypt_all(self) -> Dict[str, str]:
+        """
+        Decrypt every encrypted value in the data through one eyaml command.
+
+        Parameters:  N/A
+
+        Returns:  (Dict[str, str]) Each EYAML value, exactly as it appears in
+        the data, mapped to its decrypted value
+
+        Raises:
+            - `EYAMLCommandException` when the eyaml binary cannot be utilized
+              or any value cannot be decrypted
+        """
+        values: List[str] = list(dict.fromkeys(
+            self._find_eyaml_values(self.data)))
+        return dict(zip(values, self.decrypt_many(values)))
+
     def decrypt_eyaml(self, value: str) -> str:
         """
         Decrypt an EYAML value.
@@ -130,51 +270,107 @@ class EYAMLProcessor(Processor):
         if not self.is_eyaml_value(value):
             return value
 
-        if not self._can_run_eyaml():
-            raise EYAMLCommandException("No accessible eyaml command.")
-
-        cmdstr: str = "{} decrypt --quiet --stdin".format(self.eyaml)
-        if self.publickey:
-            cmdstr += " --pkcs7-public-key={}".format(self.publickey)
-        if self.privatekey:
-            cmdstr += " --pkcs7-private-key={}".format(self.privatekey)
-
-        cmd: List[str] = cmdstr.split()
-        cleanval: str = str(value).replace("\n", "").replace(" ", "").rstrip()
-        bval: bytes = cleanval.encode("ascii")
-        self.logger.debug(
-            "EYAMLPath::decrypt_eyaml:  About to execute {} against:\n{}"
-            .format(cmdstr, cleanval)
-        )
+        cleanval: str = EYAMLProcessor._clean_eyaml_value(value)
+        cache_key: str = DecryptionCache.get_key(
+            cleanval, self._get_key_identity())
+        cached_value: Optional[str] = self.decryption_cache.get(cache_key)
+        if cached_value is not None:
+            self.logger.debug(
+                "EYAMLPath::decrypt_eyaml:  Using cached decryption of:\n{}"
+                .format(cleanval))
+            return cached_value
+
+        retval: str = self.provider.decrypt(self, cleanval)
+        self.decryption_cache.put(cache_key, retval)
+        return retval
 
-        try:
-            # self.eyaml is untrusted, so shell must always be False and
-            # all parameters must be supplied via a List.
-            retval: str = run(
-                cmd,
-                stdout=PIPE,
-                input=bval,
-                check=True,
-                shell=False
-            ).stdout.decode('ascii').rstrip()
-        except CalledProcessError as ex:
-            raise EYAMLCommandException(
-                "The {} command cannot be run due to exit code:  {}"
-                .format(self.eyaml, ex.returncode)
-            ) from ex
-
-        # Check for bad decryptions
-        self.logger.debug(
-            "EYAMLPath::decrypt_eyaml:  Decrypted result:  {}".format(retval)
-        )
-        if not retval or retval == cleanval:
-            raise EYAMLCommandException(
-                "Unable to decrypt value!  Please verify you are using the"
-                + " correct old EYAML keys and the value is not corrupt:  {}"
-                .format(cleanval)
-            )
+    def decrypt_many(self, values: Iterable[str]) -> List[str]:
+        """
+        Decrypt any number of EYAML values at once.
 
-        return retval
+        Starting the eyaml command is far more expensive than decrypting any
+        one value, so every distinct encrypted value is handed to the
+        `provider` as a single batch; the default provider sends the whole
+        batch to one eyaml process.
+
+        When the batch cannot be decrypted as a whole -- say, because one of
+        the values is corrupt or a custom eyaml command cannot handle more than
+        one value -- each value is instead decrypted on its own, up to `jobs`
+        at once, so that the error reported is exactly that of
+        `decrypt_eyaml`.
+
+        Parameters:
+        1. values (Iterable[str]) The values to decrypt; those which are not
+           encrypted are returned unchanged
+
+        Returns:  (List[str]) The decrypted values, in the same order as they
+        were supplied
+
+        Raises:
+            - `EYAMLCommandException` when the eyaml binary cannot be utilized
+              or any value cannot be decrypted
+        """
+        results: List[str] = list(values)
+        cleanvals: Dict[str, List[int]] = {}
+        for idx, value in enumerate(results):
+            if self.is_eyaml_value(value):
+                cleanvals.setdefault(
+                    EYAMLProcessor._clean_eyaml_value(value), []).append(idx)
+
+        # Use any cached decryptions
+        key_identity: List[Optional[str]] = self._get_key_identity()
+        for cleanval in list(cleanvals):
+            cached_value: Optional[str] = self.decryption_cache.get(
+                DecryptionCache.get_key(cleanval, key_identity))
+            if cached_value is not None:
+                for idx in cleanvals.pop(cleanval):
+                    results[idx] = cached_value
+
+        plain_texts: Optional[List[str]] = None
+        if len(cleanvals) > 1:
+            plain_texts = self.provider.decrypt_batch(self, list(cleanvals))
+            if plain_texts is not None:
+                for (cleanval, plain_text) in zip(cleanvals, plain_texts):
+                    self.decryption_cache.put(
+                        DecryptionCache.get_key(cleanval, key_identity),
+                        plain_text)
+        if plain_texts is None:
+            plain_texts = self._map_concurrently(
+                self.decrypt_eyaml, list(cleanvals))
+
+        for (plain_text, indexes) in zip(plain_texts, cleanvals.values()):
+            for idx in indexes:
+                results[idx] = plain_text
+
+        return results
+
+    def _get_key_identity(self) -> List[Optional[str]]:
+        """
+        Identify the provider and keys which decrypt values.
+
+        Each key file is identified by its real path, modification time, and
+        size so that replacing a key file is noticed.
+
+        Parameters:  N/A
+
+        Returns:  (List[Optional[str]]) The identity of the provider and each
+        key
+
+        Raises:  N/A
+        """
+        identity: List[Optional[str]] = self.provider.get_identity(self)
+        for key_file in [self.publickey, self.privatekey]:
+            if key_file is None:
+                identity.append(None)
+                continue
+            try:
+                key_stat = stat(key_file)
+                identity.append("{}|{}|{}".format(
+                    realpath(key_file), key_stat.st_mtime_ns,
+                    key_stat.st_size))
+            except (OSError, ValueError):
+                identity.append(str(key_file))
+        return identity
 
     def encrypt_eyaml(self, value: str,
                       output: EYAMLOutputFormats = EYAMLOutputFormats.STRING
@@ -195,58 +391,57 @@ class EYAMLProcessor(Processor):
         if self.is_eyaml_value(value):
             return value
 
-        if not self._can_run_eyaml():
-            raise EYAMLCommandException(
-                "The eyaml binary is not executable at {}.".format(self.eyaml)
-            )
-
-        cmdstr: str = ("{} encrypt --quiet --stdin --output={}"
-                       .format(self.eyaml, output))
-        if self.publickey:
-            cmdstr += " --pkcs7-public-key={}".format(self.publickey)
-        if self.privatekey:
-            cmdstr += " --pkcs7-private-key={}".format(self.privatekey)
-
-        cmd: List[str] = cmdstr.split()
-        self.logger.debug(
-            "EYAMLPath::encrypt_eyaml:  About to execute:  {}"
-            .format(" ".join(cmd))
-        )
-        bval: bytes = value.encode("ascii")
-
-        try:
-            # self.eyaml is untrusted, so shell must always be False and
-            # all parameters must be supplied via a List.
-            retval: str = (
-                run(cmd, stdout=PIPE, input=bval, check=True, shell=False)
-                .stdout
-                .decode('ascii')
-                .rstrip()
-            )
-        except CalledProcessError as ex:
-            raise EYAMLCommandException(
-                "The {} command cannot be run due to exit code:  {}"
-                .format(self.eyaml, ex.returncode)
-            ) from ex
-
-        # While exceedingly rare and difficult to test for, it is possible
-        # for custom eyaml commands to produce no output.  This is a critical
-        # error in every conceivable case but pycov will never get a test
-        # that works multi-platform.  So, ignore covering this case.
-        if not retval: # pragma: no cover
-            raise EYAMLCommandException(
-                ("The {} command was unable to encrypt your value.  Please"
-                 + " verify this process can run that command and read your"
-                 + " EYAML keys.").format(self.eyaml)
-            )
-
-        if output is EYAMLOutputFormats.BLOCK:
-            retval = re.sub(r" +", "", retval) + "\n"
-
-        self.logger.debug(
-            "EYAMLPath::encrypt_eyaml:  Encrypted result:\n{}".format(retval)
-        )
-        return retval
+        return self.provider.encrypt(self, value, output)
+
+    def encrypt_many(self, values: Iterable[str],
+                     output: EYAMLOutputFormats = EYAMLOutputFormats.STRING
+                    ) -> List[str]:
+        """
+        Encrypt any number of values via EYAML, up to `jobs` at once.
+
+        Parameters:
+        1. values (Iterable[str]) the values to encrypt
+        2. output (EYAMLOutputFormats) the output format of the encryption
+
+        Returns:  (List[str]) The encrypted results, in the same order as the
+        values were supplied; any values which were already EYAML encryptions
+        are returned unchanged
+
+        Raises:
+            - `EYAMLCommandException` when the eyaml binary cannot be utilized;
+              when several values cannot be encrypted, the error is that of the
+              first of them
+        """
+        return self._map_concurrently(
+            lambda value: self.encrypt_eyaml(value, output), list(values))
+
+    def _map_concurrently(
+        self, func: Callable[[Any], ResultT], values: List[Any]
+    ) -> List[ResultT]:
+        """
+        Apply a function to each value, running up to `jobs` at once.
+
+        The function is expected to spend most of its time waiting on an
+        eyaml command, so threads suffice to run it concurrently.
+
+        Parameters:
+        1. func (Callable[[Any], ResultT]) The function to apply
+        2. values (List[Any]) The values to apply the function to
+
+        Returns:  (List[ResultT]) The result of each call, in the same order
+        as the values
+
+        Raises:
+            - Any exception raised by `func`; when several calls fail, that of
+              the earliest value is raised
+        """
+        if self.jobs < 2 or len(values) < 2:
+            return [func(value) for value in values]
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.jobs, len(values))
+        ) as executor:
+            return list(executor.map(func, values))
 
     def set_eyaml_value(self, yaml_path: YAMLPath, value: str,
                         output: EYAMLOutputFormats = EYAMLOutputFormats.STRING,
@@ -307,9 +502,11 @@ class EYAMLProcessor(Processor):
         self.logger.verbose(
             "Decrypting value(s) at {}.".format(yaml_path)
         )
-        for node in self.get_nodes(yaml_path, mustexist=mustexist,
-                                   default_value=default_value):
-            plain_text: str = self.decrypt_eyaml(node.node)
+        # Collect every matching node before decrypting them all at once
+        nodes: List[Any] = [
+            node.node for node in self.get_nodes(
+                yaml_path, mustexist=mustexist, default_value=default_value)]
+        for plain_text in self.decrypt_many(nodes):
             yield plain_text
 
     def _can_run_eyaml(self) -> bool:
@@ -323,11 +520,35 @@ class EYAMLProcessor(Processor):
 
         Raises:  N/A
         """
-        binary: Optional[str] = EYAMLProcessor.get_eyaml_executable(self.eyaml)
-        if binary is None:
-            return False
-        self.eyaml = binary
-        return True
+        return self.resolve_eyaml_executable() is not None
+
+    def resolve_eyaml_executable(self) -> Optional[str]:
+        """
+        Resolve the full executable path of the eyaml binary setting.
+
+        Each binary setting is resolved only once, so the system PATH is not
+        searched again for every value encrypted or decrypted.  Changing the
+        eyaml property causes the new setting to be resolved anew.  When the
+        setting resolves to an executable, the eyaml property is updated to
+        its full path.
+
+        Parameters:  N/A
+
+        Returns:  (Optional[str]) The executable eyaml binary path or None
+        when the eyaml property indicates no executable
+
+        Raises:  N/A
+        """
+        binary: Optional[str] = self.eyaml
+        if binary not in self._eyaml_executables:
+            self._eyaml_executables[binary] = (
+                EYAMLProcessor.get_eyaml_executable(binary))
+
+        executable: Optional[str] = self._eyaml_executables[binary]
+        if executable is not None:
+            self._eyaml_executables[executable] = executable
+            self.eyaml = executable
+        return executable
 
     @staticmethod
     def get_eyaml_executable(binary: Optional[str] = "eyaml") -> Optional[str]:
@@ -358,6 +579,11 @@ class EYAMLProcessor(Processor):
             return binary
         return None
 
+    @staticmethod
+    def _clean_eyaml_value(value: str) -> str:
+        """Strip the formatting whitespace from an EYAML value."""
+        return str(value).replace("\n", "").replace(" ", "").rstrip()
+
     @staticmethod
     def is_eyaml_value(value: str) -> bool:
         """
@@ -372,4 +598,18 @@ class EYAMLProcessor(Processor):
         """
         if not isinstance(value, str):
             return False
-        return value.replace("\n", "").replace(" ", "").startswith("ENC[")
+        if value.startswith("ENC["):
+            return True
+
+        # Compare the prefix in place, skipping any formatting whitespace,
+        # rather than copying the entire value to strip that whitespace.
+        matched = 0
+        for char in value:
+            if char in " \n":
+                continue
+            if char != "ENC["[matched]:
+                return False
+            matched += 1
+            if matched == 4:
+                return True
+        return False
@@ -0,0 +1,4 @@
+"""Make all means of encrypting and decrypting EYAML values available."""
+from .eyamlprovider import EYAMLProvider
+from .subprocesseyamlprovider import SubprocessEYAMLProvider
+from .pkcs7eyamlprovider import PKCS7EYAMLProvider
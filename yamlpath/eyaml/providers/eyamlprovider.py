@@ -0,0 +1,93 @@
+"""
+Define the interface of every means of encrypting and decrypting EYAML values.
+
+Copyright 2020 William W. Kimball, Jr. MBA MSIS
+"""
+from typing import Any, List, Optional
+
+from yamlpath.eyaml.enums import EYAMLOutputFormats
+
+
+class EYAMLProvider:
+    """
+    Base class of the crypto providers behind EYAMLProcessor.
+
+    A provider performs the cryptography for an EYAMLProcessor, taking the
+    eyaml binary and EYAML keys to use from that processor at each call so
+    they can be changed at any time.  Every method raises
+    `EYAMLCommandException` on failure, exactly as EYAMLProcessor always has.
+    """
+
+    def get_identity(self, processor: Any) -> List[Optional[str]]:
+        """
+        Identify this provider, as configured by a processor.
+
+        Decrypted values are cached by this identity and that of the keys in
+        use, so it must differ between providers which could decrypt the same
+        value differently.
+
+        Parameters:
+        1. processor (EYAMLProcessor) The processor using this provider
+
+        Returns:  (List[Optional[str]]) The identity of this provider
+
+        Raises:  N/A
+        """
+        raise NotImplementedError
+
+    def decrypt(self, processor: Any, value: str) -> str:
+        """
+        Decrypt an EYAML value.
+
+        Parameters:
+        1. processor (EYAMLProcessor) The processor using this provider
+        2. value (str) The EYAML value to decrypt, less any whitespace
+
+        Returns:  (str) The decrypted value
+
+        Raises:
+            - `EYAMLCommandException` when the value cannot be decrypted
+        """
+        raise NotImplementedError
+
+    # pylint: disable=locally-disabled,unused-argument
+    def decrypt_batch(
+        self, processor: Any, values: List[str]
+    ) -> Optional[List[str]]:
+        """
+        Decrypt several EYAML values at once.
+
+        Providers which cannot do better than decrypting each value on its own
+        need not implement this.
+
+        Parameters:
+        1. processor (EYAMLProcessor) The processor using this provider
+        2. values (List[str]) The distinct EYAML values to decrypt, less any
+           whitespace
+
+        Returns:  (Optional[List[str]]) The decrypted values, in order, or None
+        when they must instead be decrypted one at a time, as when any of them
+        cannot be decrypted
+
+        Raises:
+            - `EYAMLCommandException` when no value can be decrypted
+        """
+        return None
+
+    def encrypt(
+        self, processor: Any, value: str, output: EYAMLOutputFormats
+    ) -> str:
+        """
+        Encrypt a value via EYAML.
+
+        Parameters:
+        1. processor (EYAMLProcessor) The processor using this provider
+        2. value (str) the value to encrypt
+        3. output (EYAMLOutputFormats) the output format of the encryption
+
+        Returns:  (str) The encrypted result
+
+        Raises:
+            - `EYAMLCommandException` when the value cannot be encrypted
+        """
+        raise NotImplementedError
@@ -0,0 +1,234 @@
+"""
+Encrypt and decrypt PKCS7 EYAML values in-process.
+
+Copyright 2020 William W. Kimball, Jr. MBA MSIS
+"""
+import binascii
+from base64 import b64decode, b64encode
+from os import stat
+from os.path import join, realpath
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from yamlpath.eyaml.enums import EYAMLOutputFormats
+from yamlpath.eyaml.exceptions import EYAMLCommandException
+from yamlpath.eyaml.providers.eyamlprovider import EYAMLProvider
+
+# The cryptography package is optional; this provider is unavailable without
+# a version of it which supports PKCS7 enveloped data.
+try:
+    from cryptography import x509
+    from cryptography.exceptions import UnsupportedAlgorithm
+    from cryptography.hazmat.primitives.ciphers import algorithms
+    from cryptography.hazmat.primitives.serialization import (
+        Encoding, load_pem_private_key, pkcs7)
+    HAS_PKCS7 = hasattr(pkcs7, "pkcs7_decrypt_der")
+except ImportError:  # pragma: no cover
+    HAS_PKCS7 = False
+
+
+class PKCS7EYAMLProvider(EYAMLProvider):
+    """
+    Encrypt and decrypt PKCS7 EYAML values without the eyaml command.
+
+    Values are encrypted exactly as the eyaml command does by default, with
+    AES-256-CBC, and each key file is read only once unless it changes.  This
+    requires the optional cryptography package, version 45 or newer.
+
+    Unlike the eyaml command, no EYAML configuration file is read; when a
+    processor sets no key, the eyaml command's own default key file is used.
+    Only the PKCS7 encryption scheme is supported.
+    """
+
+    DEFAULT_PRIVATE_KEY = join("keys", "private_key.pkcs7.pem")
+    DEFAULT_PUBLIC_KEY = join("keys", "public_key.pkcs7.pem")
+    ENCRYPTED_PREFIX = "ENC[PKCS7,"
+    BLOCK_WIDTH = 60
+
+    def __init__(self) -> None:
+        """
+        Instantiate this class into an object.
+
+        Parameters:  N/A
+
+        Returns:  N/A
+
+        Raises:
+            - `EYAMLCommandException` when the cryptography package is missing
+        """
+        if not PKCS7EYAMLProvider.is_available():
+            raise EYAMLCommandException(
+                "In-process PKCS7 EYAML cryptography requires the"
+                " cryptography package, version 45 or newer.")
+        self._keys: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+        self._lock: Lock = Lock()
+
+    @staticmethod
+    def is_available() -> bool:
+        """Indicate whether the cryptography package supports this provider."""
+        return HAS_PKCS7
+
+    def get_identity(self, processor: Any) -> List[Optional[str]]:
+        """
+        Identify this provider, as configured by a processor.
+
+        Parameters:
+        1. processor (EYAMLProcessor) The processor using this provider
+
+        Returns:  (List[Optional[str]]) The identity of this provider
+
+        Raises:  N/A
+        """
+        return ["pkcs7"]
+
+    def decrypt(self, processor: Any, value: str) -> str:
+        """
+        Decrypt an EYAML value.
+
+        As with the eyaml command, trailing whitespace is removed from the
+        decrypted value.
+
+        Parameters:
+        1. processor (EYAMLProcessor) The processor using this provider
+        2. value (str) The EYAML value to decrypt, less any whitespace
+
+        Returns:  (str) The decrypted value
+
+        Raises:
+            - `EYAMLCommandException` when the keys cannot be loaded or the
+              value cannot be decrypted
+        """
+        if not (value.startswith(PKCS7EYAMLProvider.ENCRYPTED_PREFIX)
+                and value.endswith("]")):
+            raise EYAMLCommandException(
+                "Only PKCS7 EYAML values can be decrypted in-process:  {}"
+                .format(value))
+
+        certificate = self._load_key(
+            processor.publickey, PKCS7EYAMLProvider.DEFAULT_PUBLIC_KEY,
+            x509.load_pem_x509_certificate)
+        private_key = self._load_key(
+            processor.privatekey, PKCS7EYAMLProvider.DEFAULT_PRIVATE_KEY,
+            lambda data: load_pem_private_key(data, None))
+
+        try:
+            retval: str = pkcs7.pkcs7_decrypt_der(
+                b64decode(
+                    value[len(PKCS7EYAMLProvider.ENCRYPTED_PREFIX):-1],
+                    validate=True),
+                certificate, private_key, []
+            ).decode("utf-8").rstrip()
+        except (binascii.Error, ValueError, TypeError,
+                UnsupportedAlgorithm) as ex:
+            processor.logger.debug(
+                "Decryption failed:  {}".format(ex),
+                prefix="PKCS7EYAMLProvider::decrypt:  ")
+            retval = ""
+
+        if not retval:
+            raise EYAMLCommandException(
+                "Unable to decrypt value!  Please verify you are using the"
+                + " correct old EYAML keys and the value is not corrupt:  {}"
+                .format(value)
+            )
+
+        return retval
+
+    def decrypt_batch(
+        self, processor: Any, values: List[str]
+    ) -> Optional[List[str]]:
+        """
+        Decrypt several EYAML values.
+
+        Parameters:
+        1. processor (EYAMLProcessor) The processor using this provider
+        2. values (List[str]) The distinct EYAML values to decrypt, less any
+           whitespace
+
+        Returns:  (Optional[List[str]]) The decrypted values, in order, or None
+        when any of them could not be decrypted
+
+        Raises:  N/A
+        """
+        try:
+            return [self.decrypt(processor, value) for value in values]
+        except EYAMLCommandException:
+            return None
+
+    def encrypt(
+        self, processor: Any, value: str, output: EYAMLOutputFormats
+    ) -> str:
+        """
+        Encrypt a value via EYAML.
+
+        Parameters:
+        1. processor (EYAMLProcessor) The processor using this provider
+        2. value (str) the value to encrypt
+        3. output (EYAMLOutputFormats) the output format of the encryption
+
+        Returns:  (str) The encrypted result
+
+        Raises:
+            - `EYAMLCommandException` when the public key cannot be loaded
+        """
+        certificate = self._load_key(
+            processor.publickey, PKCS7EYAMLProvider.DEFAULT_PUBLIC_KEY,
+            x509.load_pem_x509_certificate)
+
+        try:
+            encoded: str = b64encode(
+                pkcs7.PKCS7EnvelopeBuilder()
+                .set_data(value.encode("utf-8"))
+                .add_recipient(certificate)
+                .set_content_encryption_algorithm(algorithms.AES256)
+                .encrypt(Encoding.DER, [])
+            ).decode("ascii")
+        except (ValueError, TypeError, UnsupportedAlgorithm) as ex:
+            raise EYAMLCommandException(
+                "Unable to encrypt value with EYAML public key, {}:  {}"
+                .format(processor.publickey, ex)) from ex
+
+        if output is EYAMLOutputFormats.BLOCK:
+            width = PKCS7EYAMLProvider.BLOCK_WIDTH
+            return "{}{}]\n".format(
+                PKCS7EYAMLProvider.ENCRYPTED_PREFIX,
+                "\n".join(encoded[idx:idx + width]
+                          for idx in range(0, len(encoded), width)))
+        return "{}{}]".format(PKCS7EYAMLProvider.ENCRYPTED_PREFIX, encoded)
+
+    def _load_key(
+        self, key_file: Optional[str], default_file: str,
+        loader: Callable[[bytes], Any]
+    ) -> Any:
+        """
+        Load an EYAML key, reusing it until its file changes.
+
+        Parameters:
+        1. key_file (Optional[str]) The key file to load
+        2. default_file (str) The key file to load when key_file is unset
+        3. loader (Callable[[bytes], Any]) Parses the PEM content of the file
+
+        Returns:  (Any) The loaded key
+
+        Raises:
+            - `EYAMLCommandException` when the key cannot be loaded
+        """
+        key_path: str = realpath(key_file if key_file else default_file)
+        try:
+            key_stat = stat(key_path)
+            signature = (key_stat.st_mtime_ns, key_stat.st_size)
+            with self._lock:
+                cached = self._keys.get(key_path)
+                if cached is not None and cached[0] == signature:
+                    return cached[1]
+
+            with open(key_path, "rb") as fhnd:
+                key = loader(fhnd.read())
+        except (OSError, ValueError, TypeError, UnsupportedAlgorithm) as ex:
+            raise EYAMLCommandException(
+                "Unable to load EYAML key, {}:  {}".format(key_path, ex)
+            ) from ex
+
+        with self._lock:
+            self._keys[key_path] = (signature, key)
+        return key
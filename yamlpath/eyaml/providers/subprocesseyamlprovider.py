@@ -0,0 +1,246 @@
+"""
+Encrypt and decrypt EYAML values by running the external eyaml command.
+
+Copyright 2018, 2019, 2020 William W. Kimball, Jr. MBA MSIS
+"""
+import re
+from subprocess import run, PIPE, CalledProcessError
+from typing import Any, List, Optional
+from uuid import uuid4
+
+from yamlpath.eyaml.enums import EYAMLOutputFormats
+from yamlpath.eyaml.exceptions import EYAMLCommandException
+from yamlpath.eyaml.providers.eyamlprovider import EYAMLProvider
+
+
+class SubprocessEYAMLProvider(EYAMLProvider):
+    """
+    Run the external eyaml command for all EYAML cryptography.
+
+    This is the default provider.  It supports every encryption scheme and
+    configuration the eyaml command does, at the cost of starting that command
+    for every batch of values to decrypt and every value to encrypt.
+    """
+
+    def get_identity(self, processor: Any) -> List[Optional[str]]:
+        """
+        Identify this provider, as configured by a processor.
+
+        Parameters:
+        1. processor (EYAMLProcessor) The processor using this provider
+
+        Returns:  (List[Optional[str]]) The identity of this provider
+
+        Raises:  N/A
+        """
+        return ["eyaml", processor.eyaml]
+
+    def decrypt(self, processor: Any, value: str) -> str:
+        """
+        Decrypt an EYAML value.
+
+        Parameters:
+        1. processor (EYAMLProcessor) The processor using this provider
+        2. value (str) The EYAML value to decrypt, less any whitespace
+
+        Returns:  (str) The decrypted value
+
+        Raises:
+            - `EYAMLCommandException` when the eyaml binary cannot be utilized
+              or the value cannot be decrypted
+        """
+        SubprocessEYAMLProvider._resolve_eyaml(processor)
+        cmd: List[str] = SubprocessEYAMLProvider._get_decrypt_command(
+            processor)
+        processor.logger.debug(
+            "About to execute {} against:\n{}".format(" ".join(cmd), value),
+            prefix="SubprocessEYAMLProvider::decrypt:  ")
+
+        retval: str = SubprocessEYAMLProvider._run_command(
+            processor, cmd, value).rstrip()
+
+        # Check for bad decryptions
+        processor.logger.debug(
+            "Decrypted result:  {}".format(retval),
+            prefix="SubprocessEYAMLProvider::decrypt:  ")
+        if not retval or retval == value:
+            raise EYAMLCommandException(
+                "Unable to decrypt value!  Please verify you are using the"
+                + " correct old EYAML keys and the value is not corrupt:  {}"
+                .format(value)
+            )
+
+        return retval
+
+    def decrypt_batch(
+        self, processor: Any, values: List[str]
+    ) -> Optional[List[str]]:
+        """
+        Decrypt several EYAML values through one eyaml command.
+
+        Every value is sent to one eyaml process, each separated from the next
+        by a unique marker line.  The eyaml command passes the markers through
+        untouched, which allows its output to be split back into one result
+        per value.
+
+        Parameters:
+        1. processor (EYAMLProcessor) The processor using this provider
+        2. values (List[str]) The distinct EYAML values to decrypt, less any
+           whitespace
+
+        Returns:  (Optional[List[str]]) The decrypted values, in order, or None
+        when any of them could not be decrypted
+
+        Raises:
+            - `EYAMLCommandException` when the eyaml binary cannot be utilized
+        """
+        SubprocessEYAMLProvider._resolve_eyaml(processor)
+        cmd: List[str] = SubprocessEYAMLProvider._get_decrypt_command(
+            processor)
+        delimiter: str = "\nYAMLPATH-EYAML-BATCH-{}\n".format(uuid4().hex)
+        processor.logger.debug(
+            "About to execute {} against {} values."
+            .format(" ".join(cmd), len(values)),
+            prefix="SubprocessEYAMLProvider::decrypt_batch:  ")
+
+        try:
+            plain_texts: List[str] = [
+                part.rstrip() for part in SubprocessEYAMLProvider._run_command(
+                    processor, cmd, delimiter.join(values)).split(delimiter)]
+        except EYAMLCommandException as ex:
+            processor.logger.debug(
+                "Batch decryption failed:  {}".format(ex),
+                prefix="SubprocessEYAMLProvider::decrypt_batch:  ")
+            return None
+
+        if (len(plain_texts) != len(values)
+                or any(not plain_text or plain_text == value
+                       for (plain_text, value)
+                       in zip(plain_texts, values))):
+            processor.logger.debug(
+                "Batch decryption produced unusable results.",
+                prefix="SubprocessEYAMLProvider::decrypt_batch:  ")
+            return None
+
+        return plain_texts
+
+    def encrypt(
+        self, processor: Any, value: str, output: EYAMLOutputFormats
+    ) -> str:
+        """
+        Encrypt a value via EYAML.
+
+        Parameters:
+        1. processor (EYAMLProcessor) The processor using this provider
+        2. value (str) the value to encrypt
+        3. output (EYAMLOutputFormats) the output format of the encryption
+
+        Returns:  (str) The encrypted result
+
+        Raises:
+            - `EYAMLCommandException` when the eyaml binary cannot be utilized
+        """
+        if processor.resolve_eyaml_executable() is None:
+            raise EYAMLCommandException(
+                "The eyaml binary is not executable at {}."
+                .format(processor.eyaml)
+            )
+
+        cmdstr: str = ("{} encrypt --quiet --stdin --output={}"
+                       .format(processor.eyaml, output))
+        if processor.publickey:
+            cmdstr += " --pkcs7-public-key={}".format(processor.publickey)
+        if processor.privatekey:
+            cmdstr += " --pkcs7-private-key={}".format(processor.privatekey)
+
+        cmd: List[str] = cmdstr.split()
+        processor.logger.debug(
+            "About to execute:  {}".format(" ".join(cmd)),
+            prefix="SubprocessEYAMLProvider::encrypt:  ")
+        retval: str = SubprocessEYAMLProvider._run_command(
+            processor, cmd, value).rstrip()
+
+        # While exceedingly rare and difficult to test for, it is possible
+        # for custom eyaml commands to produce no output.  This is a critical
+        # error in every conceivable case but pycov will never get a test
+        # that works multi-platform.  So, ignore covering this case.
+        if not retval: # pragma: no cover
+            raise EYAMLCommandException(
+                ("The {} command was unable to encrypt your value.  Please"
+                 + " verify this process can run that command and read your"
+                 + " EYAML keys.").format(processor.eyaml)
+            )
+
+        if output is EYAMLOutputFormats.BLOCK:
+            retval = re.sub(r" +", "", retval) + "\n"
+
+        processor.logger.debug(
+            "Encrypted result:\n{}".format(retval),
+            prefix="SubprocessEYAMLProvider::encrypt:  ")
+        return retval
+
+    @staticmethod
+    def _resolve_eyaml(processor: Any) -> None:
+        """
+        Resolve the full executable path of a processor's eyaml binary.
+
+        Parameters:
+        1. processor (EYAMLProcessor) The processor using this provider
+
+        Returns:  N/A
+
+        Raises:
+            - `EYAMLCommandException` when there is no such executable
+        """
+        if processor.resolve_eyaml_executable() is None:
+            raise EYAMLCommandException("No accessible eyaml command.")
+
+    @staticmethod
+    def _get_decrypt_command(processor: Any) -> List[str]:
+        """
+        Get the eyaml command which decrypts values read from STDIN.
+
+        Parameters:
+        1. processor (EYAMLProcessor) The processor using this provider
+
+        Returns:  (List[str]) The command and each of its arguments
+
+        Raises:  N/A
+        """
+        cmdstr: str = "{} decrypt --quiet --stdin".format(processor.eyaml)
+        if processor.publickey:
+            cmdstr += " --pkcs7-public-key={}".format(processor.publickey)
+        if processor.privatekey:
+            cmdstr += " --pkcs7-private-key={}".format(processor.privatekey)
+        return cmdstr.split()
+
+    @staticmethod
+    def _run_command(processor: Any, cmd: List[str], text: str) -> str:
+        """
+        Run an eyaml command against some text.
+
+        Parameters:
+        1. processor (EYAMLProcessor) The processor using this provider
+        2. cmd (List[str]) The command to run
+        3. text (str) The text to feed the command via STDIN
+
+        Returns:  (str) The raw output of the command
+
+        Raises:
+            - `EYAMLCommandException` when the command fails
+        """
+        try:
+            # processor.eyaml is untrusted, so shell must always be False and
+            # all parameters must be supplied via a List.
+            return run(
+                cmd,
+                stdout=PIPE,
+                input=text.encode("ascii"),
+                check=True,
+                shell=False
+            ).stdout.decode('ascii')
+        except CalledProcessError as ex:
+            raise EYAMLCommandException(
+                "The {} command cannot be run due to exit code:  {}"
+                .format(processor.eyaml, ex.returncode)
+            ) from ex
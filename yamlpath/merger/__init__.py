@@ -1,3 +1,4 @@
 """Core YAML Path Merger classes."""
 from .mergerconfig import MergerConfig
 from .merger import Merger
+from .mergecache import MergeCache
@@ -0,0 +1,374 @@
+"""
+Implement an on-disk cache of intermediate merge results.
+
+Copyright 2020 William W. Kimball, Jr. MBA MSIS
+"""
+import os
+import pickle
+import stat
+import tempfile
+from hashlib import sha256
+from typing import Any, Dict, List, Optional, Tuple
+
+import ruamel.yaml # type: ignore
+
+from yamlpath import __version__ as YAMLPATH_VERSION
+from yamlpath.merger import MergerConfig
+from yamlpath.wrappers import ConsolePrinter
+
+
+class MergeCache:
+    """
+    Content-addressed, size-bounded cache of intermediate merge results.
+
+    Merging a list of sources is a left fold, so the result of merging any
+    prefix of that list depends only on the content of the sources in that
+    prefix and the effective merge options.  Each prefix is identified by a
+    chained digest of exactly those inputs, allowing a later merge of the same
+    list to resume from the longest prefix whose sources are unchanged.
+
+    Entries are pickled documents.  Because unpickling can execute code, the
+    cache directory is created accessible only to its owner and neither it
+    nor any entry is read unless it is owned by the current user and writable
+    by no other user.  Each key also covers the source code of this package,
+    so a changed merge implementation never reuses stale results.
+    """
+
+    DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+    ENTRY_SUFFIX = ".pickle"
+    _code_digest: Optional[str] = None
+
+    def __init__(
+        self, logger: ConsolePrinter, cache_dir: str,
+        max_bytes: int = DEFAULT_MAX_BYTES
+    ) -> None:
+        """
+        Instantiate this class into an object.
+
+        Parameters:
+        1. logger (ConsolePrinter) Instance of ConsolePrinter or subclass
+        2. cache_dir (str) Directory in which to store cache entries; will be
+           created when it does not already exist
+        3. max_bytes (int) Total size the cache entries may occupy before the
+           least recently used entries are evicted
+
+        Returns:  N/A
+
+        Raises:  N/A
+        """
+        self.log: ConsolePrinter = logger
+        self.cache_dir: str = cache_dir
+        self.max_bytes: int = max_bytes
+        self._warned_untrusted: bool = False
+
+        # The age and size of every entry, read from the cache directory only
+        # once and then maintained as entries are written and evicted
+        self._entries: Optional[Dict[str, Tuple[float, int]]] = None
+        self._total_bytes: int = 0
+
+    @staticmethod
+    def get_default_cache_dir() -> str:
+        """Get the default, per-user cache directory."""
+        cache_home = os.environ.get(
+            "XDG_CACHE_HOME",
+            os.path.join(os.path.expanduser("~"), ".cache"))
+        return os.path.join(cache_home, "yamlpath", "merge")
+
+    @staticmethod
+    def get_file_digest(source: str) -> str:
+        """
+        Get the content digest of a file.
+
+        Parameters:
+        1. source (str) The file to digest
+
+        Returns:  (str) Hexadecimal SHA-256 digest of the file content
+
+        Raises:
+        - `OSError` when the file cannot be read
+        """
+        digest = sha256()
+        with open(source, "rb") as fhnd:
+            for chunk in iter(lambda: fhnd.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def get_code_digest() -> str:
+        """
+        Get the digest of the source code of this package.
+
+        The digest is computed only once per run.
+
+        Parameters:  N/A
+
+        Returns:  (str) Hexadecimal SHA-256 digest of every Python module of
+        this package, including its relative path
+        """
+        if MergeCache._code_digest is None:
+            package_dir = os.path.dirname(os.path.dirname(
+                os.path.abspath(__file__)))
+            sources: List[str] = []
+            for (dir_path, dir_names, file_names) in os.walk(package_dir):
+                dir_names.sort()
+                sources.extend(
+                    os.path.join(dir_path, file_name)
+                    for file_name in sorted(file_names)
+                    if file_name.endswith(".py"))
+
+            digest = sha256()
+            for source in sources:
+                digest.update(os.path.relpath(source, package_dir).encode(
+                    "utf-8"))
+                digest.update(MergeCache.get_file_digest(source).encode(
+                    "utf-8"))
+            MergeCache._code_digest = digest.hexdigest()
+        return MergeCache._code_digest
+
+    @staticmethod
+    def is_trusted(file_stat: os.stat_result) -> bool:
+        """
+        Indicate whether a cache directory or entry may be read.
+
+        It must be owned by the current user and writable by no other user.
+        This cannot be determined where file ownership is unsupported, so
+        every file is trusted there.
+
+        Parameters:
+        1. file_stat (os.stat_result) Status of the directory or entry
+
+        Returns:  (bool) True when the directory or entry may be read
+        """
+        if not hasattr(os, "geteuid"):
+            return True  # pragma: no cover
+        return (file_stat.st_uid == os.geteuid()
+                and not file_stat.st_mode & (stat.S_IWGRP | stat.S_IWOTH))
+
+    @staticmethod
+    def is_checkpoint(prefix_len: int, source_count: int) -> bool:
+        """
+        Indicate whether to cache the merge result of a prefix of sources.
+
+        Caching every prefix would write the whole merged document once per
+        source.  Instead, only prefixes whose lengths are powers of two are
+        cached, along with the last two prefixes; the latter allow resuming
+        after only the last source changes.  This bounds the number of cached
+        results per merge to the logarithm of the number of sources.
+
+        Parameters:
+        1. prefix_len (int) The number of sources in the prefix
+        2. source_count (int) The number of cacheable sources
+
+        Returns:  (bool) True when the prefix merge result should be cached
+        """
+        return (prefix_len >= source_count - 1
+                or prefix_len & (prefix_len - 1) == 0)
+
+    @staticmethod
+    def get_prefix_keys(
+        config: MergerConfig, source_digests: List[str]
+    ) -> List[str]:
+        """
+        Get the cache key of every prefix of an ordered list of sources.
+
+        Parameters:
+        1. config (MergerConfig) The effective merge options
+        2. source_digests (List[str]) Content digest of each source, in merge
+           order
+
+        Returns:  (List[str]) The cache key of each prefix; the first key
+        identifies the first source alone and the last key identifies all of
+        them.
+        """
+        chain = sha256("{}|{}|{}|{}".format(
+            YAMLPATH_VERSION, ruamel.yaml.__version__,
+            MergeCache.get_code_digest(),
+            config.get_options_digest()).encode("utf-8")).hexdigest()
+        keys: List[str] = []
+        for source_digest in source_digests:
+            chain = sha256(
+                "{}|{}".format(chain, source_digest).encode("utf-8")
+            ).hexdigest()
+            keys.append(chain)
+        return keys
+
+    def load(self, key: str) -> Tuple[bool, Any]:
+        """
+        Load a cached merge result.
+
+        Unreadable entries are discarded and reported as misses, as are any
+        entries which cannot be trusted (see is_trusted).
+
+        Parameters:
+        1. key (str) The cache key of the desired merge result
+
+        Returns:  (Tuple[bool, Any]) Whether the entry was found and, when it
+        was, the cached document (which may itself be None).
+        """
+        if not self._has_trusted_dir():
+            return (False, None)
+
+        entry_file = self._get_entry_file(key)
+        try:
+            with open(entry_file, "rb") as fhnd:
+                if not MergeCache.is_trusted(os.fstat(fhnd.fileno())):
+                    self.log.warning(
+                        "Ignoring merge cache entry, {}, because it is not"
+                        " owned by or is writable by other than the current"
+                        " user.".format(entry_file))
+                    return (False, None)
+                data = pickle.load(fhnd)
+        except FileNotFoundError:
+            return (False, None)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError,
+                ImportError, IndexError) as ex:
+            self.log.debug(
+                "MergeCache::load:  Discarding unreadable entry, {}:  {}"
+                .format(entry_file, ex))
+            self._remove_entry(entry_file)
+            return (False, None)
+
+        # Refresh the entry's age so eviction is least-recently-used
+        try:
+            os.utime(entry_file)
+            self._record_entry(entry_file)
+        except OSError:
+            pass
+        self.log.debug(
+            "MergeCache::load:  Loaded cached merge result, {}.".format(key))
+        return (True, data)
+
+    def find_longest_prefix(self, keys: List[str]) -> Tuple[int, Any]:
+        """
+        Find the longest prefix of sources which has a cached merge result.
+
+        Parameters:
+        1. keys (List[str]) Prefix cache keys as from get_prefix_keys
+
+        Returns:  (Tuple[int, Any]) The number of sources in the longest cached
+        prefix (0 when there is none) and its cached document.
+        """
+        for prefix_len in range(len(keys), 0, -1):
+            (found, data) = self.load(keys[prefix_len - 1])
+            if found:
+                return (prefix_len, data)
+        return (0, None)
+
+    def store(self, key: str, data: Any) -> None:
+        """
+        Store a merge result, then evict entries beyond the size limit.
+
+        Failure to write the cache is never fatal to a merge; it is merely
+        reported as a warning.
+
+        Parameters:
+        1. key (str) The cache key of the merge result
+        2. data (Any) The merged document
+
+        Returns:  N/A
+        """
+        tmp_name: Optional[str] = None
+        try:
+            os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+            if not self._has_trusted_dir():
+                return
+            (tmp_fd, tmp_name) = tempfile.mkstemp(
+                dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(tmp_fd, "wb") as fhnd:
+                pickle.dump(data, fhnd, protocol=pickle.HIGHEST_PROTOCOL)
+            entry_file = self._get_entry_file(key)
+            os.replace(tmp_name, entry_file)
+            tmp_name = None
+            self._record_entry(entry_file)
+        except (OSError, pickle.PicklingError, RecursionError,
+                TypeError) as ex:
+            self.log.warning(
+                "Unable to cache merge result in {}:  {}"
+                .format(self.cache_dir, ex))
+        finally:
+            if tmp_name is not None:
+                self._remove(tmp_name)
+
+        self.evict()
+
+    def evict(self) -> None:
+        """Delete the least recently used entries beyond the size limit."""
+        entries = self._get_entries()
+        if self._total_bytes <= self.max_bytes:
+            return
+
+        for (_, entry_file) in sorted(
+                (entry_age, entry_file)
+                for (entry_file, (entry_age, _)) in entries.items()):
+            if self._total_bytes <= self.max_bytes:
+                break
+            self.log.debug(
+                "MergeCache::evict:  Evicting {}.".format(entry_file))
+            self._remove_entry(entry_file)
+
+    def _get_entries(self) -> Dict[str, Tuple[float, int]]:
+        """Get the age and size of every entry, scanning only once."""
+        if self._entries is None:
+            self._entries = {}
+            self._total_bytes = 0
+            try:
+                with os.scandir(self.cache_dir) as scanner:
+                    for entry in scanner:
+                        if entry.name.endswith(MergeCache.ENTRY_SUFFIX):
+                            entry_stat = entry.stat()
+                            self._entries[entry.path] = (
+                                entry_stat.st_mtime, entry_stat.st_size)
+                            self._total_bytes += entry_stat.st_size
+            except OSError:
+                pass
+        return self._entries
+
+    def _record_entry(self, entry_file: str) -> None:
+        """Record the present age and size of an entry."""
+        entries = self._get_entries()
+        entry_stat = os.stat(entry_file)
+        if entry_file in entries:
+            self._total_bytes -= entries[entry_file][1]
+        entries[entry_file] = (entry_stat.st_mtime, entry_stat.st_size)
+        self._total_bytes += entry_stat.st_size
+
+    def _remove_entry(self, entry_file: str) -> None:
+        """Delete an entry and forget its size."""
+        self._remove(entry_file)
+        entries = self._get_entries()
+        if entry_file in entries:
+            self._total_bytes -= entries.pop(entry_file)[1]
+
+    def _has_trusted_dir(self) -> bool:
+        """
+        Indicate whether the cache directory exists and may be used.
+
+        An untrusted directory is reported once as a warning.
+        """
+        try:
+            dir_stat = os.stat(self.cache_dir)
+        except OSError:
+            return False
+
+        if MergeCache.is_trusted(dir_stat):
+            return True
+
+        if not self._warned_untrusted:
+            self._warned_untrusted = True
+            self.log.warning(
+                "Ignoring the merge cache in {} because it is not owned by or"
+                " is writable by other than the current user."
+                .format(self.cache_dir))
+        return False
+
+    def _get_entry_file(self, key: str) -> str:
+        """Get the file-spec of a cache entry."""
+        return os.path.join(self.cache_dir, key + MergeCache.ENTRY_SUFFIX)
+
+    @staticmethod
+    def _remove(file_spec: str) -> None:
+        """Delete a file, ignoring any failure to do so."""
+        try:
+            os.remove(file_spec)
+        except OSError:
+            pass
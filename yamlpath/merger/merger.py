@@ -141,29 +141,24 @@ class Merger:
         self._delete_mergeref_keys(lhs)
 
         # Assume deep merge until a node's merge rule indicates otherwise
+        insertions: List[Tuple[int, Any, Any]] = []
         buffer: List[Tuple[Any, Any]] = []
         buffer_pos = 0
         for key, val in rhs.non_merged_items():
             path_next = (path +
                 YAMLPath.escape_path_section(key, path.seperator))
             if key in lhs:
-                # Write the buffer if populated
+                # Schedule insertion of the buffer if populated
                 for b_key, b_val in buffer:
                     self.logger.debug(
-                        "Merger::_merge_dicts:  Inserting key, {}, from"
-                        " buffer to position, {}, at path, {}."
+                        "Merger::_merge_dicts:  Scheduling key, {}, from"
+                        " buffer for insertion at position, {}, at path, {}."
                         .format(b_key, buffer_pos, path_next),
                         header="INSERT " * 15)
                     self.logger.debug(
-                        "Before INSERT, the LHS document was:",
-                        data=lhs, prefix="Merger::_merge_dicts:  ")
-                    self.logger.debug(
-                        "... and before INSERT, the incoming value will be:",
+                        "... and the incoming value will be:",
                         data=b_val, prefix="Merger::_merge_dicts:  ")
-                    lhs.insert(buffer_pos, b_key, b_val)
-                    self.logger.debug(
-                        "After INSERT, the LHS document became:",
-                        data=lhs, prefix="Merger::_merge_dicts:  ")
+                    insertions.append((buffer_pos, b_key, b_val))
                     buffer_pos += 1
                 buffer = []
 
@@ -236,6 +231,9 @@ class Merger:
 
             buffer_pos += 1
 
+        # Write all scheduled insertions in a single pass
+        self._insert_dict_items(lhs, insertions)
+
         # Write any remaining buffered content to the end of LHS
         for b_key, b_val in buffer:
             self.logger.debug(
@@ -249,6 +247,51 @@ class Merger:
 
         return lhs
 
+    def _insert_dict_items(
+        self, lhs: CommentedMap, insertions: List[Tuple[int, Any, Any]]
+    ) -> None:
+        """
+        Insert new key-value pairs into a CommentedMap in a single pass.
+
+        The result is identical to calling `lhs.insert(pos, key, value)` for
+        each insertion, in order, except the final key order is computed once
+        and applied by moving keys rather than by rebuilding the entire map for
+        every inserted key.  Because no existing key is deleted or re-added,
+        comments, anchors, and YAML merge references are left intact.
+
+        Parameters:
+        1. lhs (CommentedMap) The map to insert into.
+        2. insertions (List[Tuple[int, Any, Any]]) The position, key, and value
+           of each new pair, in strictly ascending order of position.
+
+        Returns:  N/A
+        """
+        if not insertions:
+            return
+
+        lhs_keys = list(lhs.keys())
+        lhs_len = len(lhs_keys)
+        final_keys: List[Any] = []
+        lhs_pos = 0
+        for ins_pos, ins_key, _ in insertions:
+            while len(final_keys) < ins_pos and lhs_pos < lhs_len:
+                final_keys.append(lhs_keys[lhs_pos])
+                lhs_pos += 1
+            final_keys.append(ins_key)
+        final_keys.extend(lhs_keys[lhs_pos:])
+
+        self.logger.debug(
+            "Merger::_merge_dicts:  Inserting {} keys ahead of {} preexisting"
+            " keys.".format(len(insertions), lhs_len - min(
+                insertions[0][0], lhs_len)))
+
+        # New keys are first appended to the end of the map; then every key
+        # from the first insertion point onward is moved to the end, in order.
+        for _, ins_key, ins_val in insertions:
+            lhs[ins_key] = ins_val
+        for key in final_keys[min(insertions[0][0], lhs_len):]:
+            lhs.move_to_end(key)
+
     def _merge_simple_lists(
         self, lhs: CommentedSeq, rhs: CommentedSeq, path: YAMLPath,
         node_coord: NodeCoords
@@ -279,7 +322,17 @@ class Merger:
         if merge_mode is ArrayMergeOpts.RIGHT:
             return rhs
 
-        tagless_lhs = Nodes.tagless_elements(lhs)
+        # Index the tagless LHS values to their positions so UNIQUE merges need
+        # not scan the entire LHS for every RHS element.  Unhashable values
+        # (like nested Arrays) fall back to a (much shorter) linear search.
+        lhs_index: Dict[Any, List[int]] = {}
+        lhs_unhashable: List[Tuple[Any, List[int]]] = []
+        if merge_mode is ArrayMergeOpts.UNIQUE:
+            for idx, ele in enumerate(lhs):
+                Merger._index_simple_element(
+                    lhs_index, lhs_unhashable,
+                    Merger._tagless_element(ele), idx)
+
         for idx, ele in enumerate(rhs):
             path_next = path + "[{}]".format(idx)
             self.logger.debug(
@@ -287,27 +340,88 @@ class Merger:
                 prefix="Merger::_merge_simple_lists:  ", data=ele)
 
             if merge_mode is ArrayMergeOpts.UNIQUE:
-                cmp_val = ele
-                if isinstance(ele, TaggedScalar):
-                    cmp_val = ele.value
-
+                cmp_val = Merger._tagless_element(ele)
                 self.logger.debug(
-                    "Looking for comparison value, {}, in:".format(cmp_val),
-                    prefix="Merger::_merge_simple_lists:  ", data=tagless_lhs)
-
-                if cmp_val in tagless_lhs:
-                    lhs = CommentedSeq([ele
-                           if (e == cmp_val
-                               or (isinstance(e, TaggedScalar)
-                                   and e.value == cmp_val)
-                           ) else e
-                           for e in lhs])
+                    "Looking for comparison value, {}, in LHS."
+                    .format(cmp_val),
+                    prefix="Merger::_merge_simple_lists:  ")
+
+                positions = Merger._find_simple_element(
+                    lhs_index, lhs_unhashable, cmp_val)
+                if positions:
+                    # Replace every matching LHS element, in place
+                    for pos in positions:
+                        lhs[pos] = ele
                 else:
+                    Merger._index_simple_element(
+                        lhs_index, lhs_unhashable, cmp_val, len(lhs))
                     lhs.append(ele)
                 continue
             lhs.append(ele)
         return lhs
 
+    @staticmethod
+    def _tagless_element(ele: Any) -> Any:
+        """Get the comparable value of an Array element, sans any YAML Tag."""
+        if isinstance(ele, TaggedScalar):
+            return ele.value
+        return ele
+
+    @staticmethod
+    def _index_simple_element(
+        index: Dict[Any, List[int]],
+        unhashable: List[Tuple[Any, List[int]]], value: Any, position: int
+    ) -> None:
+        """
+        Record the position of a value within an Array.
+
+        Parameters:
+        1. index (Dict[Any, List[int]]) Positions of hashable values.
+        2. unhashable (List[Tuple[Any, List[int]]]) Positions of unhashable
+           values.
+        3. value (Any) The tagless value to record.
+        4. position (int) Index of `value` within its Array.
+
+        Returns:  N/A
+        """
+        try:
+            index.setdefault(value, []).append(position)
+            return
+        except TypeError:
+            pass
+
+        for known_value, positions in unhashable:
+            if known_value == value:
+                positions.append(position)
+                return
+        unhashable.append((value, [position]))
+
+    @staticmethod
+    def _find_simple_element(
+        index: Dict[Any, List[int]],
+        unhashable: List[Tuple[Any, List[int]]], value: Any
+    ) -> List[int]:
+        """
+        Get every recorded position of a value within an Array.
+
+        Parameters:
+        1. index (Dict[Any, List[int]]) Positions of hashable values.
+        2. unhashable (List[Tuple[Any, List[int]]]) Positions of unhashable
+           values.
+        3. value (Any) The tagless value to seek.
+
+        Returns:  (List[int]) Positions of `value`; empty when absent.
+        """
+        try:
+            return index.get(value, [])
+        except TypeError:
+            pass
+
+        for known_value, positions in unhashable:
+            if known_value == value:
+                return positions
+        return []
+
     # pylint: disable=locally-disabled,too-many-branches
     def _merge_arrays_of_hashes(
         self, lhs: CommentedSeq, rhs: CommentedSeq, path: YAMLPath,
@@ -433,10 +547,13 @@ class Merger:
         """
         Generate a unique anchor name within a document pair.
 
+        The new name is added to `known_anchors` so that subsequent calls
+        against the same set never generate a duplicate name.
+
         Parameters:
         1. anchor (str) The original anchor name.
-        2. known_anchors (dict) Dictionary of every anchor already in the
-           document.
+        2. known_anchors (Set[str]) Every anchor name already in use within
+           the document pair.
 
         Returns:  (str) The new, unique anchor name.
         """
@@ -447,12 +564,16 @@ class Merger:
         while anchor in known_anchors:
             anchor = "{}_{}".format(anchor, aid)
             aid += 1
+        known_anchors.add(anchor)
         return anchor
 
     def _resolve_anchor_conflicts(self, rhs: Any) -> None:
         """
         Resolve anchor conflicts between this and another document.
 
+        Every conflict is first resolved into a plan of anchor renames and
+        replacements which is then applied to each document in a single pass.
+
         Parameters:
         1. rhs (Any) The other document to consolidate with this one.
 
@@ -470,6 +591,11 @@ class Merger:
             "RHS Anchors:", prefix="Merger::_resolve_anchor_conflicts:  ",
             data=rhs_anchors)
 
+        known_anchors: Set[str] = set(lhs_anchors).union(rhs_anchors)
+        conflict_mode = self.config.anchor_merge_mode()
+        rhs_renames: Dict[str, str] = {}
+        rhs_replacements: List[Tuple[Any, Any]] = []
+        lhs_replacements: List[Tuple[Any, Any]] = []
         for anchor in [anchor
                 for anchor in rhs_anchors
                 if anchor in lhs_anchors
@@ -480,7 +606,6 @@ class Merger:
             # checked for equality (or pointing at identical anchors).
             lhs_anchor = lhs_anchors[anchor]
             rhs_anchor = rhs_anchors[anchor]
-            conflict_mode = self.config.anchor_merge_mode()
 
             self.logger.debug(
                 "Anchor is in both documents:",
@@ -510,26 +635,20 @@ class Merger:
                         "Anchor {} conflict; will RENAME anchors."
                         .format(anchor),
                         prefix="Merger::_resolve_anchor_conflicts:  ")
-                    Anchors.rename_anchor(
-                        rhs, anchor,
-                        self._calc_unique_anchor(
-                            anchor,
-                            set(lhs_anchors.keys())
-                            .union(set(rhs_anchors.keys()))
-                        )
-                    )
+                    rhs_renames[anchor] = self._calc_unique_anchor(
+                        anchor, known_anchors)
                 elif conflict_mode is AnchorConflictResolutions.LEFT:
                     self.logger.debug(
                         "Anchor {} conflict; LEFT will override."
                         .format(anchor),
                         prefix="Merger::_resolve_anchor_conflicts:  ")
-                    Anchors.replace_anchor(rhs, rhs_anchor, lhs_anchor)
+                    rhs_replacements.append((rhs_anchor, lhs_anchor))
                 elif conflict_mode is AnchorConflictResolutions.RIGHT:
                     self.logger.debug(
                         "Anchor {} conflict; RIGHT will override."
                         .format(anchor),
                         prefix="Merger::_resolve_anchor_conflicts:  ")
-                    Anchors.replace_anchor(self.data, lhs_anchor, rhs_anchor)
+                    lhs_replacements.append((lhs_anchor, rhs_anchor))
                 else:
                     raise MergeException(
                         "Aborting due to anchor conflict with, {}."
@@ -543,7 +662,12 @@ class Merger:
                 # So, overwrite all matching LHS nodes with their RHS
                 # equivalents in order to stave off spurious anchor
                 # re-definitions.
-                Anchors.replace_anchor(self.data, lhs_anchor, rhs_anchor)
+                lhs_replacements.append((lhs_anchor, rhs_anchor))
+
+        # Apply the entire plan with no more than one pass per document
+        Anchors.rename_anchors(rhs, rhs_renames)
+        Anchors.replace_anchors(rhs, rhs_replacements)
+        Anchors.replace_anchors(self.data, lhs_replacements)
 
     def merge_with(self, rhs: Any) -> None:
         """
@@ -4,7 +4,10 @@ Config file processor for the Merger.
 Copyright 2020 William W. Kimball, Jr. MBA MSIS
 """
 import configparser
-from typing import Any, Dict, Union
+import json
+from hashlib import sha256
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Tuple, Union
 from argparse import Namespace
 
 from yamlpath.exceptions import YAMLPathException
@@ -19,6 +22,7 @@ from yamlpath import Processor, YAMLPath
 from yamlpath.wrappers import ConsolePrinter, NodeCoords
 
 
+# pylint: disable=locally-disabled,too-many-instance-attributes
 class MergerConfig:
     """Config file processor for the Merger."""
 
@@ -37,8 +41,16 @@ class MergerConfig:
         self.config: Union[None, configparser.ConfigParser] = None
         self.rules: Dict[NodeCoords, str] = {}
         self.keys: Dict[NodeCoords, str] = {}
+        self.prepare_seconds: float = 0.0
+
+        # User rules are compiled only once, no matter how many documents are
+        # prepared.  Each distinct YAML Path is parsed once while every
+        # (section, path, rule) entry is kept in configuration file order.
+        self._compiled_paths: Dict[str, YAMLPath] = {}
+        self._compiled_rules: List[Tuple[str, str, str]] = []
 
         self._load_config()
+        self._compile_user_rules()
 
     def anchor_merge_mode(self) -> AnchorConflictResolutions:
         """Get Anchor merge mode."""
@@ -158,6 +170,8 @@ class MergerConfig:
         """
         Load references to all nodes which match config rules.
 
+        The time spent doing so is accumulated into `prepare_seconds`.
+
         Parameters:
         1. data (Any) The DOM for which to load configuration.
 
@@ -172,10 +186,40 @@ class MergerConfig:
         self.keys = {}
 
         # Load new rules and keys
-        merge_path = self.get_insertion_point()
+        started = perf_counter()
         proc = Processor(self.log, data)
-        self._prepare_user_rules(proc, merge_path, "rules", self.rules)
-        self._prepare_user_rules(proc, merge_path, "keys", self.keys)
+        self._prepare_user_rules(proc)
+        elapsed = perf_counter() - started
+        self.prepare_seconds += elapsed
+        self.log.debug(
+            "MergerConfig::prepare:  Matched {} rule(s) and {} key(s) to nodes"
+            " in {:.6f}s.".format(len(self.rules), len(self.keys), elapsed))
+
+    def get_options_digest(self) -> str:
+        """
+        Get a digest of every option which can affect a merge result.
+
+        Two MergerConfigs with the same digest will produce identical merge
+        results from identical documents.
+
+        Parameters:  N/A
+
+        Returns:  (str) Hexadecimal SHA-256 digest of the effective options.
+        """
+        options: Dict[str, Any] = {
+            "anchors": self.anchor_merge_mode().name,
+            "mergeat": str(self.get_insertion_point()),
+            "config": None,
+        }
+        for option in ["arrays", "hashes", "aoh"]:
+            options[option] = getattr(self.args, option, None)
+        if self.config is not None:
+            options["config"] = {
+                section: dict(self.config[section])
+                for section in self.config.sections()}
+        return sha256(
+            json.dumps(options, sort_keys=True).encode("utf-8")
+        ).hexdigest()
 
     def get_insertion_point(self) -> YAMLPath:
         """Get the YAML Path at which merging shall be performed."""
@@ -189,72 +233,108 @@ class MergerConfig:
             return OutputDocTypes.from_str(self.args.document_format)
         return OutputDocTypes.AUTO
 
-    def _prepare_user_rules(
-        self, proc: Processor, merge_path: YAMLPath, section: str,
-        collector: dict
-    ) -> None:
+    def _compile_user_rules(self) -> None:
         """
-        Identify DOM nodes matching user-defined merge rules.
+        Parse every user-defined merge rule YAML Path, once.
 
-        Parameters:
-        1. proc (Processor) Reference to the DOM Processor.
-        2. merge_path (YAMLPath) User-specified path within the DOM at which
-           merging will take place.
-        3. section (str) User-configuration file section defining the merge
-           rules to apply.
-        4. collector (dict) Storage collector for matching nodes.
+        Parameters:  N/A
 
         Returns:  N/A
         """
-        if self.config is None or not section in self.config:
-            self.log.warning(
-                "User-specified configuration file has no {} section."
-                .format(section))
+        if self.config is None:
             return
 
-        for rule_key in self.config[section]:
-            rule_value = self.config[section][rule_key]
-
-            if "=" in rule_value:
-                # There were at least two = signs on the configuration line
-                conf_line = rule_key + "=" + rule_value
-                delim_pos = conf_line.rfind("=")
-                rule_key = conf_line[0:delim_pos].strip()
-                rule_value = conf_line[delim_pos + 1:].strip()
+        merge_path = self.get_insertion_point()
+        for section in ["rules", "keys"]:
+            if not section in self.config:
+                continue
+
+            for rule_key in self.config[section]:
+                rule_value = self.config[section][rule_key]
+
+                if "=" in rule_value:
+                    # There were at least two = signs on the configuration line
+                    conf_line = rule_key + "=" + rule_value
+                    delim_pos = conf_line.rfind("=")
+                    rule_key = conf_line[0:delim_pos].strip()
+                    rule_value = conf_line[delim_pos + 1:].strip()
+                    self.log.debug(
+                        "MergerConfig::_compile_user_rules:  Reconstituted"
+                        " configuration line '{}' to extract adjusted key '{}'"
+                        " with value '{}'"
+                        .format(conf_line, rule_key, rule_value))
+
+                rule_path = YAMLPath(rule_key)
+                yaml_path = YAMLPath.strip_path_prefix(rule_path, merge_path)
+                path_key = str(yaml_path)
+                self._compiled_paths.setdefault(path_key, yaml_path)
+                self._compiled_rules.append((section, path_key, rule_value))
                 self.log.debug(
-                    "MergerConfig::_prepare_user_rules:  Reconstituted"
-                    " configuration line '{}' to extract adjusted key '{}'"
-                    " with value '{}'".format(conf_line, rule_key, rule_value))
+                    "MergerConfig::_compile_user_rules:  Compiled '{}' YAML"
+                    " Path '{}' from key, {}."
+                    .format(section, yaml_path, rule_key))
+
+    def _prepare_user_rules(self, proc: Processor) -> None:
+        """
+        Identify DOM nodes matching user-defined merge rules.
+
+        Each distinct, pre-compiled YAML Path is evaluated against the DOM only
+        once, even when it is shared by several rules and keys.  Rules and keys
+        are then applied in configuration file order, so the first one
+        configured for any node wins.
 
-            rule_path = YAMLPath(rule_key)
-            yaml_path = YAMLPath.strip_path_prefix(rule_path, merge_path)
+        Parameters:
+        1. proc (Processor) Reference to the DOM Processor.
+
+        Returns:  N/A
+        """
+        collectors: Dict[str, Dict[NodeCoords, str]] = {
+            "rules": self.rules,
+            "keys": self.keys,
+        }
+        for section in collectors:
+            if self.config is None or not section in self.config:
+                self.log.warning(
+                    "User-specified configuration file has no {} section."
+                    .format(section))
+
+        matched_nodes: Dict[str, Optional[List[NodeCoords]]] = {}
+        for path_key, yaml_path in self._compiled_paths.items():
             self.log.debug(
-                "MergerConfig::_prepare_user_rules:  Matching '{}' nodes to"
-                " YAML Path '{}' from key, {}."
-                .format(section, yaml_path, rule_key))
+                "MergerConfig::_prepare_user_rules:  Matching nodes to YAML"
+                " Path '{}'.".format(yaml_path))
             try:
-                for node_coord in proc.get_nodes(yaml_path, mustexist=True):
-                    self.log.debug(
-                        "Node will have merging rule, {}:"
-                        .format(rule_value),
-                        prefix="MergerConfig::_prepare_user_rules:  ",
-                        data=node_coord.node)
-                    collector[node_coord] = rule_value
-
+                matched_nodes[path_key] = list(
+                    proc.get_nodes(yaml_path, mustexist=True))
             except YAMLPathException:
+                matched_nodes[path_key] = None
+
+        for section, path_key, rule_value in self._compiled_rules:
+            node_coords = matched_nodes[path_key]
+            if node_coords is None:
                 self.log.warning("{} YAML Path matches no nodes:  {}"
-                                .format(section, yaml_path))
+                                 .format(section, path_key))
+                continue
 
-        self.log.debug(
-            "Matched rules to nodes:",
-            prefix="MergerConfig::_prepare_user_rules:  ")
-        for node_coord, merge_rule in collector.items():
-            self.log.debug(
-                "... RULE:  {}".format(merge_rule),
-                prefix="MergerConfig::_prepare_user_rules:  ")
+            for node_coord in node_coords:
+                self.log.debug(
+                    "Node will have merging {}, {}:"
+                    .format(section, rule_value),
+                    prefix="MergerConfig::_prepare_user_rules:  ",
+                    data=node_coord.node)
+                collectors[section].setdefault(node_coord, rule_value)
+
+        for section, collector in collectors.items():
             self.log.debug(
-                "... NODE:", data=node_coord,
+                "Matched {} to nodes:".format(section),
                 prefix="MergerConfig::_prepare_user_rules:  ")
+            for node_coord, merge_rule in collector.items():
+                self.log.debug(
+                    "... RULE:  {}".format(merge_rule),
+                    prefix="MergerConfig::_prepare_user_rules:  ")
+                self.log.debug(
+                    "... NODE:", data=node_coord,
+                    prefix="MergerConfig::_prepare_user_rules:  ")
 
     def _load_config(self) -> None:
         """Load the external configuration file."""
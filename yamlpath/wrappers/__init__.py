@@ -1,3 +1,4 @@
 """Make all generic wrappers available."""
+from .capturedstream import CapturedStream
 from .consoleprinter import ConsolePrinter
 from .nodecoords import NodeCoords
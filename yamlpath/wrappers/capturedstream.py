@@ -0,0 +1,34 @@
+"""
+Record writes to a console stream for later replay.
+
+Copyright 2020 William W. Kimball, Jr. MBA MSIS
+"""
+from typing import List, Tuple
+
+
+class CapturedStream:
+    """Record writes to a console stream, in order, for later replay."""
+
+    def __init__(self, name: str, writes: List[Tuple[str, str]]) -> None:
+        """
+        Instantiate this class into an object.
+
+        Parameters:
+        1. name (str) Name of the captured stream within sys; one of stdout
+           or stderr.
+        2. writes (List[Tuple[str, str]]) Collector of (stream name, text)
+           writes, shared by every CapturedStream whose relative write order
+           must be preserved.
+
+        Returns:  N/A
+        """
+        self.name = name
+        self.writes = writes
+
+    def write(self, text: str) -> int:
+        """Record a write."""
+        self.writes.append((self.name, text))
+        return len(text)
+
+    def flush(self) -> None:
+        """Do nothing; there is no buffer to flush."""